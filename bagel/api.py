@@ -0,0 +1,180 @@
+"""
+Functions for creating Neurobagel graph data from inputs that are already loaded in memory,
+for use from Python code (e.g., notebooks or data pipelines) instead of the command-line interface.
+
+Unlike the CLI commands, these functions do not read or write any files.
+Invalid inputs are logged and raise a BagelError with the same informative message as the CLI.
+
+Example:
+    >>> from bagel import api
+    >>> dataset = api.build_pheno_dataset(pheno_df, data_dict, dataset_description)
+    >>> dataset = api.add_bids(dataset, bids_df)
+    >>> jsonld = api.to_jsonld(dataset)
+"""
+
+from contextlib import contextmanager
+from copy import deepcopy
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from bagel import mappings, models
+from bagel.logger import LoggedErrorExit, log_error, logger
+from bagel.utilities import (
+    bids_utils,
+    derivative_utils,
+    model_utils,
+    pheno_utils,
+)
+
+__all__ = [
+    "BagelError",
+    "build_pheno_dataset",
+    "add_bids",
+    "add_derivatives",
+    "to_jsonld",
+]
+
+
+class BagelError(Exception):
+    """Error raised when the inputs cannot be processed, after an informative message has been logged."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+@contextmanager
+def _raise_bagel_errors() -> Iterator[None]:
+    """Raise the errors logged for invalid inputs as a BagelError, instead of the exception used to exit the CLI."""
+    try:
+        yield
+    except LoggedErrorExit as err:
+        raise BagelError(err.message) from None
+
+
+def _as_string_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of a table with all values as strings, missing values as empty strings
+    and a default index (used for row numbers in error messages), matching how tables are loaded from .tsv files by the CLI.
+    """
+    return (
+        df.fillna("").astype(pd.StringDtype("pyarrow")).reset_index(drop=True)
+    )
+
+
+@_raise_bagel_errors()
+def build_pheno_dataset(
+    pheno_df: pd.DataFrame,
+    data_dict: dict,
+    dataset_description: dict,
+    config: str = mappings.DEFAULT_CONFIG,
+) -> models.Dataset:
+    """
+    Return a Neurobagel dataset with the harmonized phenotypic data for each subject,
+    from a phenotypic table, its data dictionary and the dataset description. This is the in-memory equivalent of 'bagel pheno'.
+
+    Table values are expected to be strings as written in the phenotypic .tsv file. Other values are converted to strings.
+    The provided table and dictionaries are not modified.
+    """
+    available_configs = pheno_utils.get_available_configs(
+        mappings.CONFIG_NAMESPACES_MAPPING
+    )
+    if config not in available_configs:
+        log_error(
+            logger,
+            f"Unknown configuration '{config}'. Available configurations: {available_configs}.",
+        )
+    pheno_utils.check_if_remote_config_namespaces_used()
+
+    columns_to_load = pheno_utils.get_columns_to_load(data_dict)
+    if columns_to_load is not None:
+        pheno_df = pheno_df[
+            [col for col in pheno_df.columns if col in columns_to_load]
+        ]
+    pheno_df = _as_string_table(pheno_df)
+    data_dict, validated_description = (
+        pheno_utils.validate_pheno_dataset_inputs(
+            pheno_df,
+            deepcopy(data_dict),
+            deepcopy(dataset_description),
+            config,
+        )
+    )
+    return pheno_utils.create_pheno_dataset(
+        pheno_df, data_dict, validated_description
+    )
+
+
+@_raise_bagel_errors()
+def add_bids(
+    dataset: models.Dataset,
+    bids_df: pd.DataFrame,
+    dataset_source_dir: Path | str | None = None,
+    aggregate_acquisitions: bool = False,
+) -> models.Dataset:
+    """
+    Add the imaging metadata from a BIDS table (e.g., created by 'bagel bids2tsv') to the subjects of a dataset,
+    and return the dataset. This is the in-memory equivalent of 'bagel bids'.
+
+    The dataset is modified in place.
+    """
+    bids_df, bids_suffix_term_map = bids_utils.prepare_bids_table(
+        _as_string_table(bids_df), "provided table"
+    )
+    bids_utils.add_bids_to_dataset(
+        dataset,
+        bids_df,
+        bids_suffix_term_map,
+        dataset_source_dir=(
+            Path(dataset_source_dir)
+            if dataset_source_dir is not None
+            else None
+        ),
+        show_progress=False,
+        aggregate_acquisitions=aggregate_acquisitions,
+    )
+    return dataset
+
+
+@_raise_bagel_errors()
+def add_derivatives(
+    dataset: models.Dataset, status_df: pd.DataFrame
+) -> models.Dataset:
+    """
+    Add the completed processing pipelines from a table in the Nipoppy processing status file format
+    to the subjects of a dataset, and return the dataset. This is the in-memory equivalent of 'bagel derivatives'.
+
+    The dataset is modified in place.
+    """
+    derivative_utils.check_if_pipeline_catalog_available()
+
+    status_df = _as_string_table(status_df)
+    known_pipeline_uris, known_pipeline_versions = (
+        derivative_utils.validate_processing_status(status_df)
+    )
+    derivative_utils.add_derivatives_to_dataset(
+        dataset, status_df, known_pipeline_uris, known_pipeline_versions
+    )
+    return dataset
+
+
+@_raise_bagel_errors()
+def to_jsonld(
+    dataset: models.Dataset,
+    config: str = mappings.DEFAULT_CONFIG,
+    deterministic: bool = False,
+) -> dict:
+    """
+    Return a dataset as a JSONLD dictionary, with the context for the specified configuration,
+    as it would be saved to a .jsonld file by the CLI.
+
+    If deterministic is True, the identifiers of the dataset are first replaced by identifiers
+    derived from its content, which modifies the dataset in place.
+    """
+    if deterministic:
+        model_utils.canonicalize_dataset(dataset)
+    return model_utils.dataset_to_jsonld(
+        context=model_utils.generate_context(config), dataset=dataset
+    )
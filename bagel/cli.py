@@ -1,3 +1,5 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import bids2table as b2t2
@@ -5,28 +7,47 @@ import click
 import pandas as pd
 import typer
 from bids import BIDSLayout, exceptions
-from rich.progress import Progress, SpinnerColumn, TextColumn, track
+from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from bagel import mappings, models
+from bagel import bids_table_model, mappings, models
 from bagel._version import __version__
 
-from .logger import VerbosityLevel, configure_logger, log_error, logger
+from .logger import (
+    LogFormat,
+    VerbosityLevel,
+    configure_logger,
+    is_rich_output,
+    log_error,
+    log_to_file,
+    logger,
+    set_log_format,
+    verbosity_log_levels,
+)
 from .utilities import (
+    batch_utils,
     bids_utils,
     derivative_utils,
+    diagnostics_utils,
     file_utils,
+    memory_utils,
+    merge_utils,
     model_utils,
     pheno_utils,
+    profile_utils,
+    serve_utils,
+    timing_utils,
+    watch_utils,
 )
+from .utilities.batch_utils import BATCH_MANIFEST_COLS
 from .utilities.derivative_utils import PROC_STATUS_COLS
+from .utilities.profile_utils import ProfileMode
+from .utilities.timing_utils import timed_stage
 
 OPTION_GROUP_NAMES = {
     "troubleshooting": "Troubleshooting",
     "config": "Configuration",
 }
 
-CUSTOM_SESSION_LABEL = "ses-unnamed"
-
 bagel = typer.Typer(
     help=(
         "A command-line tool for creating valid, subject-level instances of the Neurobagel graph data model.\n\n"
@@ -55,7 +76,77 @@ def verbosity_option():
         "--verbosity",
         "-v",
         callback=configure_logger,
-        help="Set the verbosity level of the output. 0 = show errors only; 1 = show errors, warnings, and informational messages; 3 = show all logs, including debug messages.",
+        help="Set the verbosity level of the output. 0 = show errors only; 1 = show errors, warnings, and informational messages; 2 = show all logs, including debug messages such as the duration of each stage of the command.",
+        rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
+    )
+
+
+def log_format_option():
+    """Create a reusable option for the format of the logs of commands."""
+    return typer.Option(
+        LogFormat.AUTO,
+        "--log-format",
+        callback=set_log_format,
+        # Set up the console handler before the verbosity callback sets its level
+        is_eager=True,
+        help="Set the format of the output. 'rich' = styled logs and progress bars; 'plain' = plain text lines; "
+        "'json' = one JSON object per line. 'auto' uses 'rich' when the output is shown in a terminal and 'plain' otherwise, "
+        "e.g. when it is redirected to a file. Progress bars are only shown with 'rich'.",
+        rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
+    )
+
+
+def timings_option():
+    """Create a reusable option for saving the durations of the stages of commands."""
+    return typer.Option(
+        None,
+        "--timings",
+        callback=timing_utils.start_timing,
+        help="Save the duration, number of processed items and throughput of each stage of the command to the specified .json file. "
+        "These are also shown in the output at verbosity level 2.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
+    )
+
+
+def trace_memory_option():
+    """Create a reusable option for measuring the memory use of the stages of commands."""
+    return typer.Option(
+        False,
+        "--trace-memory",
+        callback=memory_utils.start_memory_tracking,
+        help="Show the peak and change in memory use of each stage of the command, and the code locations where memory grew the most. "
+        "These are also saved to the file specified with --timings. Tracing memory allocations slows down the command considerably.",
+        rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
+    )
+
+
+def profile_option():
+    """Create a reusable option for profiling commands."""
+    return typer.Option(
+        None,
+        "--profile",
+        callback=profile_utils.start_profiling,
+        help="Profile the command and save the profile to the specified .pstats file, e.g. to attach to a bug report. "
+        "The profile can be inspected using Python's pstats module or tools such as snakeviz.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
+    )
+
+
+def profile_mode_option():
+    """Create a reusable option for choosing the profiler used by --profile."""
+    return typer.Option(
+        ProfileMode.DETERMINISTIC,
+        "--profile-mode",
+        # Must be processed before --profile so that the profiler can be chosen when profiling starts
+        is_eager=True,
+        help="Profiler to use with --profile. 'deterministic' records every function call, which can slow down the command considerably; "
+        "'sampling' periodically records the call stack with a much lower overhead, but the resulting times and call counts are estimates.",
         rich_help_panel=OPTION_GROUP_NAMES["troubleshooting"],
     )
 
@@ -70,6 +161,51 @@ def overwrite_option():
     )
 
 
+def deterministic_option():
+    """Create a reusable option for producing reproducible output files."""
+    return typer.Option(
+        False,
+        "--deterministic",
+        help="Derive the identifiers of the dataset, subjects, sessions, and their metadata from their labels instead of generating random identifiers, "
+        "and sort subjects and sessions by label, so that identical inputs produce identical output files.",
+    )
+
+
+def aggregate_acquisitions_option():
+    """Create a reusable option for aggregating the image files of imaging sessions by contrast type."""
+    return typer.Option(
+        False,
+        "--aggregate-acquisitions",
+        help="Describe the imaging data of each session with a single acquisition (including the number of image files) per distinct image contrast, "
+        "instead of one acquisition per image file. "
+        "This makes the output much smaller for datasets with many runs or echoes of the same contrast.",
+    )
+
+
+def config_option():
+    """Create a reusable option for the community configuration used to annotate the data dictionary."""
+    return typer.Option(
+        mappings.DEFAULT_CONFIG,
+        "--config",
+        "-c",
+        # Solution for providing preset choices taken from https://github.com/fastapi/typer/issues/182#issuecomment-1708245110
+        # NOTE: Alternatively, we could dynamically create a string listing the available config names
+        # to include in the option description in the help text. We would then use a callback to validate the config name manually,
+        # instead of using click.Choice which handles displaying the choices and validation automatically.
+        # This might be useful once/if we have many community configurations to choose from or want more flexibility in errors.
+        click_type=click.Choice(
+            pheno_utils.get_available_configs(
+                mappings.CONFIG_NAMESPACES_MAPPING
+            ),
+            case_sensitive=False,
+        ),
+        help="Name of the vocabulary configuration used to generate your data dictionary in the annotation tool. "
+        "If you are processing data for a Neurobagel subcommunity, choose the subcommunity name here. "
+        f"{pheno_utils.additional_config_help_text()}",
+        rich_help_panel=OPTION_GROUP_NAMES["config"],
+    )
+
+
 def show_help(ctx: typer.Context, value: bool):
     """
     Callback to display the command help and exit.
@@ -148,6 +284,11 @@ def bids2tsv(
     ),
     overwrite: bool = overwrite_option(),
     verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
     help_: bool = help_option(),
 ):
     """
@@ -164,13 +305,15 @@ def bids2tsv(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             transient=True,
+            disable=not is_rich_output(),
         ) as progress:
             # Add a spinner during BIDS parsing - this spinner disappears once the process is done
             # and won't be present in logs
             progress.add_task(
                 "Validating BIDS dataset. This may take a while...", total=None
             )
-            BIDSLayout(bids_dir, validate=True)
+            with timed_stage("validate BIDS dataset"):
+                BIDSLayout(bids_dir, validate=True)
         logger.info("BIDS validation passed.")
     except exceptions.BIDSValidationError as e:
         log_error(
@@ -178,11 +321,15 @@ def bids2tsv(
             f"Invalid BIDS dataset at {bids_dir}. Validation error: {e}",
         )
 
-    output_columns = ["sub", "ses", "suffix", "path"]
-    dataset_tab = b2t2.index_dataset(bids_dir)
-    dataset_df = dataset_tab.to_pandas()
+    with timed_stage("index dataset") as stage:
+        dataset_tab = b2t2.index_dataset(bids_dir)
+        dataset_df = dataset_tab.to_pandas()
+        stage["files"] = len(dataset_df)
 
-    nb_bids_suffix_term_map = bids_utils.get_bids_suffix_to_std_term_mapping()
+    with timed_stage("fetch imaging modality vocabulary"):
+        nb_bids_suffix_term_map = (
+            bids_utils.get_bids_suffix_to_std_term_mapping()
+        )
 
     bids_recognized_suffixes, bids_unrecognized_suffixes = (
         bids_utils.partition_suffixes(
@@ -221,23 +368,14 @@ def bids2tsv(
             f"(Supported suffixes: {list(nb_bids_suffix_term_map.keys())}).",
         )
 
-    dataset_df = dataset_df[
-        dataset_df["suffix"].isin(neurobagel_supported_suffixes)
-    ].copy()
-
-    dataset_df["path"] = dataset_df.apply(
-        lambda row: (Path(row["root"]) / row["path"]).as_posix(), axis=1
-    )
-    dataset_df = dataset_df[output_columns]
-
-    # bids2table returns the IDs without the 'sub-' and 'ses-' prefixes by default
-    if not strip_id_prefixes:
-        dataset_df["sub"] = dataset_df["sub"].apply(lambda id: f"sub-{id}")
-        dataset_df["ses"] = dataset_df["ses"].apply(
-            lambda id: f"ses-{id}" if pd.notna(id) else id
+    with timed_stage("format BIDS table") as stage:
+        dataset_df = bids_utils.format_indexed_bids_table(
+            dataset_df, neurobagel_supported_suffixes, strip_id_prefixes
         )
+        stage["files"] = len(dataset_df)
 
-    dataset_df.to_csv(output, sep="\t", index=False)
+    with timed_stage("write"):
+        dataset_df.to_csv(output, sep="\t", index=False)
     logger.info(f"Saved output to:  {output}")
 
 
@@ -283,29 +421,36 @@ def pheno(
         file_okay=True,
         dir_okay=False,
         resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
     ),
-    config: str = typer.Option(
-        mappings.DEFAULT_CONFIG,
-        "--config",
-        "-c",
-        # Solution for providing preset choices taken from https://github.com/fastapi/typer/issues/182#issuecomment-1708245110
-        # NOTE: Alternatively, we could dynamically create a string listing the available config names
-        # to include in the option description in the help text. We would then use a callback to validate the config name manually,
-        # instead of using click.Choice which handles displaying the choices and validation automatically.
-        # This might be useful once/if we have many community configurations to choose from or want more flexibility in errors.
-        click_type=click.Choice(
-            pheno_utils.get_available_configs(
-                mappings.CONFIG_NAMESPACES_MAPPING
-            ),
-            case_sensitive=False,
-        ),
-        help="Name of the vocabulary configuration used to generate your data dictionary in the annotation tool. "
-        "If you are processing data for a Neurobagel subcommunity, choose the subcommunity name here. "
-        f"{pheno_utils.additional_config_help_text()}",
-        rich_help_panel=OPTION_GROUP_NAMES["config"],
+    previous: Path = typer.Option(
+        None,
+        "--previous",
+        help="Path to a .jsonld file created by a previous run of 'bagel pheno' for the same dataset. "
+        "Subjects whose phenotypic data and data dictionary annotations are unchanged since the previous run are reused as-is (including their identifiers), "
+        "and only new or changed subjects are regenerated. "
+        f"Requires the subject content hashes saved alongside the previous output ({model_utils.SUBJECT_HASHES_FILE_SUFFIX} file, see --save-hashes). "
+        "The hashes for the new output are also saved.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
     ),
+    save_hashes: bool = typer.Option(
+        False,
+        "--save-hashes",
+        help=f"Save a content hash of each subject's inputs alongside the output ({model_utils.SUBJECT_HASHES_FILE_SUFFIX} file), "
+        "so that a later run with --previous can reuse the unchanged subjects.",
+    ),
+    config: str = config_option(),
     overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
     verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
     help_: bool = help_option(),
 ):
     """
@@ -313,11 +458,20 @@ def pheno(
 
     This command will create a valid, subject-level instance of the Neurobagel graph data model for the provided phenotypic file in the JSON-LD format. You can upload this .jsonld file to the Neurobagel graph.
     """
+    save_hashes = save_hashes or previous is not None
     file_utils.check_overwrite(output, overwrite)
+    if save_hashes:
+        file_utils.check_overwrite(
+            model_utils.get_subject_hashes_path(output), overwrite
+        )
 
-    data_dictionary = file_utils.load_json(dictionary)
-    pheno_df = file_utils.load_tabular(pheno)
-    dataset_metadata = file_utils.load_json(dataset_description)
+    with timed_stage("load phenotypic inputs") as stage:
+        data_dictionary = file_utils.load_json(dictionary)
+        pheno_df = file_utils.load_tabular(
+            pheno, columns=pheno_utils.get_columns_to_load(data_dictionary)
+        )
+        dataset_metadata = file_utils.load_json(dataset_description)
+        stage["rows"] = len(pheno_df)
 
     pheno_utils.check_if_remote_config_namespaces_used()
 
@@ -330,121 +484,34 @@ def pheno(
     logger.info(
         "%-*s%s", width, "Dataset description (.json):", dataset_description
     )
-    pheno_utils.validate_inputs(data_dictionary, pheno_df, config)
-    dataset_metadata = pheno_utils.validate_dataset_description(
-        dataset_metadata
-    )
-
-    # TODO: Remove once we no longer support annotation tool v1 data dictionaries
-    data_dictionary = pheno_utils.convert_transformation_to_format(
-        data_dictionary
-    )
-
-    logger.info("Processing phenotypic annotations...")
-    subject_list = []
-
-    column_mapping = pheno_utils.map_std_vars_to_columns(data_dictionary)
-    tool_mapping = pheno_utils.map_tools_to_columns(data_dictionary)
-
-    # TODO: needs refactoring once we handle multiple participant IDs
-    participants = column_mapping["participant"][0]
-
-    # Note that `session_column will be None if there is no session column in the pheno.tsv
-    session_column = column_mapping.get("session")
-
-    for participant in pheno_df[participants].unique():
-        _sub_pheno = pheno_df.query(
-            f"`{participants}` == '{str(participant)}'"
-        )
-
-        sessions = []
-        for session_row_idx, session_row in _sub_pheno.iterrows():
-            # Our data model requires a session. To support phenotypic data without sessions,
-            # we create a session with a fixed, but unusual CUSTOM_SESSION_LABEL and add the
-            # phenotypic data to that session.
-            if session_column is None:
-                session_label = CUSTOM_SESSION_LABEL
-            else:
-                # NOTE: We take the name from the first session column - we don't know how to handle multiple session columns yet
-                session_label = session_row[session_column[0]]
-
-            session = models.PhenotypicSession(hasLabel=str(session_label))
-            _ses_pheno = session_row
-
-            if "sex" in column_mapping.keys():
-                _sex_vals = pheno_utils.get_transformed_values(
-                    column_mapping["sex"], _ses_pheno, data_dictionary
-                )
-                if _sex_vals:
-                    # NOTE: Our data model only allows a single sex value, so we only take the first instance if multiple columns are about sex
-                    session.hasSex = models.Sex(identifier=_sex_vals[0])
-
-            if "diagnosis" in column_mapping.keys():
-                _dx_vals = pheno_utils.get_transformed_values(
-                    column_mapping["diagnosis"], _ses_pheno, data_dictionary
-                )
-                if _dx_vals:
-                    session.hasDiagnosis = [
-                        models.Diagnosis(identifier=_dx_val)
-                        for _dx_val in _dx_vals
-                    ]
-
-            if "subject_group" in column_mapping.keys():
-                _group_vals = pheno_utils.get_transformed_values(
-                    column_mapping["subject_group"],
-                    _ses_pheno,
-                    data_dictionary,
-                )
-                if _group_vals:
-                    session.isSubjectGroup = models.SubjectGroup(
-                        identifier=_group_vals[0]
-                    )
-
-            if "age" in column_mapping.keys():
-                # NOTE: At the moment, our data model only supports a single age value per subject.
-                # To achieve this, we transform the values from ALL columns annotated as about age
-                # (so we expect each of them to be valid according to the data dictionary model),
-                # but we take and store only the first instance in the graph data.
-                _age_vals = pheno_utils.get_transformed_values(
-                    column_mapping["age"], _ses_pheno, data_dictionary
-                )
-                if _age_vals:
-                    session.hasAge = _age_vals[0]
-
-            if tool_mapping:
-                _assessments = [
-                    models.Assessment(identifier=tool)
-                    for tool, columns in tool_mapping.items()
-                    if pheno_utils.are_any_available(
-                        columns, _ses_pheno, data_dictionary
-                    )
-                ]
-                if _assessments:
-                    # Only set assessments for the subject if at least one has a non-missing item
-                    session.hasAssessment = _assessments
-            sessions.append(session)
-
-        subject = models.Subject(
-            hasLabel=str(participant), hasSession=sessions
+    if previous is not None:
+        logger.info("%-*s%s", width, "Previous output (.jsonld):", previous)
+    data_dictionary, validated_description = (
+        pheno_utils.validate_pheno_dataset_inputs(
+            pheno_df, data_dictionary, dataset_metadata, config
         )
-        subject_list.append(subject)
-
-    dataset_graph_attributes = (
-        pheno_utils.dataset_description_to_graph_attributes(dataset_metadata)
     )
-
-    dataset = models.Dataset(
-        **dataset_graph_attributes,
-        hasSamples=subject_list,
+    subject_hashes: dict = {}
+    reusable_subjects: dict[str, models.Subject] = {}
+    if save_hashes:
+        subject_hashes, reusable_subjects = model_utils.hash_subjects(
+            pheno_df, data_dictionary, previous_jsonld=previous
+        )
+    dataset = pheno_utils.create_pheno_dataset(
+        pheno_df, data_dictionary, validated_description, reusable_subjects
     )
 
-    file_utils.save_jsonld(
-        data=model_utils.dataset_to_jsonld(
-            context=model_utils.generate_context(config),
-            dataset=dataset,
-        ),
-        filename=output,
+    _save_dataset(
+        dataset=dataset,
+        context=model_utils.generate_context(config),
+        output=output,
+        deterministic=deterministic,
     )
+    if save_hashes:
+        model_utils.save_subject_hashes(subject_hashes, output)
+    else:
+        # Hashes left over from an overwritten output no longer describe it
+        model_utils.get_subject_hashes_path(output).unlink(missing_ok=True)
 
 
 @bagel.command()
@@ -497,9 +564,17 @@ def bids(
         file_okay=True,
         dir_okay=False,
         resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
     ),
     overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
+    aggregate_acquisitions: bool = aggregate_acquisitions_option(),
     verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
     help_: bool = help_option(),
 ):
     """
@@ -528,130 +603,46 @@ def bids(
             dataset_source_dir,
         )
 
-    jsonld_context, jsonld_dataset = (
-        model_utils.extract_and_validate_jsonld_dataset(jsonld_path)
-    )
-    bids_dataset = file_utils.load_tabular(bids_table, input_type="BIDS")
-
-    nb_bids_suffix_term_map = bids_utils.get_bids_suffix_to_std_term_mapping()
-    # NOTE: The BIDS table model validation will check for required columns and for empty values in the "suffix" column
-    # and error out for any problem. Because we want to ignore unsupported suffixes with a warning instead of a validation error,
-    # we check the suffix column separately here and then remove any offending values.
-    # For our custom suffix-check to work, we need to ensure that the "suffix" column exists here.
-    if "suffix" in bids_dataset.columns:
-        # We assume that most input BIDS TSVs will have been generated by the 'bids2tsv' command,
-        # so we only log a generic warning here for any suffixes found in the table that are not supported by Neurobagel
-        neurobagel_supported_suffixes, neurobagel_unsupported_suffixes = (
-            bids_utils.partition_suffixes(
-                suffixes=bids_dataset["suffix"],
-                reference_suffixes=nb_bids_suffix_term_map.keys(),
-            )
+    with timed_stage("load JSONLD") as stage:
+        jsonld_context, jsonld_dataset = (
+            model_utils.extract_and_validate_jsonld_dataset(jsonld_path)
         )
-        if not neurobagel_supported_suffixes:
-            log_error(
-                logger,
-                f"No Neurobagel-supported BIDS suffixes found in BIDS table 'suffix' column: {bids_table}. "
-                "No imaging metadata could be added to the subject graph data. "
-                "Please ensure your dataset includes at least one image file with a Neurobagel-supported BIDS suffix "
-                f"(supported suffixes: {list(nb_bids_suffix_term_map.keys())}).",
-            )
-        if neurobagel_unsupported_suffixes:
-            logger.warning(
-                f"BIDS table 'suffix' column contains file suffixes unsupported by Neurobagel: {list(neurobagel_unsupported_suffixes)}. "
-                f"These records will be ignored. Supported file suffixes: {list(nb_bids_suffix_term_map.keys())}."
-            )
-
-        bids_dataset = bids_dataset[
-            bids_dataset["suffix"].isin(neurobagel_supported_suffixes)
-        ].copy()
-
-    bids_utils.validate_bids_table(bids_dataset)
-
-    existing_subs_dict = model_utils.get_subject_instances(jsonld_dataset)
-    bids_subject_ids = list(bids_dataset["sub"].unique())
+        stage["subjects"] = len(jsonld_dataset.hasSamples)
+    with timed_stage("load BIDS table") as stage:
+        bids_dataset = file_utils.load_tabular(
+            bids_table,
+            input_type="BIDS",
+            columns=bids_table_model.model.columns.keys(),
+        )
+        stage["rows"] = len(bids_dataset)
 
-    model_utils.confirm_subs_match_pheno_data(
-        subjects=bids_subject_ids,
-        subject_source_for_err="BIDS dataset file",
-        pheno_subjects=existing_subs_dict.keys(),
+    bids_dataset, nb_bids_suffix_term_map = bids_utils.prepare_bids_table(
+        bids_dataset, bids_table
     )
-
-    logger.info("Initial checks of inputs passed.")
-
-    logger.info(
-        "Subject metadata for the following Neurobagel-supported imaging modalities "
-        f"will be added to the subject graph data: {list(neurobagel_supported_suffixes)}"
+    bids_utils.add_bids_to_dataset(
+        dataset=jsonld_dataset,
+        bids_dataset=bids_dataset,
+        bids_suffix_term_map=nb_bids_suffix_term_map,
+        dataset_source_dir=dataset_source_dir,
+        show_progress=verbosity != VerbosityLevel.ERROR and is_rich_output(),
+        aggregate_acquisitions=aggregate_acquisitions,
     )
-
-    logger.info("Merging BIDS metadata with existing subject annotations...")
-
-    disable_progress_bar = verbosity == VerbosityLevel.ERROR
-    for bids_sub_id in track(
-        bids_subject_ids,
-        description="Processing BIDS subjects...",
-        disable=disable_progress_bar,
-    ):
-        _bids_sub = bids_dataset[bids_dataset["sub"] == bids_sub_id]
-        existing_subject = existing_subs_dict[bids_sub_id]
-        existing_sessions_dict = model_utils.get_imaging_session_instances(
-            existing_subject
+    if aggregate_acquisitions:
+        # The context of a JSONLD created by an older version of the CLI may not define the file count of acquisitions
+        jsonld_context.setdefault(
+            "hasFileCount", {"@id": f"{mappings.NB.pf}:hasFileCount"}
         )
 
-        bids_sessions = list(_bids_sub["ses"].unique())
-        # TODO: Do we need to explicitly preprocess cases where ses values are other types of whitespace?
-        # Ensure the sessions are in alphanumeric order for readability
-        for session_id in sorted(bids_sessions):
-            _bids_session = _bids_sub[_bids_sub["ses"] == session_id]
-            image_list = bids_utils.create_acquisitions(
-                session_df=_bids_session,
-                bids_suffix_term_map=nb_bids_suffix_term_map,
-            )
-
-            if not image_list:
-                continue
-
-            # TODO: Currently if a subject has BIDS data but no "ses-" directories (e.g., only 1 session),
-            # we create a session with a fixed, but unusual CUSTOM_SESSION_LABEL
-            # and add the imaging data info to a session with that label (or create it first).
-            # However, we still provide the BIDS SUBJECT directory as the session path, instead of making up a path.
-            # This should be revisited in the future as for these cases the resulting dataset object is not
-            # an exact representation of what's on disk.
-            session_label = (
-                CUSTOM_SESSION_LABEL
-                if session_id.strip() == ""
-                else session_id
-            )
-            session_path = bids_utils.get_session_path(
-                dataset_root=dataset_source_dir,
-                bids_sub_id=bids_sub_id,
-                session_id=session_id,
-            )
-
-            # If a custom Neurobagel-created session already exists (if `bagel derivatives` was run first),
-            # we add to that session when there is no session layer in the BIDS directory
-            if session_label in existing_sessions_dict:
-                existing_img_session = existing_sessions_dict[session_label]
-                existing_img_session.hasAcquisition = image_list
-                existing_img_session.hasFilePath = session_path
-            else:
-                new_imaging_session = models.ImagingSession(
-                    hasLabel=session_label,
-                    hasFilePath=session_path,
-                    hasAcquisition=image_list,
-                )
-                existing_subject.hasSession.append(new_imaging_session)
-
     # NOTE: We currently reuse the context from the input JSONLD instead of regenerating it to avoid
     # asking the user to specify a config for each command.
     # However, this means that we are not fully protected against the (hopefully rare) case where the context has changed between
     # the generation of the input JSONLD and when this command is run (e.g., if the data model underwent an update in the interim).
     # This may be resolved with https://github.com/neurobagel/bagel-cli/issues/492.
-    file_utils.save_jsonld(
-        data=model_utils.dataset_to_jsonld(
-            context={"@context": jsonld_context},
-            dataset=jsonld_dataset,
-        ),
-        filename=output,
+    _save_dataset(
+        dataset=jsonld_dataset,
+        context={"@context": jsonld_context},
+        output=output,
+        deterministic=deterministic,
     )
 
 
@@ -686,9 +677,16 @@ def derivatives(
         file_okay=True,
         dir_okay=False,
         resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
     ),
     overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
     verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
     help_: bool = help_option(),
 ):
     """
@@ -711,90 +709,41 @@ def derivatives(
     )
     logger.info("%-*s%s", width, "Processing status file (.tsv):", tabular)
 
-    status_df = file_utils.load_tabular(
-        tabular, input_type="processing status"
-    )
-
-    # We don't allow empty values in the participant ID column
-    if row_indices := pheno_utils.get_rows_with_empty_strings(
-        status_df, [PROC_STATUS_COLS["participant"]]
-    ):
-        log_error(
-            logger,
-            f"Your processing status file contains missing values in the column '{PROC_STATUS_COLS['participant']}'. "
-            "Please ensure that every row has a non-empty participant id. "
-            f"We found missing values in the following rows (first row is zero): {row_indices}.",
+    with timed_stage("load processing status file") as stage:
+        status_df = file_utils.load_tabular(
+            tabular,
+            input_type="processing status",
+            columns=PROC_STATUS_COLS.values(),
         )
+        stage["rows"] = len(status_df)
 
     known_pipeline_uris, known_pipeline_versions = (
-        derivative_utils.parse_pipeline_catalog(mappings.PIPELINE_CATALOG)
+        derivative_utils.validate_processing_status(status_df)
     )
 
-    derivative_utils.check_at_least_one_pipeline_version_is_recognized(
+    with timed_stage("load JSONLD") as stage:
+        jsonld_context, jsonld_dataset = (
+            model_utils.extract_and_validate_jsonld_dataset(jsonld_path)
+        )
+        stage["subjects"] = len(jsonld_dataset.hasSamples)
+
+    derivative_utils.add_derivatives_to_dataset(
+        dataset=jsonld_dataset,
         status_df=status_df,
         known_pipeline_uris=known_pipeline_uris,
         known_pipeline_versions=known_pipeline_versions,
     )
 
-    jsonld_context, jsonld_dataset = (
-        model_utils.extract_and_validate_jsonld_dataset(jsonld_path)
-    )
-
-    existing_subs_dict = model_utils.get_subject_instances(jsonld_dataset)
-
-    model_utils.confirm_subs_match_pheno_data(
-        subjects=status_df[PROC_STATUS_COLS["participant"]].unique(),
-        subject_source_for_err="processing status file",
-        pheno_subjects=existing_subs_dict.keys(),
-    )
-
-    # Create sub-dataframes for each subject
-    for subject, sub_proc_df in status_df.groupby(
-        PROC_STATUS_COLS["participant"]
-    ):
-        existing_subject = existing_subs_dict[subject]
-
-        # Note: Dictionary of existing imaging sessions can be empty if only bagel pheno was run
-        existing_sessions_dict = model_utils.get_imaging_session_instances(
-            existing_subject
-        )
-
-        for session_label, sub_ses_proc_df in sub_proc_df.groupby(
-            PROC_STATUS_COLS["session"]
-        ):
-            completed_pipelines = derivative_utils.create_completed_pipelines(
-                session_proc_df=sub_ses_proc_df,
-                known_pipeline_uris=known_pipeline_uris,
-                known_pipeline_versions=known_pipeline_versions,
-            )
-
-            if not completed_pipelines:
-                continue
-
-            session_label = (
-                CUSTOM_SESSION_LABEL if session_label == "" else session_label
-            )
-            if session_label in existing_sessions_dict:
-                existing_img_session = existing_sessions_dict[session_label]
-                existing_img_session.hasCompletedPipeline = completed_pipelines
-            else:
-                new_img_session = models.ImagingSession(
-                    hasLabel=session_label,
-                    hasCompletedPipeline=completed_pipelines,
-                )
-                existing_subject.hasSession.append(new_img_session)
-
     # NOTE: We currently reuse the context from the input JSONLD instead of regenerating it to avoid
     # asking the user to specify a config for each command.
     # However, this means that we are not fully protected against the (hopefully rare) case where the context has changed between
     # the generation of the input JSONLD and when this command is run (e.g., if the data model underwent an update in the interim).
     # This may be resolved with https://github.com/neurobagel/bagel-cli/issues/492.
-    file_utils.save_jsonld(
-        data=model_utils.dataset_to_jsonld(
-            context={"@context": jsonld_context},
-            dataset=jsonld_dataset,
-        ),
-        filename=output,
+    _save_dataset(
+        dataset=jsonld_dataset,
+        context={"@context": jsonld_context},
+        output=output,
+        deterministic=deterministic,
     )
 
 
@@ -828,9 +777,15 @@ def harmonize_pheno(
         file_okay=True,
         dir_okay=False,
         resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
     ),
     overwrite: bool = overwrite_option(),
     verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
     help_: bool = help_option(),
 ):
     """
@@ -839,8 +794,12 @@ def harmonize_pheno(
     """
     file_utils.check_overwrite(output, overwrite)
 
-    data_dictionary = file_utils.load_json(dictionary)
-    pheno_df = file_utils.load_tabular(pheno)
+    with timed_stage("load phenotypic inputs") as stage:
+        data_dictionary = file_utils.load_json(dictionary)
+        pheno_df = file_utils.load_tabular(
+            pheno, columns=pheno_utils.get_columns_to_load(data_dictionary)
+        )
+        stage["rows"] = len(pheno_df)
 
     logger.info("Running initial checks of inputs...")
     # NOTE: `width` determines the amount of padding (in num. characters) before the file paths in the print statement.
@@ -848,7 +807,9 @@ def harmonize_pheno(
     width = 26
     logger.info("%-*s%s", width, "Tabular file (.tsv):", pheno)
     logger.info("%-*s%s", width, "Data dictionary (.json):", dictionary)
-    pheno_utils.validate_inputs(data_dictionary, pheno_df)
+    with timed_stage("validate phenotypic inputs") as stage:
+        pheno_utils.validate_inputs(data_dictionary, pheno_df)
+        stage["rows"] = len(pheno_df)
 
     # TODO: Remove once we no longer support annotation tool v1 data dictionaries
     data_dictionary = pheno_utils.convert_transformation_to_format(
@@ -870,13 +831,703 @@ def harmonize_pheno(
             # to avoid duplicate harmonized column names in the output TSV.
             cols_to_harmonize.append(columns[0])
 
-    transformed_rows = []
-    for _, row in pheno_df.iterrows():
-        transformed_row = pheno_utils.get_transformed_row_for_table(
-            cols_to_harmonize, row, data_dictionary, collection_mapping
-        )
-        transformed_rows.append(transformed_row)
-    harmonized_pheno_df = pd.DataFrame(transformed_rows)
+    with timed_stage("harmonize phenotypic data") as stage:
+        transformed_rows = []
+        for _, row in pheno_df.iterrows():
+            transformed_row = pheno_utils.get_transformed_row_for_table(
+                cols_to_harmonize, row, data_dictionary, collection_mapping
+            )
+            transformed_rows.append(transformed_row)
+        harmonized_pheno_df = pd.DataFrame(transformed_rows)
+        stage["rows"] = len(harmonized_pheno_df)
 
-    harmonized_pheno_df.to_csv(output, sep="\t", index=False)
+    with timed_stage("write"):
+        harmonized_pheno_df.to_csv(output, sep="\t", index=False)
     logger.info(f"Saved harmonized table to:  {output}")
+
+
+def _save_dataset(
+    dataset: models.Dataset, context: dict, output: Path, deterministic: bool
+):
+    """Serialize a dataset with the specified JSONLD context and save it to the output .jsonld file."""
+    if deterministic:
+        with timed_stage("canonicalize"):
+            model_utils.canonicalize_dataset(dataset)
+
+    with timed_stage("serialize") as stage:
+        jsonld_data = model_utils.dataset_to_jsonld(
+            context=context, dataset=dataset
+        )
+        stage["subjects"] = len(dataset.hasSamples)
+
+    with timed_stage("write"):
+        file_utils.save_jsonld(data=jsonld_data, filename=output)
+
+
+def _process_dataset(
+    pheno: Path,
+    dictionary: Path,
+    dataset_description: Path,
+    bids_table: Path | None,
+    dataset_source_dir: Path | None,
+    processing_status: Path | None,
+    output: Path,
+    config: str,
+    deterministic: bool,
+    aggregate_acquisitions: bool,
+    show_progress: bool,
+    previous_result: tuple[models.Dataset, dict] | None = None,
+    hash_subjects: bool = False,
+) -> tuple[models.Dataset, dict]:
+    """
+    Create the .jsonld file for a dataset from its phenotypic, and optionally BIDS and processing status, input files,
+    as done by the 'run' command. Return the dataset and the content hash of each subject's inputs (if hash_subjects is set).
+    If a previously returned dataset and subject hashes are provided, unchanged subjects are reused from them.
+    """
+    logger.info("Running initial checks of inputs...")
+    # NOTE: `width` is calculated as = length of the longest string + 2 extra spaces
+    width = 32
+    logger.info("%-*s%s", width, "Tabular file (.tsv):", pheno)
+    logger.info("%-*s%s", width, "Data dictionary (.json):", dictionary)
+    logger.info(
+        "%-*s%s", width, "Dataset description (.json):", dataset_description
+    )
+    if bids_table is not None:
+        logger.info("%-*s%s", width, "BIDS dataset table (.tsv):", bids_table)
+    if processing_status is not None:
+        logger.info(
+            "%-*s%s",
+            width,
+            "Processing status file (.tsv):",
+            processing_status,
+        )
+
+    with timed_stage("load phenotypic inputs") as stage:
+        data_dictionary = file_utils.load_json(dictionary)
+        pheno_df = file_utils.load_tabular(
+            pheno, columns=pheno_utils.get_columns_to_load(data_dictionary)
+        )
+        dataset_metadata = file_utils.load_json(dataset_description)
+        stage["rows"] = len(pheno_df)
+
+    pheno_utils.check_if_remote_config_namespaces_used()
+
+    # Load and validate the optional inputs first, so that we fail early if any of them are invalid
+    if bids_table is not None:
+        with timed_stage("load BIDS table") as stage:
+            bids_dataset = file_utils.load_tabular(
+                bids_table,
+                input_type="BIDS",
+                columns=bids_table_model.model.columns.keys(),
+            )
+            stage["rows"] = len(bids_dataset)
+        bids_dataset, nb_bids_suffix_term_map = bids_utils.prepare_bids_table(
+            bids_dataset, bids_table
+        )
+    if processing_status is not None:
+        with timed_stage("load processing status file") as stage:
+            status_df = file_utils.load_tabular(
+                processing_status,
+                input_type="processing status",
+                columns=PROC_STATUS_COLS.values(),
+            )
+            stage["rows"] = len(status_df)
+        known_pipeline_uris, known_pipeline_versions = (
+            derivative_utils.validate_processing_status(status_df)
+        )
+
+    data_dictionary, validated_description = (
+        pheno_utils.validate_pheno_dataset_inputs(
+            pheno_df, data_dictionary, dataset_metadata, config
+        )
+    )
+    subject_hashes: dict = {}
+    reusable_subjects: dict[str, models.Subject] = {}
+    if hash_subjects:
+        subject_hashes, reusable_subjects = model_utils.hash_subjects(
+            pheno_df, data_dictionary, previous_result=previous_result
+        )
+    dataset = pheno_utils.create_pheno_dataset(
+        pheno_df, data_dictionary, validated_description, reusable_subjects
+    )
+    if bids_table is not None:
+        bids_utils.add_bids_to_dataset(
+            dataset=dataset,
+            bids_dataset=bids_dataset,
+            bids_suffix_term_map=nb_bids_suffix_term_map,
+            dataset_source_dir=dataset_source_dir,
+            show_progress=show_progress,
+            aggregate_acquisitions=aggregate_acquisitions,
+        )
+    if processing_status is not None:
+        logger.info("Processing subject-level derivative metadata...")
+        derivative_utils.add_derivatives_to_dataset(
+            dataset=dataset,
+            status_df=status_df,
+            known_pipeline_uris=known_pipeline_uris,
+            known_pipeline_versions=known_pipeline_versions,
+        )
+
+    _save_dataset(
+        dataset=dataset,
+        context=model_utils.generate_context(config),
+        output=output,
+        deterministic=deterministic,
+    )
+
+    return dataset, subject_hashes
+
+
+@bagel.command()
+def run(
+    pheno: Path = typer.Option(
+        ...,
+        "--pheno",
+        "-t",  # for tabular
+        help="Path to a phenotypic .tsv file",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dictionary: Path = typer.Option(
+        ...,
+        "--dictionary",
+        "-d",
+        help="Path to the .json data dictionary corresponding to the phenotypic .tsv file.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dataset_description: Path = typer.Option(
+        ...,
+        "--dataset-description",
+        "-m",  # for metadata
+        help="Path to a .json file describing the dataset and access information. "
+        "If your dataset is BIDS-compliant, you may reuse the BIDS dataset_description.json here."
+        "See the documentation at https://neurobagel.org/user_guide/dataset_description/",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    bids_table: Path = typer.Option(
+        None,
+        "--bids-table",
+        "-b",
+        help="Path to a .tsv file containing the BIDS metadata for image files including 'sub', 'ses', 'suffix', and 'path' columns. "
+        "This file can be created using the 'bagel bids2tsv' command.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dataset_source_dir: Path = typer.Option(
+        None,
+        "--dataset-source-dir",
+        "-s",
+        callback=bids_utils.check_absolute_path,
+        help="Absolute path to the root directory of the BIDS dataset at the source location/file server. "
+        "If provided, this path will be combined with the subject and session IDs from the BIDS table "
+        "to create absolute source paths to the imaging data for each subject and session.",
+        exists=False,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=False,
+    ),
+    processing_status: Path = typer.Option(
+        None,
+        "--processing-status",
+        help="Path to a .tsv containing subject-level processing pipeline status info. Expected to comply with the Nipoppy processing status file schema.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    output: Path = typer.Option(
+        "dataset.jsonld",
+        "--output",
+        "-o",
+        help="Path to the output .jsonld file.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
+    ),
+    config: str = config_option(),
+    overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
+    aggregate_acquisitions: bool = aggregate_acquisitions_option(),
+    verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
+    help_: bool = help_option(),
+):
+    """
+    Process the phenotypic, and optionally the BIDS and processing pipeline, metadata for a dataset in a single step.
+
+    This command does the same as running 'bagel pheno', followed by 'bagel bids' and/or 'bagel derivatives' if a BIDS table and/or processing status file is provided,
+    but keeps the subject graph data in memory between steps and writes a single .jsonld file. All inputs are checked before any processing starts.
+    """
+    file_utils.check_overwrite(output, overwrite)
+    if processing_status is not None:
+        derivative_utils.check_if_pipeline_catalog_available()
+
+    _process_dataset(
+        pheno=pheno,
+        dictionary=dictionary,
+        dataset_description=dataset_description,
+        bids_table=bids_table,
+        dataset_source_dir=dataset_source_dir,
+        processing_status=processing_status,
+        output=output,
+        config=config,
+        deterministic=deterministic,
+        aggregate_acquisitions=aggregate_acquisitions,
+        show_progress=verbosity != VerbosityLevel.ERROR and is_rich_output(),
+    )
+
+
+@bagel.command()
+def watch(
+    pheno: Path = typer.Option(
+        ...,
+        "--pheno",
+        "-t",  # for tabular
+        help="Path to a phenotypic .tsv file",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dictionary: Path = typer.Option(
+        ...,
+        "--dictionary",
+        "-d",
+        help="Path to the .json data dictionary corresponding to the phenotypic .tsv file.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dataset_description: Path = typer.Option(
+        ...,
+        "--dataset-description",
+        "-m",  # for metadata
+        help="Path to a .json file describing the dataset and access information. "
+        "If your dataset is BIDS-compliant, you may reuse the BIDS dataset_description.json here."
+        "See the documentation at https://neurobagel.org/user_guide/dataset_description/",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    bids_table: Path = typer.Option(
+        None,
+        "--bids-table",
+        "-b",
+        help="Path to a .tsv file containing the BIDS metadata for image files including 'sub', 'ses', 'suffix', and 'path' columns. "
+        "This file can be created using the 'bagel bids2tsv' command.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    dataset_source_dir: Path = typer.Option(
+        None,
+        "--dataset-source-dir",
+        "-s",
+        callback=bids_utils.check_absolute_path,
+        help="Absolute path to the root directory of the BIDS dataset at the source location/file server. "
+        "If provided, this path will be combined with the subject and session IDs from the BIDS table "
+        "to create absolute source paths to the imaging data for each subject and session.",
+        exists=False,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=False,
+    ),
+    processing_status: Path = typer.Option(
+        None,
+        "--processing-status",
+        help="Path to a .tsv containing subject-level processing pipeline status info. Expected to comply with the Nipoppy processing status file schema.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    output: Path = typer.Option(
+        "dataset.jsonld",
+        "--output",
+        "-o",
+        help="Path to the output .jsonld file.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    config: str = config_option(),
+    overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
+    aggregate_acquisitions: bool = aggregate_acquisitions_option(),
+    interval: float = typer.Option(
+        watch_utils.DEFAULT_WATCH_INTERVAL,
+        "--interval",
+        min=0.05,
+        help="Number of seconds between checks of the input files for changes.",
+    ),
+    verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    help_: bool = help_option(),
+):
+    """
+    Watch the input files of a dataset and recreate its .jsonld file whenever any of them change, until stopped with Ctrl+C.
+
+    Each time, this command does the same as 'bagel run', but only the subjects whose phenotypic data or annotations changed are regenerated.
+    Invalid inputs are reported without stopping the command, so they can be fixed and saved again.
+    """
+    file_utils.check_overwrite(output, overwrite)
+    if processing_status is not None:
+        derivative_utils.check_if_pipeline_catalog_available()
+
+    watched_files = [
+        path
+        for path in [
+            pheno,
+            dictionary,
+            dataset_description,
+            bids_table,
+            processing_status,
+        ]
+        if path is not None
+    ]
+    previous_result = None
+    try:
+        for changed_files in watch_utils.watch_files(watched_files, interval):
+            logger.info(
+                f"Input file(s) changed: {[str(path) for path in changed_files]}"
+            )
+            start = time.perf_counter()
+            try:
+                with diagnostics_utils.collect_diagnostics(
+                    diagnostics_utils.get_diagnostics_report_path(output)
+                ):
+                    previous_result = _process_dataset(
+                        pheno=pheno,
+                        dictionary=dictionary,
+                        dataset_description=dataset_description,
+                        bids_table=bids_table,
+                        dataset_source_dir=dataset_source_dir,
+                        processing_status=processing_status,
+                        output=output,
+                        config=config,
+                        deterministic=deterministic,
+                        aggregate_acquisitions=aggregate_acquisitions,
+                        show_progress=False,
+                        previous_result=previous_result,
+                        hash_subjects=True,
+                    )
+                logger.info(
+                    f"Updated {output} in {time.perf_counter() - start:.2f} s."
+                )
+            except typer.Exit:
+                # The reason for the failure has already been logged
+                logger.warning(
+                    f"{output} was not updated because of the error(s) above."
+                )
+            except Exception:
+                # e.g., if an input file could not be read while it was being saved
+                logger.exception(f"Unexpected error while updating {output}.")
+                logger.warning(
+                    f"{output} was not updated because of the error(s) above."
+                )
+            logger.info("Watching the input files for changes...")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching the input files.")
+
+
+@bagel.command()
+def merge(
+    inputs: list[Path] = typer.Option(
+        ...,
+        "--input",
+        "-i",
+        help="Path to a .jsonld file created by the 'pheno', 'bids', 'derivatives' or 'run' command for the dataset. "
+        "Repeat this option for each file to merge, e.g. the outputs of runs on different sites or subsets of the dataset. "
+        "Where files contain different imaging or pipeline metadata for the same session, the file listed later takes precedence.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    output: Path = typer.Option(
+        "merged.jsonld",
+        "--output",
+        "-o",
+        help="Path to the output .jsonld file.",
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        callback=diagnostics_utils.start_diagnostics_report,
+    ),
+    overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
+    verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    trace_memory: bool = trace_memory_option(),
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
+    help_: bool = help_option(),
+):
+    """
+    Combine several .jsonld files for the same dataset into a single .jsonld file.
+
+    Subjects found in several files are combined by session label, in the same way as by the 'bids' and 'derivatives' commands.
+    The input files are read one at a time, so they do not all need to fit in memory at once.
+    """
+    file_utils.check_overwrite(output, overwrite)
+
+    with timed_stage("merge") as stage:
+        context, dataset = merge_utils.merge_jsonld_files(inputs)
+        stage["subjects"] = len(dataset.hasSamples)
+
+    _save_dataset(
+        dataset=dataset,
+        context={"@context": context},
+        output=output,
+        deterministic=deterministic,
+    )
+
+
+def _init_batch_worker(verbosity: VerbosityLevel):
+    """
+    Set up logging in a worker process of the 'batch' command.
+    Workers only write logs to the log file of the dataset being processed,
+    to avoid interleaving console output from datasets processed in parallel.
+    """
+    logger.setLevel(verbosity_log_levels[VerbosityLevel(verbosity)])
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+
+def _process_batch_dataset(
+    dataset: dict,
+    output_dir: Path,
+    config: str,
+    deterministic: bool,
+    aggregate_acquisitions: bool,
+) -> bool:
+    """
+    Create the .jsonld file for a single dataset from a batch manifest, as done by the 'run' command.
+    Return whether the dataset was processed successfully.
+    """
+    output = output_dir / f"{dataset['name']}.jsonld"
+    with (
+        log_to_file(output_dir / f"{dataset['name']}.log"),
+        diagnostics_utils.collect_diagnostics(
+            diagnostics_utils.get_diagnostics_report_path(output)
+        ),
+    ):
+        try:
+            if dataset["status"] is not None:
+                derivative_utils.check_if_pipeline_catalog_available()
+            _process_dataset(
+                pheno=dataset["pheno"],
+                dictionary=dataset["dictionary"],
+                dataset_description=dataset["dataset_description"],
+                bids_table=dataset["bids_table"],
+                dataset_source_dir=dataset["dataset_source_dir"],
+                processing_status=dataset["status"],
+                output=output,
+                config=config,
+                deterministic=deterministic,
+                aggregate_acquisitions=aggregate_acquisitions,
+                # Progress bars of parallel workers would be interleaved
+                show_progress=False,
+            )
+        except typer.Exit:
+            # The reason for the failure has already been logged
+            return False
+        except Exception:
+            logger.exception(
+                f"Unexpected error while processing the dataset '{dataset['name']}'."
+            )
+            return False
+
+    return True
+
+
+@bagel.command()
+def batch(
+    manifest: Path = typer.Option(
+        ...,
+        "--manifest",
+        "-m",
+        help="Path to a .tsv file listing the inputs for each dataset to process, with one row per dataset. "
+        f"Required columns: {batch_utils.REQUIRED_BATCH_MANIFEST_COLS}. "
+        f"Optional columns: {[col for col in BATCH_MANIFEST_COLS.values() if col not in batch_utils.REQUIRED_BATCH_MANIFEST_COLS]}. "
+        "Relative file paths are interpreted relative to the directory containing the manifest.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+    ),
+    output_dir: Path = typer.Option(
+        "batch_output",
+        "--output-dir",
+        "-o",
+        help="Path to the directory in which to save the output .jsonld file and log file for each dataset, "
+        f"named after the value in the '{BATCH_MANIFEST_COLS['name']}' column, and a summary of the batch run ({batch_utils.BATCH_SUMMARY_FILE}).",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        callback=diagnostics_utils.start_output_dir_diagnostics_report,
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of datasets to process in parallel.",
+    ),
+    config: str = config_option(),
+    overwrite: bool = overwrite_option(),
+    deterministic: bool = deterministic_option(),
+    aggregate_acquisitions: bool = aggregate_acquisitions_option(),
+    verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    timings: Path = timings_option(),
+    # NOTE: There is no --trace-memory option, since datasets are processed in separate worker processes
+    # whose memory use cannot be traced from this process. To trace the memory use of processing a single dataset,
+    # use 'bagel run' with --trace-memory.
+    profile: Path = profile_option(),
+    profile_mode: ProfileMode = profile_mode_option(),
+    help_: bool = help_option(),
+):
+    """
+    Process many datasets listed in a manifest file (.tsv) in parallel, creating a single .jsonld file per dataset.
+
+    For each dataset, this command does the same as running 'bagel pheno', followed by 'bagel bids' and/or 'bagel derivatives' if a BIDS table and/or processing status file is listed for the dataset.
+    Logs for each dataset are written to a separate log file in the output directory.
+    """
+    manifest_df = file_utils.load_tabular(
+        manifest,
+        input_type="batch manifest",
+        columns=BATCH_MANIFEST_COLS.values(),
+    )
+    batch_utils.validate_batch_manifest(manifest_df)
+    datasets = batch_utils.get_batch_datasets(manifest_df, manifest.parent)
+
+    for dataset in datasets:
+        file_utils.check_overwrite(
+            output_dir / f"{dataset['name']}.jsonld", overwrite
+        )
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    logger.info(
+        f"Processing {len(datasets)} dataset(s) from {manifest} using {jobs} parallel job(s)..."
+    )
+    dataset_succeeded = {}
+    # Each worker process imports bagel and loads the community configurations and pipeline catalog only once,
+    # and reuses them for every dataset it processes
+    with timed_stage("process datasets") as stage:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_batch_worker,
+            initargs=(verbosity,),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _process_batch_dataset,
+                    dataset,
+                    output_dir,
+                    config,
+                    deterministic,
+                    aggregate_acquisitions,
+                ): dataset["name"]
+                for dataset in datasets
+            }
+            for num_done, future in enumerate(as_completed(futures), start=1):
+                dataset_name = futures[future]
+                try:
+                    dataset_succeeded[dataset_name] = future.result()
+                except Exception as err:
+                    # e.g., if the worker process was killed because it ran out of memory
+                    logger.error(
+                        f"The worker process for the dataset '{dataset_name}' exited unexpectedly: {err!r}"
+                    )
+                    dataset_succeeded[dataset_name] = False
+                logger.info(
+                    f"[{num_done}/{len(datasets)}] Dataset '{dataset_name}': "
+                    f"{'success' if dataset_succeeded[dataset_name] else 'failed'}"
+                )
+        stage["datasets"] = len(datasets)
+
+    summary_df = batch_utils.create_batch_summary(
+        datasets, dataset_succeeded, output_dir
+    )
+    summary_path = output_dir / batch_utils.BATCH_SUMMARY_FILE
+    summary_df.to_csv(summary_path, sep="\t", index=False)
+    logger.info(f"Saved batch summary to:  {summary_path}")
+
+    failed_datasets = [
+        dataset_name
+        for dataset_name, succeeded in dataset_succeeded.items()
+        if not succeeded
+    ]
+    if failed_datasets:
+        log_error(
+            logger,
+            f"{len(failed_datasets)} of {len(datasets)} dataset(s) could not be processed: {failed_datasets}. "
+            f"See the log file for each dataset in {output_dir} for details.",
+        )
+    logger.info(f"All {len(datasets)} dataset(s) processed successfully.")
+
+
+@bagel.command()
+def serve(
+    host: str = typer.Option(
+        "127.0.0.1",
+        "--host",
+        callback=serve_utils.check_loopback_host,
+        help="Loopback address to listen on. Only requests from the same machine are accepted.",
+    ),
+    port: int = typer.Option(
+        8000,
+        "--port",
+        "-p",
+        min=0,
+        max=65535,
+        help="Port to listen on.",
+    ),
+    verbosity: VerbosityLevel = verbosity_option(),
+    log_format: LogFormat = log_format_option(),
+    help_: bool = help_option(),
+):
+    """
+    Run a long-lived local HTTP server that runs CLI commands as jobs, keeping the community configurations,
+    pipeline catalog, vocabularies and validators loaded in memory between jobs.
+
+    Submit a job by sending a POST request to /jobs with a JSON body (and the header Content-Type: application/json) listing the command-line arguments of a command,
+    e.g. {"args": ["pheno", "--pheno", "/data/pheno.tsv", ...]}. The response contains the exit code and logs of the command.
+    The server only listens on a loopback address, since requests are not authenticated, and requests sent from web pages in a browser are rejected.
+    Jobs are run one at a time. Relative paths in the arguments are interpreted relative to the directory the server was started from.
+    """
+    logger.info("Loading vocabularies and validators...")
+    with timed_stage("warm caches"):
+        serve_utils.warm_caches()
+
+    server = serve_utils.create_server(host, port, bagel)
+    logger.info(
+        f"Listening for jobs at http://{host}:{server.server_port}{serve_utils.JOBS_PATH}. Press Ctrl+C to stop."
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping the server.")
+    finally:
+        server.server_close()
@@ -1,18 +1,41 @@
+import json
 import logging
 import sys
+from contextlib import contextmanager
 from enum import Enum
-from typing import NoReturn
+from pathlib import Path
+from typing import Iterator, NoReturn
 
 import typer
+from rich.errors import MarkupError
 from rich.logging import RichHandler
+from rich.text import Text
 
 LOG_FMT = "%(message)s"
+FILE_LOG_FMT = "%(asctime)s %(levelname)-8s %(message)s"
 DATETIME_FMT = "[%Y-%m-%d %X]"
+JSON_DATETIME_FMT = "%Y-%m-%dT%H:%M:%S"
 
 # Check if code is currently running in a test environment
 IS_TESTING = "pytest" in sys.modules
 
 logger = logging.getLogger("bagel.logger")
+# Handler writing logs to the console, replaced whenever the log format is set
+_console_handler: logging.Handler | None = None
+
+
+class LoggedErrorExit(typer.Exit):
+    """
+    Exception raised when the inputs cannot be processed, after an informative message has been logged.
+    It exits the CLI with a non-zero exit code, and is converted to a BagelError by the Python API.
+    """
+
+    def __init__(self, message: str):
+        super().__init__(code=1)
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
 
 
 class VerbosityLevel(str, Enum):
@@ -20,10 +43,18 @@ class VerbosityLevel(str, Enum):
 
     ERROR = "0"
     INFO = "1"
-    # NOTE: We currently do not have any debug logs, but can add them in the future
     DEBUG = "2"
 
 
+class LogFormat(str, Enum):
+    """Enum for the formats of the logs written to the console."""
+
+    AUTO = "auto"
+    RICH = "rich"
+    PLAIN = "plain"
+    JSON = "json"
+
+
 verbosity_log_levels = {
     VerbosityLevel.ERROR: logging.ERROR,
     VerbosityLevel.INFO: logging.INFO,
@@ -31,6 +62,107 @@ verbosity_log_levels = {
 }
 
 
+def render_markup(message: str) -> str:
+    """
+    Return the text of a log message as rendered by Rich, without markup tags and with escaped brackets unescaped.
+    Messages that are not valid markup are returned unchanged.
+    """
+    try:
+        return Text.from_markup(message).plain
+    except MarkupError:
+        return message
+
+
+class PlainFormatter(logging.Formatter):
+    """Format logs as plain text lines, without Rich markup."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        # Only the message can contain markup (the timestamp is also enclosed in brackets)
+        record = logging.makeLogRecord(
+            {**record.__dict__, "message": render_markup(record.message)}
+        )
+        return super().formatMessage(record)
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Format each log as a single-line JSON object, without Rich markup."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "time": self.formatTime(record, JSON_DATETIME_FMT),
+            "level": record.levelname,
+            "message": render_markup(record.getMessage()),
+        }
+        if record.exc_info:
+            log["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log, ensure_ascii=False)
+
+
+class StdoutHandler(logging.StreamHandler):
+    """Handler writing logs to the current stdout, even if it has been replaced since the handler was created (e.g., when output is captured)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def create_console_handler(log_format: LogFormat) -> logging.Handler:
+    """Create a handler writing logs in the specified format to stdout."""
+    if log_format == LogFormat.RICH:
+        handler: logging.Handler = RichHandler(
+            omit_repeated_times=False,
+            show_path=False,
+            rich_tracebacks=True,
+            markup=True,
+        )
+        handler.setFormatter(
+            logging.Formatter(fmt=LOG_FMT, datefmt=DATETIME_FMT)
+        )
+    else:
+        handler = StdoutHandler()
+        if log_format == LogFormat.JSON:
+            handler.setFormatter(JSONLinesFormatter())
+        else:
+            handler.setFormatter(
+                PlainFormatter(fmt=FILE_LOG_FMT, datefmt=DATETIME_FMT)
+            )
+    return handler
+
+
+def is_rich_output() -> bool:
+    """Return whether logs are currently rendered with Rich, and so whether progress bars can be shown."""
+    return _console_handler is None or isinstance(
+        _console_handler, RichHandler
+    )
+
+
+def set_log_format(log_format: LogFormat = LogFormat.AUTO) -> str:
+    """
+    Write console logs in the specified format.
+    In auto mode, logs are rendered with Rich when stdout is an interactive terminal, and written as plain text otherwise
+    (e.g., when the output is redirected to a file).
+    """
+    global _console_handler
+    resolved_format = log_format
+    if log_format == LogFormat.AUTO:
+        resolved_format = (
+            LogFormat.RICH if sys.stdout.isatty() else LogFormat.PLAIN
+        )
+
+    if _console_handler is not None:
+        logger.removeHandler(_console_handler)
+    _console_handler = create_console_handler(resolved_format)
+    _console_handler.setLevel(logger.level)
+    logger.addHandler(_console_handler)
+
+    # NOTE: We must return the value instead of the format itself to avoid the callback returning None (see configure_logger)
+    return log_format.value
+
+
 def configure_logger(
     verbosity: VerbosityLevel = VerbosityLevel.INFO,
 ) -> str:
@@ -38,16 +170,8 @@ def configure_logger(
     level = verbosity_log_levels[verbosity]
 
     # Prevent duplicate handlers when updating the logger
-    if not logger.handlers:
-        handler = RichHandler(
-            omit_repeated_times=False,
-            show_path=False,
-            rich_tracebacks=True,
-            markup=True,
-        )
-        formatter = logging.Formatter(fmt=LOG_FMT, datefmt=DATETIME_FMT)
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+    if _console_handler is None:
+        set_log_format(LogFormat.RICH)
 
     logger.setLevel(level)
     for handler in logger.handlers:
@@ -63,10 +187,70 @@ def configure_logger(
     return verbosity.value
 
 
+@contextmanager
+def restore_log_settings() -> Iterator[None]:
+    """Restore the console log format and the log level to their current settings when the context exits."""
+    global _console_handler
+    console_handler = _console_handler
+    level = logger.level
+    handler_levels = {handler: handler.level for handler in logger.handlers}
+    try:
+        yield
+    finally:
+        if _console_handler is not console_handler:
+            if _console_handler is not None:
+                logger.removeHandler(_console_handler)
+            if console_handler is not None:
+                logger.addHandler(console_handler)
+            _console_handler = console_handler
+        logger.setLevel(level)
+        for handler, handler_level in handler_levels.items():
+            handler.setLevel(handler_level)
+
+
 def log_error(
     logger: logging.Logger,
     message: str,
 ) -> NoReturn:
     """Log an exception with an informative error message, and exit the app."""
     logger.error(message)
-    raise typer.Exit(code=1)
+    raise LoggedErrorExit(message)
+
+
+class ListHandler(logging.Handler):
+    """Handler collecting logs as dictionaries with the same fields as JSON-lines logs."""
+
+    def __init__(self, records: list[dict]):
+        super().__init__()
+        self.records = records
+        self.setFormatter(JSONLinesFormatter())
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(json.loads(self.format(record)))
+
+
+@contextmanager
+def capture_logs() -> Iterator[list[dict]]:
+    """Additionally collect all logs emitted within the context in the yielded list."""
+    records: list[dict] = []
+    handler = ListHandler(records)
+    logger.addHandler(handler)
+    try:
+        yield records
+    finally:
+        logger.removeHandler(handler)
+
+
+@contextmanager
+def log_to_file(log_path: Path) -> Iterator[None]:
+    """Additionally write all logs emitted within the context to the specified file."""
+    handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+    handler.setFormatter(
+        logging.Formatter(fmt=FILE_LOG_FMT, datefmt=DATETIME_FMT)
+    )
+    logger.addHandler(handler)
+    try:
+        yield
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
@@ -1,5 +1,6 @@
-import uuid
-from typing import Annotated, Literal
+import os
+from functools import lru_cache
+from typing import Annotated, Literal, Self
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl
 
@@ -10,6 +11,16 @@ UUID_PATTERN = r"[0-9a-fA-F]{8}\b-[0-9a-fA-F]{4}\b-[0-9a-fA-F]{4}\b-[0-9a-fA-F]{
 BAGEL_UUID_PATTERN = rf"^{NB.pf}:{UUID_PATTERN}"
 
 
+def generate_identifier() -> str:
+    """
+    Return a Neurobagel identifier containing a random (uuid4) string UUID.
+    This is equivalent to str(uuid.uuid4()), but avoids creating a UUID object, which is the most expensive part of creating a graph object.
+    """
+    h = os.urandom(16).hex()
+    # Set the version (4) and variant (RFC 4122) bits of the UUID
+    return f"{NB.pf}:{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+
 class Bagel(BaseModel):
     """identifier has to be a valid UUID prepended by the Neurobagel namespace
     by default, a random (uuid4) string UUID will be created"""
@@ -18,7 +29,7 @@ class Bagel(BaseModel):
         str,
         Field(
             pattern=BAGEL_UUID_PATTERN,
-            default_factory=lambda: NB.pf + ":" + str(uuid.uuid4()),
+            default_factory=generate_identifier,
         ),
     ]
 
@@ -32,6 +43,19 @@ class ControlledTerm(BaseModel):
     identifier: str | HttpUrl
     schemaKey: str
 
+    # Terms are frozen so that the instances shared by interned() cannot be modified
+    model_config = ConfigDict(frozen=True)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def interned(cls, identifier: str) -> Self:
+        """
+        Return a shared instance of the term with the specified identifier.
+        There are only a few distinct terms in a dataset, so sharing them between all sessions saves creating
+        (and storing) an identical instance for each session.
+        """
+        return cls.model_validate({"identifier": identifier})
+
 
 class Sex(ControlledTerm):
     schemaKey: Literal["Sex"] = "Sex"
@@ -55,6 +79,8 @@ class Image(ControlledTerm):
 
 class Acquisition(Bagel):
     hasContrastType: Image
+    # Only set when the image files of a session are aggregated into one acquisition per contrast type
+    hasFileCount: int | None = None
     schemaKey: Literal["Acquisition"] = "Acquisition"
 
 
@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import pandas as pd
+from typer import BadParameter
+
+from bagel.logger import log_error, logger
+from bagel.utilities import bids_utils, diagnostics_utils, pheno_utils
+
+# Shorthands for expected column names in a batch manifest file
+BATCH_MANIFEST_COLS = {
+    "name": "dataset_name",
+    "pheno": "pheno",
+    "dictionary": "dictionary",
+    "dataset_description": "dataset_description",
+    "bids_table": "bids_table",
+    "dataset_source_dir": "dataset_source_dir",
+    "status": "processing_status",
+}
+REQUIRED_BATCH_MANIFEST_COLS = [
+    BATCH_MANIFEST_COLS["name"],
+    BATCH_MANIFEST_COLS["pheno"],
+    BATCH_MANIFEST_COLS["dictionary"],
+    BATCH_MANIFEST_COLS["dataset_description"],
+]
+BATCH_SUMMARY_FILE = "batch_summary.tsv"
+# Manifest columns containing paths to input files for the CLI,
+# which are resolved relative to the manifest location when not absolute
+BATCH_MANIFEST_FILE_COLS = [
+    "pheno",
+    "dictionary",
+    "dataset_description",
+    "bids_table",
+    "status",
+]
+
+
+def validate_batch_manifest(manifest_df: pd.DataFrame):
+    """
+    Log an error if the batch manifest is missing required columns, has empty values in required columns,
+    or does not have unique dataset names.
+    """
+    if missing_cols := [
+        col
+        for col in REQUIRED_BATCH_MANIFEST_COLS
+        if col not in manifest_df.columns
+    ]:
+        log_error(
+            logger,
+            f"The batch manifest is missing the following required columns: {missing_cols}. "
+            f"Expected columns are: {list(BATCH_MANIFEST_COLS.values())} "
+            f"(required: {REQUIRED_BATCH_MANIFEST_COLS}).",
+        )
+
+    if row_indices := pheno_utils.get_rows_with_empty_strings(
+        manifest_df, REQUIRED_BATCH_MANIFEST_COLS
+    ):
+        diagnostics_utils.record_diagnostic(
+            "missing values in the batch manifest (header row is 1)",
+            rows=row_indices,
+        )
+        log_error(
+            logger,
+            f"The batch manifest contains missing values in required columns {REQUIRED_BATCH_MANIFEST_COLS}. "
+            f"Missing values were found in these rows (header row is 1): {diagnostics_utils.summarize_items(row_indices)}.",
+        )
+
+    duplicate_names = manifest_df[BATCH_MANIFEST_COLS["name"]][
+        manifest_df[BATCH_MANIFEST_COLS["name"]].duplicated()
+    ]
+    if not duplicate_names.empty:
+        log_error(
+            logger,
+            f"The batch manifest contains duplicate values in the column '{BATCH_MANIFEST_COLS['name']}': {duplicate_names.unique().tolist()}. "
+            "Each dataset name is used to name the output files for the dataset, and so must be unique.",
+        )
+
+    invalid_names = manifest_df[BATCH_MANIFEST_COLS["name"]][
+        manifest_df[BATCH_MANIFEST_COLS["name"]].str.contains(r"[/\\]")
+    ]
+    if not invalid_names.empty:
+        log_error(
+            logger,
+            f"The batch manifest contains dataset names with path separators in the column '{BATCH_MANIFEST_COLS['name']}': {invalid_names.tolist()}. "
+            "Each dataset name is used to name the output files for the dataset, and so must be a valid file name.",
+        )
+
+
+def get_batch_datasets(
+    manifest_df: pd.DataFrame, manifest_dir: Path
+) -> list[dict]:
+    """
+    Return the inputs for each dataset listed in a validated batch manifest as a dictionary,
+    where keys are the shorthands for the manifest columns and values are the dataset name and input paths.
+    Optional inputs that are not provided for a dataset are set to None.
+    Log an error if any of the listed input files do not exist.
+    """
+    datasets = []
+    missing_files = []
+    for _, row in manifest_df.iterrows():
+        dataset: dict[str, str | Path | None] = {
+            "name": row[BATCH_MANIFEST_COLS["name"]]
+        }
+        for col_shorthand in BATCH_MANIFEST_FILE_COLS:
+            value = row.get(BATCH_MANIFEST_COLS[col_shorthand], "").strip()
+            if value == "":
+                dataset[col_shorthand] = None
+                continue
+            file_path = manifest_dir / value
+            if not file_path.is_file():
+                missing_files.append(str(file_path))
+            dataset[col_shorthand] = file_path.resolve()
+
+        # The dataset source directory refers to a location on the data source server,
+        # so we do not resolve it or check that it exists on the current machine
+        source_dir = row.get(
+            BATCH_MANIFEST_COLS["dataset_source_dir"], ""
+        ).strip()
+        try:
+            dataset["dataset_source_dir"] = bids_utils.check_absolute_path(
+                Path(source_dir) if source_dir else None
+            )
+        except BadParameter as err:
+            log_error(
+                logger,
+                f"Invalid value in the column '{BATCH_MANIFEST_COLS['dataset_source_dir']}' "
+                f"for the dataset '{dataset['name']}': {err.message}",
+            )
+        datasets.append(dataset)
+
+    if missing_files:
+        log_error(
+            logger,
+            f"The following input files listed in the batch manifest do not exist: {missing_files}. "
+            "Relative paths in the batch manifest are interpreted relative to the directory containing the manifest.",
+        )
+
+    return datasets
+
+
+def create_batch_summary(
+    datasets: list[dict], dataset_succeeded: dict[str, bool], output_dir: Path
+) -> pd.DataFrame:
+    """
+    Return a table summarizing the outcome of a batch run, with one row per dataset (in manifest order)
+    listing whether the dataset was processed successfully and the paths to its output and log files.
+    """
+    summary_rows = []
+    for dataset in datasets:
+        succeeded = dataset_succeeded.get(dataset["name"], False)
+        summary_rows.append(
+            {
+                BATCH_MANIFEST_COLS["name"]: dataset["name"],
+                "status": "success" if succeeded else "failed",
+                "output": (
+                    str(output_dir / f"{dataset['name']}.jsonld")
+                    if succeeded
+                    else ""
+                ),
+                "log": str(output_dir / f"{dataset['name']}.log"),
+            }
+        )
+
+    return pd.DataFrame(summary_rows)
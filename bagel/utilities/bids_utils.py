@@ -1,3 +1,4 @@
+from collections import Counter
 from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
@@ -5,11 +6,13 @@ from typing import Iterable
 import bidsschematools.schema as bst
 import pandas as pd
 import pandera.pandas as pa
+from rich.progress import track
 from typer import BadParameter
 
-from bagel import bids_table_model, models
+from bagel import bids_table_model, mappings, models
 from bagel.logger import log_error, logger
-from bagel.utilities import file_utils
+from bagel.utilities import diagnostics_utils, file_utils, model_utils
+from bagel.utilities.timing_utils import timed_stage
 
 # NOTE: A copy of the imaging modality vocab will likely end up in all community config directories,
 # but since the contents will be the same, we always pull it from the Neurobagel config for now for simplicity.
@@ -22,10 +25,12 @@ IMAGING_MODALITIES_PATH = (
 bids_schema = bst.load_schema()
 
 
+@lru_cache()
 def get_bids_suffix_to_std_term_mapping() -> dict[str, str]:
     """
     Fetch the standardized imaging modality vocabulary from the neurobagel/communities repository
     and return a mapping of supported BIDS suffixes to prefixed standardized terms.
+    The vocabulary is only fetched once per process, and the returned mapping must not be modified.
 
     Returns:
         dict[str, str]: A mapping where keys are BIDS suffixes (e.g., "T1w", "bold")
@@ -108,6 +113,33 @@ def partition_suffixes(
     return in_reference, not_in_reference
 
 
+def format_indexed_bids_table(
+    dataset_df: pd.DataFrame,
+    supported_suffixes: Iterable[str],
+    strip_id_prefixes: bool = False,
+) -> pd.DataFrame:
+    """
+    Format a BIDS dataset indexed by bids2table as a BIDS metadata table,
+    keeping only the files with the specified suffixes and the subject, session, suffix and absolute path of each file.
+    """
+    dataset_df = dataset_df[
+        dataset_df["suffix"].isin(supported_suffixes)
+    ].copy()
+
+    dataset_df["path"] = dataset_df.apply(
+        lambda row: (Path(row["root"]) / row["path"]).as_posix(), axis=1
+    )
+    dataset_df = dataset_df[["sub", "ses", "suffix", "path"]]
+
+    # bids2table returns the IDs without the 'sub-' and 'ses-' prefixes by default
+    if not strip_id_prefixes:
+        dataset_df["sub"] = dataset_df["sub"].apply(lambda id: f"sub-{id}")
+        dataset_df["ses"] = dataset_df["ses"].apply(
+            lambda id: f"ses-{id}" if pd.notna(id) else id
+        )
+    return dataset_df
+
+
 def check_absolute_path(dir_path: Path | None) -> Path | None:
     """
     Raise an error if the input path does not look like an absolute path.
@@ -133,7 +165,12 @@ def validate_bids_table(bids_table: pd.DataFrame):
         # When validation fails due to a column value check (e.g., as opposed to a missing column),
         # printing the row indices helps with debugging, especially for invalid empty values.
         if isinstance(err.failure_cases, pd.DataFrame):
-            rows_with_errs_msg = f"Rows with error (0 = first non-header row): {err.failure_cases['index'].tolist()}. "
+            rows_with_errs = err.failure_cases["index"].tolist()
+            diagnostics_utils.record_diagnostic(
+                "invalid values in the BIDS table (0 = first non-header row)",
+                rows=rows_with_errs,
+            )
+            rows_with_errs_msg = f"Rows with error (0 = first non-header row): {diagnostics_utils.summarize_items(rows_with_errs)}. "
         log_error(
             logger,
             f"Invalid BIDS table. Error: {err}. {rows_with_errs_msg}",
@@ -148,8 +185,27 @@ def validate_bids_table(bids_table: pd.DataFrame):
 def create_acquisitions(
     session_df: pd.DataFrame,
     bids_suffix_term_map: dict,
+    aggregate: bool = False,
 ) -> list:
-    """Parses BIDS image file suffixes for a specified session to create a list of Acquisition objects."""
+    """
+    Parses BIDS image file suffixes for a specified session to create a list of Acquisition objects.
+    If aggregate is True, a single Acquisition with the number of image files is created for each distinct contrast type.
+    """
+    if aggregate:
+        file_counts = Counter(
+            mapped_term
+            for bids_file_suffix in session_df["suffix"]
+            if (mapped_term := bids_suffix_term_map.get(bids_file_suffix))
+            is not None
+        )
+        return [
+            models.Acquisition(
+                hasContrastType=models.Image.interned(mapped_term),
+                hasFileCount=file_count,
+            )
+            for mapped_term, file_count in file_counts.items()
+        ]
+
     image_list = []
 
     for bids_file_suffix in session_df["suffix"]:
@@ -158,7 +214,7 @@ def create_acquisitions(
         ) is not None:
             image_list.append(
                 models.Acquisition(
-                    hasContrastType=models.Image(identifier=mapped_term)
+                    hasContrastType=models.Image.interned(mapped_term)
                 )
             )
 
@@ -181,3 +237,158 @@ def get_session_path(
         subject_path / session_id if session_id.strip() != "" else subject_path
     )
     return session_path.as_posix()
+
+
+def add_imaging_sessions(
+    subjects: dict[str, models.Subject],
+    bids_df: pd.DataFrame,
+    bids_suffix_term_map: dict,
+    dataset_source_dir: Path | None,
+    show_progress: bool = True,
+    aggregate_acquisitions: bool = False,
+):
+    """
+    Add the image acquisitions for each subject-session in a validated BIDS table to the imaging sessions
+    of the corresponding existing subjects, creating the imaging sessions where they do not exist yet.
+    If aggregate_acquisitions is True, each session gets one acquisition per distinct contrast type instead of one per image file.
+    """
+    for bids_sub_id in track(
+        bids_df["sub"].unique(),
+        description="Processing BIDS subjects...",
+        disable=not show_progress,
+    ):
+        _bids_sub = bids_df[bids_df["sub"] == bids_sub_id]
+        existing_subject = subjects[bids_sub_id]
+        existing_sessions_dict = model_utils.get_imaging_session_instances(
+            existing_subject
+        )
+
+        bids_sessions = list(_bids_sub["ses"].unique())
+        # TODO: Do we need to explicitly preprocess cases where ses values are other types of whitespace?
+        # Ensure the sessions are in alphanumeric order for readability
+        for session_id in sorted(bids_sessions):
+            _bids_session = _bids_sub[_bids_sub["ses"] == session_id]
+            image_list = create_acquisitions(
+                session_df=_bids_session,
+                bids_suffix_term_map=bids_suffix_term_map,
+                aggregate=aggregate_acquisitions,
+            )
+
+            if not image_list:
+                continue
+
+            # TODO: Currently if a subject has BIDS data but no "ses-" directories (e.g., only 1 session),
+            # we create a session with a fixed, but unusual CUSTOM_SESSION_LABEL
+            # and add the imaging data info to a session with that label (or create it first).
+            # However, we still provide the BIDS SUBJECT directory as the session path, instead of making up a path.
+            # This should be revisited in the future as for these cases the resulting dataset object is not
+            # an exact representation of what's on disk.
+            session_label = (
+                mappings.CUSTOM_SESSION_LABEL
+                if session_id.strip() == ""
+                else session_id
+            )
+            session_path = get_session_path(
+                dataset_root=dataset_source_dir,
+                bids_sub_id=bids_sub_id,
+                session_id=session_id,
+            )
+
+            # If a custom Neurobagel-created session already exists (if `bagel derivatives` was run first),
+            # we add to that session when there is no session layer in the BIDS directory
+            if session_label in existing_sessions_dict:
+                existing_img_session = existing_sessions_dict[session_label]
+                existing_img_session.hasAcquisition = image_list
+                existing_img_session.hasFilePath = session_path
+            else:
+                new_imaging_session = models.ImagingSession(
+                    hasLabel=session_label,
+                    hasFilePath=session_path,
+                    hasAcquisition=image_list,
+                )
+                existing_subject.hasSession.append(new_imaging_session)
+
+
+def prepare_bids_table(
+    bids_dataset: pd.DataFrame, bids_table: Path | str
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Remove records with suffixes unsupported by Neurobagel from a loaded BIDS table and validate the remaining records.
+    Return the validated BIDS table and the mapping of supported BIDS suffixes to Neurobagel imaging modality terms.
+    """
+    with timed_stage("fetch imaging modality vocabulary"):
+        nb_bids_suffix_term_map = get_bids_suffix_to_std_term_mapping()
+
+    with timed_stage("validate BIDS table") as stage:
+        # NOTE: The BIDS table model validation will check for required columns and for empty values in the "suffix" column
+        # and error out for any problem. Because we want to ignore unsupported suffixes with a warning instead of a validation error,
+        # we check the suffix column separately here and then remove any offending values.
+        # For our custom suffix-check to work, we need to ensure that the "suffix" column exists here.
+        if "suffix" in bids_dataset.columns:
+            # We assume that most input BIDS TSVs will have been generated by the 'bids2tsv' command,
+            # so we only log a generic warning here for any suffixes found in the table that are not supported by Neurobagel
+            neurobagel_supported_suffixes, neurobagel_unsupported_suffixes = (
+                partition_suffixes(
+                    suffixes=bids_dataset["suffix"],
+                    reference_suffixes=nb_bids_suffix_term_map.keys(),
+                )
+            )
+            if not neurobagel_supported_suffixes:
+                log_error(
+                    logger,
+                    f"No Neurobagel-supported BIDS suffixes found in BIDS table 'suffix' column: {bids_table}. "
+                    "No imaging metadata could be added to the subject graph data. "
+                    "Please ensure your dataset includes at least one image file with a Neurobagel-supported BIDS suffix "
+                    f"(supported suffixes: {list(nb_bids_suffix_term_map.keys())}).",
+                )
+            if neurobagel_unsupported_suffixes:
+                logger.warning(
+                    f"BIDS table 'suffix' column contains file suffixes unsupported by Neurobagel: {list(neurobagel_unsupported_suffixes)}. "
+                    f"These records will be ignored. Supported file suffixes: {list(nb_bids_suffix_term_map.keys())}."
+                )
+
+            bids_dataset = bids_dataset[
+                bids_dataset["suffix"].isin(neurobagel_supported_suffixes)
+            ].copy()
+
+        validate_bids_table(bids_dataset)
+        stage["rows"] = len(bids_dataset)
+
+    return bids_dataset, nb_bids_suffix_term_map
+
+
+def add_bids_to_dataset(
+    dataset: models.Dataset,
+    bids_dataset: pd.DataFrame,
+    bids_suffix_term_map: dict,
+    dataset_source_dir: Path | None,
+    show_progress: bool,
+    aggregate_acquisitions: bool,
+):
+    """Merge the imaging metadata from a validated BIDS table into the existing subjects of a dataset."""
+    existing_subs_dict = model_utils.get_subject_instances(dataset)
+
+    model_utils.confirm_subs_match_pheno_data(
+        subjects=bids_dataset["sub"].unique(),
+        subject_source_for_err="BIDS dataset file",
+        pheno_subjects=existing_subs_dict.keys(),
+    )
+
+    logger.info("Initial checks of inputs passed.")
+
+    logger.info(
+        "Subject metadata for the following Neurobagel-supported imaging modalities "
+        f"will be added to the subject graph data: {list(bids_dataset['suffix'].unique())}"
+    )
+
+    logger.info("Merging BIDS metadata with existing subject annotations...")
+    with timed_stage("add imaging sessions") as stage:
+        add_imaging_sessions(
+            subjects=existing_subs_dict,
+            bids_df=bids_dataset,
+            bids_suffix_term_map=bids_suffix_term_map,
+            dataset_source_dir=dataset_source_dir,
+            show_progress=show_progress,
+            aggregate_acquisitions=aggregate_acquisitions,
+        )
+        stage["rows"] = len(bids_dataset)
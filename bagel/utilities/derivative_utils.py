@@ -1,9 +1,12 @@
+from functools import lru_cache
 from typing import Iterable
 
 import pandas as pd
 
 from bagel import mappings, models
 from bagel.logger import log_error, logger
+from bagel.utilities import diagnostics_utils, model_utils, pheno_utils
+from bagel.utilities.timing_utils import timed_stage
 
 # Shorthands for expected column names in a Nipoppy processing status file
 # TODO: While there are multiple session ID columns in a Nipoppy processing status file,
@@ -53,6 +56,12 @@ def parse_pipeline_catalog(pipeline_catalog: list) -> tuple[dict, dict]:
     return pipeline_uris, pipeline_versions
 
 
+@lru_cache()
+def get_pipeline_catalog() -> tuple[dict, dict]:
+    """Return the pipeline URIs and supported versions in the loaded pipeline catalog, parsed only once."""
+    return parse_pipeline_catalog(mappings.PIPELINE_CATALOG)
+
+
 def get_recognized_pipelines(
     pipelines: Iterable[str], known_pipeline_uris: dict
 ) -> list:
@@ -178,11 +187,119 @@ def create_completed_pipelines(
             == "success"
         ).all():
             completed_pipeline = models.CompletedPipeline(
-                hasPipelineName=models.Pipeline(
-                    identifier=known_pipeline_uris[pipeline]
+                hasPipelineName=models.Pipeline.interned(
+                    known_pipeline_uris[pipeline]
                 ),
                 hasPipelineVersion=version,
             )
             completed_pipelines.append(completed_pipeline)
 
     return completed_pipelines
+
+
+def add_completed_pipelines(
+    subjects: dict[str, models.Subject],
+    status_df: pd.DataFrame,
+    known_pipeline_uris: dict,
+    known_pipeline_versions: dict,
+):
+    """
+    Add the completed pipelines for each subject-session in a validated processing status table to the imaging sessions
+    of the corresponding existing subjects, creating the imaging sessions where they do not exist yet.
+    """
+    # Create sub-dataframes for each subject
+    for subject, sub_proc_df in status_df.groupby(
+        PROC_STATUS_COLS["participant"]
+    ):
+        existing_subject = subjects[subject]
+
+        # Note: Dictionary of existing imaging sessions can be empty if only bagel pheno was run
+        existing_sessions_dict = model_utils.get_imaging_session_instances(
+            existing_subject
+        )
+
+        for session_label, sub_ses_proc_df in sub_proc_df.groupby(
+            PROC_STATUS_COLS["session"]
+        ):
+            completed_pipelines = create_completed_pipelines(
+                session_proc_df=sub_ses_proc_df,
+                known_pipeline_uris=known_pipeline_uris,
+                known_pipeline_versions=known_pipeline_versions,
+            )
+
+            if not completed_pipelines:
+                continue
+
+            session_label = (
+                mappings.CUSTOM_SESSION_LABEL
+                if session_label == ""
+                else session_label
+            )
+            if session_label in existing_sessions_dict:
+                existing_img_session = existing_sessions_dict[session_label]
+                existing_img_session.hasCompletedPipeline = completed_pipelines
+            else:
+                new_img_session = models.ImagingSession(
+                    hasLabel=session_label,
+                    hasCompletedPipeline=completed_pipelines,
+                )
+                existing_subject.hasSession.append(new_img_session)
+
+
+def validate_processing_status(status_df: pd.DataFrame) -> tuple[dict, dict]:
+    """
+    Validate a loaded processing status file against the pipeline catalog.
+    Return the URIs and versions of the pipelines in the catalog.
+    """
+    # We don't allow empty values in the participant ID column
+    if row_indices := pheno_utils.get_rows_with_empty_strings(
+        status_df, [PROC_STATUS_COLS["participant"]]
+    ):
+        diagnostics_utils.record_diagnostic(
+            "missing participant IDs in the processing status file (first row is zero)",
+            rows=row_indices,
+        )
+        log_error(
+            logger,
+            f"Your processing status file contains missing values in the column '{PROC_STATUS_COLS['participant']}'. "
+            "Please ensure that every row has a non-empty participant id. "
+            f"We found missing values in the following rows (first row is zero): {diagnostics_utils.summarize_items(row_indices)}.",
+        )
+
+    with timed_stage("load pipeline catalog"):
+        known_pipeline_uris, known_pipeline_versions = get_pipeline_catalog()
+
+    with timed_stage("validate processing status file") as stage:
+        check_at_least_one_pipeline_version_is_recognized(
+            status_df=status_df,
+            known_pipeline_uris=known_pipeline_uris,
+            known_pipeline_versions=known_pipeline_versions,
+        )
+        stage["rows"] = len(status_df)
+
+    return known_pipeline_uris, known_pipeline_versions
+
+
+def add_derivatives_to_dataset(
+    dataset: models.Dataset,
+    status_df: pd.DataFrame,
+    known_pipeline_uris: dict,
+    known_pipeline_versions: dict,
+):
+    """Merge the completed pipelines from a validated processing status file into the existing subjects of a dataset."""
+    existing_subs_dict = model_utils.get_subject_instances(dataset)
+
+    model_utils.confirm_subs_match_pheno_data(
+        subjects=status_df[PROC_STATUS_COLS["participant"]].unique(),
+        subject_source_for_err="processing status file",
+        pheno_subjects=existing_subs_dict.keys(),
+    )
+
+    with timed_stage("add completed pipelines") as stage:
+        add_completed_pipelines(
+            subjects=existing_subs_dict,
+            status_df=status_df,
+            known_pipeline_uris=known_pipeline_uris,
+            known_pipeline_versions=known_pipeline_versions,
+        )
+        stage["rows"] = len(status_df)
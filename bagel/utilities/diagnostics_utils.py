@@ -0,0 +1,114 @@
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import typer
+
+from bagel.logger import logger
+
+DIAGNOSTICS_REPORT_FILE_SUFFIX = ".diagnostics.json"
+# Name of the diagnostics report saved inside the output directory of a command (e.g., 'batch'),
+# which cannot clash with the report saved for an output file in the directory
+OUTPUT_DIR_DIAGNOSTICS_REPORT_FILE = "diagnostics.json"
+# Maximum number of values or rows listed in a single message, to keep messages about large inputs readable
+MAX_LISTED_ITEMS = 10
+
+# Problems found in the inputs of the current command, only collected when a diagnostics report will be saved
+_diagnostics: list[dict] | None = None
+
+
+def get_diagnostics_report_path(output: Path) -> Path:
+    """Return the path of the diagnostics report saved alongside the output of a command."""
+    return output.with_suffix(DIAGNOSTICS_REPORT_FILE_SUFFIX)
+
+
+def record_diagnostic(problem: str, **details: list | dict):
+    """Record the complete offending values or rows of a problem found in the inputs, to save to the diagnostics report."""
+    if _diagnostics is not None:
+        _diagnostics.append({"problem": problem, **details})
+
+
+def summarize_items(items: Iterable) -> str:
+    """
+    Format a list of values or rows for a message, listing at most MAX_LISTED_ITEMS of them.
+    For a dictionary of lists (e.g., values by column), each list is shortened.
+    """
+    if isinstance(items, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{key!r}: {summarize_items(values)}"
+                for key, values in items.items()
+            )
+            + "}"
+        )
+
+    items = list(items)
+    if len(items) <= MAX_LISTED_ITEMS:
+        return str(items)
+    summary = (
+        f"{items[:MAX_LISTED_ITEMS]} (and {len(items) - MAX_LISTED_ITEMS} more"
+    )
+    if _diagnostics is not None:
+        summary += ", see the diagnostics report for all"
+    return summary + ")"
+
+
+def save_diagnostics_report(report_path: Path, diagnostics: list[dict]):
+    # The output directory may not have been created yet if the command failed early
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"diagnostics": diagnostics}, f, indent=2, default=str)
+    logger.info(f"Saved full details of the problems found to:  {report_path}")
+
+
+@contextmanager
+def collect_diagnostics(report_path: Path) -> Iterator[None]:
+    """
+    Save the problems found in the inputs within the context to the specified .json file, if there are any.
+    If no problems are found and the context completes without an error, any report left by an earlier run is removed.
+    """
+    global _diagnostics
+    previous_diagnostics = _diagnostics
+    _diagnostics = []
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        diagnostics, _diagnostics = _diagnostics, previous_diagnostics
+        if diagnostics:
+            save_diagnostics_report(report_path, diagnostics)
+        elif not failed:
+            report_path.unlink(missing_ok=True)
+
+
+def start_diagnostics_report(ctx: typer.Context, output: Path) -> Path:
+    """
+    Collect the problems found in the inputs for the rest of the command, and save them alongside the output
+    when the command finishes. This is mainly useful when the command exits with an error.
+    """
+    if not ctx.resilient_parsing:
+        ctx.with_resource(
+            collect_diagnostics(get_diagnostics_report_path(output))
+        )
+    return output
+
+
+def start_output_dir_diagnostics_report(
+    ctx: typer.Context, output_dir: Path
+) -> Path:
+    """
+    Collect the problems found in the inputs for the rest of a command that saves its outputs to a directory,
+    and save them inside the output directory when the command finishes.
+    """
+    if not ctx.resilient_parsing:
+        ctx.with_resource(
+            collect_diagnostics(
+                output_dir / OUTPUT_DIR_DIAGNOSTICS_REPORT_FILE
+            )
+        )
+    return output_dir
@@ -1,13 +1,22 @@
+import csv
 import json
+import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import httpx
 import pandas as pd
+import pyarrow as pa
 import typer
+from pyarrow import csv as pa_csv
 
 from ..logger import log_error, logger
 
+# Error raised by the pyarrow CSV reader for rows with a different number of values than the header
+SHORT_ROW_ERROR_PATTERN = re.compile(
+    r"Expected (?P<expected>\d+) columns, got (?P<got>\d+)"
+)
+
 
 def file_encoding_error_message(input_p: Path) -> str:
     """Return a message for when a file cannot be read due to encoding issues."""
@@ -18,31 +27,115 @@ def file_encoding_error_message(input_p: Path) -> str:
     )
 
 
+def read_tsv_header(input_p: Path) -> list[str]:
+    """Return the column names in the header row of a .tsv file as they are written, including any duplicates."""
+    # NOTE: pandas renames duplicate column names (e.g., "a" to "a.1"), so we parse the header row ourselves
+    with open(input_p, "r", encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f, delimiter="\t"), [])
+
+
+def read_tsv_as_strings(
+    input_p: Path, header: list[str], columns: list[str]
+) -> pd.DataFrame:
+    """
+    Read the specified columns of a .tsv file with the pyarrow CSV reader, keeping all values
+    (including empty cells) as Arrow-backed strings.
+    Rows with fewer values than the header are padded with empty strings, as when reading the table with pandas.
+
+    NOTE: We call pyarrow directly rather than using pandas' "pyarrow" engine because the latter
+    always infers column types (e.g., turning "007" into 7 or "false" into "False"), even when a string dtype is requested.
+    """
+    if not columns:
+        # NOTE: pyarrow reads all columns when given an empty list of columns to include
+        return pd.DataFrame()
+
+    try:
+        table = pa_csv.read_csv(
+            input_p,
+            parse_options=pa_csv.ParseOptions(delimiter="\t"),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in header},
+                include_columns=columns,
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except pa.ArrowInvalid as err:
+        # pyarrow cannot pad short rows, so we fall back to the slower pandas reader for these tables
+        if not (
+            (match := SHORT_ROW_ERROR_PATTERN.search(str(err)))
+            and int(match["got"]) < int(match["expected"])
+        ):
+            raise
+        return pd.read_csv(
+            input_p,
+            sep="\t",
+            keep_default_na=False,
+            dtype=str,
+            encoding="utf-8",
+            usecols=columns,
+        ).astype(pd.StringDtype("pyarrow"))
+
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get
+    )
+
+
 # TODO: Consider adding a function parameter to allow enabling `keep_default_na`.
 # For some tables the CLI reads (e.g., BIDS tables), parsing empty strings as NaN is useful
 # and saves us from needing additional custom string validation to catch empty cells.
 # See https://github.com/neurobagel/bagel-cli/issues/505
 def load_tabular(
-    input_p: Path, input_type: str = "phenotypic"
+    input_p: Path,
+    input_type: str = "phenotypic",
+    columns: Iterable[str] | None = None,
 ) -> pd.DataFrame:
-    """Load a .tsv pheno file and do some basic validation of the file type."""
+    """
+    Load a .tsv pheno file and do some basic validation of the file type.
+
+    If `columns` is provided, only the columns in that collection that are present in the table are read.
+    Any requested column that is missing from the table is left for the caller to report.
+    """
     if input_p.suffix == ".tsv":
         try:
-            tabular_df = pd.read_csv(
-                input_p,
-                sep="\t",
-                keep_default_na=False,
-                dtype=str,
-                encoding="utf-8",
-            )
+            # Read only the header first so that we can check the shape of the table
+            # and restrict the full read to the columns we actually need
+            header = read_tsv_header(input_p)
+            if len(header) > 1:
+                columns_to_read = header
+                if columns is not None:
+                    requested_columns = set(columns)
+                    columns_to_read = [
+                        col for col in header if col in requested_columns
+                    ]
+                if duplicate_columns := sorted(
+                    {col for col in columns_to_read if header.count(col) > 1}
+                ):
+                    log_error(
+                        logger,
+                        f"The {input_type} table {input_p} contains duplicate column names: {duplicate_columns}. "
+                        "Please ensure that every column in the header row has a unique name.",
+                    )
+                return read_tsv_as_strings(
+                    input_p, header=header, columns=columns_to_read
+                )
         except UnicodeDecodeError:
             log_error(
                 logger,
                 file_encoding_error_message(input_p),
             )
-
-        if tabular_df.shape[1] > 1:
-            return tabular_df
+        except pa.ArrowInvalid as err:
+            if "UTF8" in str(err):
+                log_error(
+                    logger,
+                    file_encoding_error_message(input_p),
+                )
+            log_error(
+                logger,
+                f"Failed to parse the {input_type} table {input_p}. "
+                "Please ensure that every row has the same number of tab-separated values as the header row. "
+                f"Error: {err}",
+            )
 
         # If we have only one column, but splitting by ',' gives us several elements
         # then there is a good chance the user accidentally renamed a .csv into .tsv
@@ -56,7 +149,7 @@ def load_tabular(
             logger,
             f"{input_p} is not a valid Neurobagel {input_type} table (.tsv). "
             "This file is expected to have multiple columns but only one column was found. "
-            f"\n{note_misnamed_csv if len(tabular_df.columns[0].split(',')) > 1 else ''}",
+            f"\n{note_misnamed_csv if header and len(header[0].split(',')) > 1 else ''}",
         )
 
     log_error(
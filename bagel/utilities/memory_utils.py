@@ -0,0 +1,163 @@
+import os
+import threading
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+import typer
+
+MB = 1024 * 1024
+# Seconds between two measurements of the resident set size (RSS) of the process during a stage
+RSS_SAMPLING_INTERVAL = 0.01
+# Name of the background thread that samples the RSS during a stage
+RSS_SAMPLER_THREAD = "bagel-rss-sampler"
+# Number of code locations with the largest memory growth to report for each stage
+N_TOP_ALLOCATION_SITES = 3
+# Number of frames stored for each allocation, so that allocations made inside libraries like pandas can be attributed
+# to the bagel code calling them (storing each frame slows down every allocation, so the traceback is kept short)
+TRACEBACK_DEPTH = 10
+# Directory of the bagel package, whose code locations allocations are attributed to
+PACKAGE_DIR = str(Path(__file__).parents[1]) + os.sep
+
+# Whether the memory use of each stage of the current command should be measured
+_tracking_enabled = False
+# Trackers of the stages currently running, from the outermost to the innermost stage
+_active_trackers: list["StageMemoryTracker"] = []
+
+
+def get_rss() -> int | None:
+    """Return the current resident set size of the process in bytes, or None if it cannot be determined on this platform."""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def to_mb(n_bytes: int | None) -> float | None:
+    return None if n_bytes is None else round(n_bytes / MB, 1)
+
+
+def get_allocation_site(traceback: tracemalloc.Traceback) -> str:
+    """
+    Return the innermost code location inside the bagel package in the traceback of an allocation,
+    or the location of the allocation itself if it was not made from bagel code.
+    """
+    frames = list(reversed(traceback))
+    site = next(
+        (frame for frame in frames if frame.filename.startswith(PACKAGE_DIR)),
+        frames[0],
+    )
+    return f"{site.filename}:{site.lineno}"
+
+
+class StageMemoryTracker:
+    """
+    Measure the memory use of the process during a stage of a command: the peak and change of the RSS
+    (sampled periodically from a background thread), the peak and change of the memory allocated by Python (from tracemalloc),
+    and the code locations in bagel where memory grew the most.
+    Stages can be nested: the peaks reported for an outer stage include the peaks of the stages nested in it.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self.start_rss = self.peak_rss = get_rss()
+        # Resetting the peak of traced memory discards the peak reached so far by the stages this stage is nested in,
+        # so it is stored by each of them first
+        _, traced_peak = tracemalloc.get_traced_memory()
+        for tracker in _active_trackers:
+            tracker.traced_peak = max(tracker.traced_peak, traced_peak)
+        tracemalloc.reset_peak()
+        self.start_traced, self.traced_peak = tracemalloc.get_traced_memory()
+        _active_trackers.append(self)
+        self.start_snapshot = tracemalloc.take_snapshot()
+        if self.start_rss is not None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._sample_rss, name=RSS_SAMPLER_THREAD, daemon=True
+            )
+            self._thread.start()
+
+    def _sample_rss(self):
+        while not self._stop.wait(RSS_SAMPLING_INTERVAL):
+            if (rss := get_rss()) is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+
+    def stop(self) -> dict:
+        """Return the memory statistics of the stage, with sizes in MB."""
+        _active_trackers.remove(self)
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        traced_peak = max(self.traced_peak, traced_peak)
+        size_deltas: dict[str, int] = defaultdict(int)
+        count_deltas: dict[str, int] = defaultdict(int)
+        for stat in tracemalloc.take_snapshot().compare_to(
+            self.start_snapshot, "traceback"
+        ):
+            site = get_allocation_site(stat.traceback)
+            size_deltas[site] += stat.size_diff
+            count_deltas[site] += stat.count_diff
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        end_rss = get_rss()
+        if end_rss is not None:
+            self.peak_rss = max(self.peak_rss, end_rss)
+
+        return {
+            "rss_peak_mb": to_mb(self.peak_rss),
+            "rss_delta_mb": to_mb(
+                None if end_rss is None else end_rss - self.start_rss
+            ),
+            "traced_peak_mb": to_mb(traced_peak),
+            "traced_delta_mb": to_mb(traced - self.start_traced),
+            "top_allocation_sites": [
+                {
+                    "site": site,
+                    "size_delta_mb": to_mb(size_delta),
+                    "count_delta": count_deltas[site],
+                }
+                for site, size_delta in sorted(
+                    size_deltas.items(), key=lambda item: -item[1]
+                )[:N_TOP_ALLOCATION_SITES]
+                if size_delta > 0
+            ],
+        }
+
+
+def format_memory_stats(stats: dict) -> str:
+    """Summarize the memory statistics of a stage in a single line."""
+    summary = f"Python allocations peak {stats['traced_peak_mb']} MB ({stats['traced_delta_mb']:+} MB)"
+    if stats["rss_peak_mb"] is not None:
+        summary = f"RSS peak {stats['rss_peak_mb']} MB ({stats['rss_delta_mb']:+} MB), {summary}"
+    if stats["top_allocation_sites"]:
+        summary += "; largest growth at " + ", ".join(
+            f"{site['site']} ({site['size_delta_mb']:+} MB)"
+            for site in stats["top_allocation_sites"]
+        )
+    return summary
+
+
+def is_tracking_enabled() -> bool:
+    return _tracking_enabled
+
+
+def start_memory_tracking(ctx: typer.Context, trace_memory: bool) -> bool:
+    """Measure the memory use of each stage of the rest of the command, and stop when the command finishes."""
+    global _tracking_enabled
+    if not trace_memory or ctx.resilient_parsing:
+        return trace_memory
+
+    def stop_memory_tracking():
+        global _tracking_enabled
+        _tracking_enabled = False
+        _active_trackers.clear()
+        tracemalloc.stop()
+
+    tracemalloc.start(TRACEBACK_DEPTH)
+    _tracking_enabled = True
+    ctx.call_on_close(stop_memory_tracking)
+    return trace_memory
@@ -0,0 +1,122 @@
+from pathlib import Path
+
+from bagel import models
+from bagel.logger import log_error, logger
+from bagel.utilities import model_utils
+
+# Fields of a graph object that are not compared when checking whether two inputs describe the same object
+IGNORED_FIELDS_FOR_COMPARISON = {"identifier", "hasSamples"}
+
+
+def merge_contexts(context: dict, new_context: dict, source: Path) -> dict:
+    """Return the union of two JSONLD contexts, logging an error if they define the same term differently."""
+    if conflicting_terms := [
+        term
+        for term, definition in new_context.items()
+        if term in context and context[term] != definition
+    ]:
+        log_error(
+            logger,
+            f"The JSONLD context of {source} defines the following terms differently from the previous input file(s): {conflicting_terms}. "
+            "Please check that all input files were created with the same configuration and version of the CLI.",
+        )
+    return {**context, **new_context}
+
+
+def check_same_dataset(
+    dataset: models.Dataset, new_dataset: models.Dataset, source: Path
+):
+    """Log an error if two datasets have different dataset-level metadata (e.g., name or authors)."""
+    if dataset.model_dump(
+        exclude=IGNORED_FIELDS_FOR_COMPARISON
+    ) != new_dataset.model_dump(exclude=IGNORED_FIELDS_FOR_COMPARISON):
+        log_error(
+            logger,
+            f"The dataset metadata in {source} differs from the previous input file(s). "
+            "Only .jsonld files created for the same dataset, using the same dataset description, can be merged.",
+        )
+
+
+def merge_subject(
+    subject: models.Subject, new_subject: models.Subject, source: Path
+):
+    """
+    Merge the sessions of a subject from another input file into an existing subject with the same label.
+    Sessions with new labels are added. Imaging sessions with an existing label are combined in the same way as by the 'bids'
+    and 'derivatives' commands, where acquisitions, completed pipelines and the session path from the new input replace existing ones.
+    Phenotypic sessions with an existing label must be the same in both inputs.
+    """
+    existing_imaging_sessions = model_utils.get_imaging_session_instances(
+        subject
+    )
+    existing_pheno_sessions = {
+        session.hasLabel: session
+        for session in subject.hasSession
+        if isinstance(session, models.PhenotypicSession)
+    }
+    for new_session in new_subject.hasSession:
+        if isinstance(new_session, models.ImagingSession):
+            if new_session.hasLabel not in existing_imaging_sessions:
+                subject.hasSession.append(new_session)
+                continue
+            existing_img_session = existing_imaging_sessions[
+                new_session.hasLabel
+            ]
+            if new_session.hasAcquisition:
+                existing_img_session.hasAcquisition = (
+                    new_session.hasAcquisition
+                )
+            if new_session.hasFilePath is not None:
+                existing_img_session.hasFilePath = new_session.hasFilePath
+            if new_session.hasCompletedPipeline:
+                existing_img_session.hasCompletedPipeline = (
+                    new_session.hasCompletedPipeline
+                )
+        elif new_session.hasLabel not in existing_pheno_sessions:
+            subject.hasSession.append(new_session)
+        elif existing_pheno_sessions[new_session.hasLabel].model_dump(
+            exclude=IGNORED_FIELDS_FOR_COMPARISON
+        ) != new_session.model_dump(exclude=IGNORED_FIELDS_FOR_COMPARISON):
+            log_error(
+                logger,
+                f"The phenotypic data for subject '{subject.hasLabel}', session '{new_session.hasLabel}' in {source} "
+                "differs from the previous input file(s). Please check that all input files were created from the same phenotypic data.",
+            )
+
+
+def merge_jsonld_files(inputs: list[Path]) -> tuple[dict, models.Dataset]:
+    """
+    Merge the subjects of several .jsonld files for the same dataset into a single dataset, and return its JSONLD context and the dataset.
+    Subjects with the same label are combined, keeping the identifiers from the first input containing them.
+    The input files are read one at a time, and the subjects of each file are merged as they are validated,
+    so that only the merged dataset and one input file are held in memory at once.
+    """
+    context: dict = {}
+    dataset = None
+    subjects: dict[str, models.Subject] = {}
+    for input_path in inputs:
+        (
+            input_context,
+            input_dataset,
+            input_subjects,
+        ) = model_utils.iter_jsonld_dataset_subjects(input_path)
+        context = merge_contexts(context, input_context, input_path)
+        if dataset is None:
+            dataset = input_dataset
+        else:
+            check_same_dataset(dataset, input_dataset, input_path)
+
+        num_subjects = 0
+        for subject in input_subjects:
+            num_subjects += 1
+            if subject.hasLabel in subjects:
+                merge_subject(subjects[subject.hasLabel], subject, input_path)
+            else:
+                subjects[subject.hasLabel] = subject
+        logger.info(f"Merged {num_subjects} subject(s) from {input_path}.")
+
+    # NOTE: The CLI requires at least one input file, but this function can also be called with an empty list
+    if dataset is None:
+        log_error(logger, "No input .jsonld files were provided to merge.")
+    dataset.hasSamples = list(subjects.values())
+    return context, dataset
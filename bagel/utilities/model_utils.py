@@ -1,20 +1,40 @@
 import inspect
+import json
+import uuid
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
+import pandas as pd
 import pydantic
 from pydantic import ValidationError
 
 from bagel import models
+from bagel._version import __version__
 from bagel.logger import log_error, logger
 from bagel.mappings import NB
-from bagel.utilities import file_utils, pheno_utils
+from bagel.utilities import diagnostics_utils, file_utils, pheno_utils
+from bagel.utilities.timing_utils import timed_stage
 
+SUBJECT_HASHES_FILE_SUFFIX = ".hashes.json"
+# Namespace for UUIDs derived from graph object labels, when deterministic identifiers are requested
+DETERMINISTIC_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, NB.url)
 
-def generate_context(config: str) -> dict:
+
+def get_model_context_fields() -> dict[str, str | dict[str, str]]:
+    """
+    Return the JSONLD context terms for all classes and fields of the Neurobagel graph data model.
+    The returned dictionary is a copy of the terms computed once, so it can be safely modified.
+    """
+    return deepcopy(_get_cached_model_context_fields())
+
+
+@lru_cache()
+def _get_cached_model_context_fields() -> dict[str, str | dict[str, str]]:
+    """Compute the JSONLD context terms of the data model, which only depend on the data model. The returned dictionary must not be modified."""
     # Adapted from the dandi-schema context generation function
     # https://github.com/dandi/dandi-schema/blob/c616d87eaae8869770df0cb5405c24afdb9db096/dandischema/metadata.py
-    field_preamble = pheno_utils.get_supported_namespaces_for_config(config)
     fields: dict[str, str | dict[str, str]] = {}
     for klass_name, klass in inspect.getmembers(models):
         if inspect.isclass(klass) and issubclass(klass, pydantic.BaseModel):
@@ -27,7 +47,12 @@ def generate_context(config: str) -> dict:
                 elif name not in fields:
                     fields[name] = {"@id": f"{NB.pf}:{name}"}
 
-    field_preamble.update(**fields)
+    return fields
+
+
+def generate_context(config: str) -> dict:
+    field_preamble = pheno_utils.get_supported_namespaces_for_config(config)
+    field_preamble.update(**get_model_context_fields())
 
     return {"@context": field_preamble}
 
@@ -59,16 +84,30 @@ def confirm_subs_match_pheno_data(
     )
 
     if len(missing_subs) > 0:
+        missing_subs = sorted(missing_subs)
+        diagnostics_utils.record_diagnostic(
+            f"subject IDs in the {subject_source_for_err} not found in the JSON-LD file",
+            subjects=missing_subs,
+        )
         log_error(
             logger,
             f"The {subject_source_for_err} contains subject IDs not found in "
             "the provided JSON-LD file:\n"
-            f"{missing_subs}\n"
+            f"{diagnostics_utils.summarize_items(missing_subs)}\n"
             "Subject IDs are case sensitive. "
             f"Please check that the {subject_source_for_err} corresponds to the dataset in the .jsonld file.",
         )
 
 
+def invalid_jsonld_message(file_path: Path, validation_errors: str) -> str:
+    """Return the error message for a .jsonld file that is not a valid Neurobagel dataset."""
+    return (
+        f"Error: {file_path} is not a valid Neurobagel JSONLD dataset. "
+        "Please ensure to provide a valid JSONLD file generated by Neurobagel CLI commands.\n"
+        f"Validation errors: {validation_errors}"
+    )
+
+
 def extract_and_validate_jsonld_dataset(
     file_path: Path,
 ) -> tuple[dict, models.Dataset]:
@@ -83,14 +122,57 @@ def extract_and_validate_jsonld_dataset(
     except ValidationError as err:
         log_error(
             logger,
-            f"Error: {file_path} is not a valid Neurobagel JSONLD dataset. "
-            "Please ensure to provide a valid JSONLD file generated by Neurobagel CLI commands.\n"
-            f"Validation errors: {str(err)}",
+            invalid_jsonld_message(file_path, str(err)),
         )
 
     return context, jsonld_dataset
 
 
+def iter_jsonld_dataset_subjects(
+    file_path: Path,
+) -> tuple[dict, models.Dataset, Iterator[models.Subject]]:
+    """
+    Separate the context out from a user-provided JSONLD and validate the dataset-level metadata and each subject
+    against the data model, returning the context, the dataset without its subjects, and an iterator over the subjects.
+    Subjects are validated one at a time, and the raw data of each subject is released once it has been validated,
+    so that the whole dataset is not held in memory twice.
+    """
+    jsonld = file_utils.load_json(file_path)
+    context = jsonld.pop("@context", None)
+    raw_subjects = jsonld.pop("hasSamples", None)
+    if context is None or not isinstance(raw_subjects, list):
+        log_error(
+            logger,
+            invalid_jsonld_message(
+                file_path,
+                "the file must contain '@context' and a list of 'hasSamples'",
+            ),
+        )
+    try:
+        jsonld_dataset = models.Dataset.model_validate(
+            {**jsonld, "hasSamples": []}
+        )
+    except ValidationError as err:
+        log_error(
+            logger,
+            invalid_jsonld_message(file_path, str(err)),
+        )
+
+    def iter_subjects() -> Iterator[models.Subject]:
+        # Pop subjects from the end of the reversed list to release them in their original order
+        raw_subjects.reverse()
+        while raw_subjects:
+            try:
+                yield models.Subject.model_validate(raw_subjects.pop())
+            except ValidationError as err:
+                log_error(
+                    logger,
+                    invalid_jsonld_message(file_path, str(err)),
+                )
+
+    return context, jsonld_dataset, iter_subjects()
+
+
 def get_subject_instances(
     dataset: models.Dataset,
 ) -> dict[str, models.Subject]:
@@ -116,3 +198,171 @@ def get_imaging_session_instances(
             jsonld_sub_sessions_dict[jsonld_sub_ses.hasLabel] = jsonld_sub_ses
 
     return jsonld_sub_sessions_dict
+
+
+def get_subject_hashes_path(jsonld_path: Path) -> Path:
+    """Return the path of the file storing the subject content hashes for a .jsonld file created by 'bagel pheno'."""
+    return jsonld_path.with_suffix(SUBJECT_HASHES_FILE_SUFFIX)
+
+
+def save_subject_hashes(subject_hashes: dict, jsonld_path: Path):
+    """Save the subject content hashes used to create a .jsonld file alongside it, for reuse in later runs."""
+    hashes_path = get_subject_hashes_path(jsonld_path)
+    with open(hashes_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"bagel_version": __version__, "subjects": subject_hashes},
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+    logger.info(f"Saved subject content hashes to:  {hashes_path}")
+
+
+def get_reusable_subjects(
+    previous_jsonld_path: Path, subject_hashes: dict
+) -> dict[str, models.Subject]:
+    """
+    Return the subjects from a previously created .jsonld file whose content hashes match the current hashes,
+    where keys are subject labels and values are the subject objects with only their phenotypic sessions.
+    If the hashes of the previous file are unavailable or were created by a different version of the CLI, no subjects are reused.
+    """
+    hashes_path = get_subject_hashes_path(previous_jsonld_path)
+    if not hashes_path.is_file():
+        logger.warning(
+            f"No subject content hashes found for the previous .jsonld file (expected at {hashes_path}). "
+            "All subjects will be regenerated."
+        )
+        return {}
+    previous_hashes = file_utils.load_json(hashes_path)
+    if previous_hashes.get("bagel_version") != __version__:
+        logger.warning(
+            f"The previous .jsonld file was created using a different version of the CLI ({previous_hashes.get('bagel_version')}). "
+            "All subjects will be regenerated."
+        )
+        return {}
+
+    _, previous_dataset = extract_and_validate_jsonld_dataset(
+        previous_jsonld_path
+    )
+    return get_unchanged_subjects(
+        previous_dataset, previous_hashes["subjects"], subject_hashes
+    )
+
+
+def get_unchanged_subjects(
+    previous_dataset: models.Dataset,
+    previous_subject_hashes: dict,
+    subject_hashes: dict,
+) -> dict[str, models.Subject]:
+    """
+    Return the subjects of a previously created dataset whose content hashes match the current hashes,
+    where keys are subject labels and values are the subject objects with only their phenotypic sessions.
+    """
+    reusable_subjects = {}
+    for label, subject in get_subject_instances(previous_dataset).items():
+        if (
+            label in subject_hashes
+            and previous_subject_hashes.get(label) == subject_hashes[label]
+        ):
+            # Drop any imaging sessions added to the subject by 'bagel bids' or 'bagel derivatives'.
+            # The sessions are copied too (values passed to `update` are not), so that adding imaging data
+            # to the new dataset does not modify the previous one.
+            reusable_subjects[label] = subject.model_copy(
+                update={
+                    "hasSession": [
+                        session.model_copy(deep=True)
+                        for session in subject.hasSession
+                        if isinstance(session, models.PhenotypicSession)
+                    ]
+                },
+                deep=True,
+            )
+
+    return reusable_subjects
+
+
+def hash_subjects(
+    pheno_df: pd.DataFrame,
+    data_dict: dict,
+    previous_jsonld: Path | None = None,
+    previous_result: tuple[models.Dataset, dict] | None = None,
+) -> tuple[dict, dict[str, models.Subject]]:
+    """
+    Return the content hash of each subject's inputs in a validated phenotypic table, along with the subjects
+    whose hashes are unchanged in a previous .jsonld file or in a previously returned dataset and subject hashes kept in memory,
+    which can be reused instead of being regenerated.
+    """
+    with timed_stage("hash subjects") as stage:
+        subject_hashes = pheno_utils.get_subject_hashes(pheno_df, data_dict)
+        reusable_subjects = {}
+        if previous_jsonld is not None:
+            reusable_subjects = get_reusable_subjects(
+                previous_jsonld, subject_hashes
+            )
+        elif previous_result is not None:
+            reusable_subjects = get_unchanged_subjects(
+                *previous_result, subject_hashes
+            )
+        stage["subjects"] = len(subject_hashes)
+    if previous_jsonld is not None or previous_result is not None:
+        logger.info(
+            f"Reusing {len(reusable_subjects)} unchanged subject(s) from the previous output. "
+            f"{len(subject_hashes) - len(reusable_subjects)} new or changed subject(s) will be regenerated."
+        )
+
+    return subject_hashes, reusable_subjects
+
+
+def get_deterministic_identifier(*labels: str) -> str:
+    """Return a Neurobagel identifier containing a UUID derived from the provided labels, so that the same labels always give the same identifier."""
+    return (
+        NB.pf
+        + ":"
+        + str(uuid.uuid5(DETERMINISTIC_ID_NAMESPACE, "/".join(labels)))
+    )
+
+
+def canonicalize_dataset(dataset: models.Dataset):
+    """
+    Replace the random identifiers of a dataset and all its graph objects with identifiers derived from their content
+    (dataset, subject, session and term labels), and sort the subjects and their sessions by label,
+    so that the same input metadata always results in identical output.
+    """
+    dataset.identifier = get_deterministic_identifier(dataset.hasLabel)
+    dataset.hasSamples.sort(key=lambda subject: subject.hasLabel)
+    for subject in dataset.hasSamples:
+        subject.identifier = get_deterministic_identifier(
+            dataset.hasLabel, subject.hasLabel
+        )
+        # Phenotypic and imaging sessions can share a label, so we also use the session type in the sort key and identifier
+        subject.hasSession.sort(
+            key=lambda session: (session.hasLabel, session.schemaKey)
+        )
+        for session in subject.hasSession:
+            session_labels = (
+                dataset.hasLabel,
+                subject.hasLabel,
+                session.schemaKey,
+                session.hasLabel,
+            )
+            session.identifier = get_deterministic_identifier(*session_labels)
+            if not isinstance(session, models.ImagingSession):
+                continue
+            # A session can have several acquisitions with the same contrast type (e.g., multiple runs),
+            # so we use the position of the acquisition in the session to tell them apart
+            for acq_idx, acquisition in enumerate(
+                session.hasAcquisition or []
+            ):
+                acquisition.identifier = get_deterministic_identifier(
+                    *session_labels,
+                    acquisition.schemaKey,
+                    str(acquisition.hasContrastType.identifier),
+                    str(acq_idx),
+                )
+            for pipeline in session.hasCompletedPipeline or []:
+                pipeline.identifier = get_deterministic_identifier(
+                    *session_labels,
+                    pipeline.schemaKey,
+                    str(pipeline.hasPipelineName.identifier),
+                    pipeline.hasPipelineVersion,
+                )
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from collections import defaultdict
 from copy import deepcopy
+from functools import lru_cache
 from typing import Type
 
 import isodate
 import jsonschema
 import pandas as pd
+import pandera.pandas as pa
 import pydantic
 
-from bagel import dataset_description_model, dictionary_models, mappings
+from bagel import (
+    dataset_description_model,
+    dictionary_models,
+    mappings,
+    models,
+)
 from bagel.logger import log_error, logger
 from bagel.mappings import DEPRECATED_NAMESPACE_PREFIXES, NB
+from bagel.utilities import diagnostics_utils
+from bagel.utilities.timing_utils import timed_stage
 
 # TODO: Once we remove support for v1 annotation tool data dictionaries, revert to using this version for data dictionary schema validation
 # DICTIONARY_SCHEMA = dictionary_models.DataDictionary.model_json_schema()
@@ -25,6 +36,38 @@ AGE_FORMATS = {
     "range": NB.pf + ":FromRange",
 }
 
+_NUMBER_PATTERN = r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*"
+_ISO8601_NUMBER_PATTERN = r"\d+([.,]\d+)?"
+# Patterns matching the usual age values for each age format, used for fast validation of whole age columns.
+# Values that do not match a pattern are checked again by parsing them, so the patterns do not need to cover every edge case.
+AGE_FORMAT_PATTERNS = {
+    AGE_FORMATS["float"]: _NUMBER_PATTERN,
+    AGE_FORMATS["int"]: _NUMBER_PATTERN,
+    AGE_FORMATS["euro"]: r"\s*[+-]?(\d+[,.]?\d*|[,.]\d+)\s*",
+    AGE_FORMATS["bounded"]: rf"\+*{_NUMBER_PATTERN}\+*",
+    AGE_FORMATS["iso8601"]: (
+        rf"P?(?=\d|T\d)({_ISO8601_NUMBER_PATTERN}Y)?({_ISO8601_NUMBER_PATTERN}M)?"
+        rf"({_ISO8601_NUMBER_PATTERN}W)?({_ISO8601_NUMBER_PATTERN}D)?"
+        rf"(T({_ISO8601_NUMBER_PATTERN}H)?({_ISO8601_NUMBER_PATTERN}M)?({_ISO8601_NUMBER_PATTERN}S)?)?"
+    ),
+    AGE_FORMATS[
+        "range"
+    ]: r"\s*\+?(\d+\.?\d*|\.\d+)\s*-\s*\+?(\d+\.?\d*|\.\d+)\s*",
+}
+
+# Names of the checks in a phenotypic table schema, used to identify the failures of each check
+PHENO_TABLE_CHECKS: dict[str, str] = {
+    "missing_column": "column_in_dataframe",
+    "empty_id": "is_not_empty",
+    "undefined_value": "is_annotated_value",
+    "invalid_age": "matches_age_format",
+}
+# Names pandera gives to failures of the `unique` setting of a schema, for one or several ID columns
+DUPLICATE_ID_CHECKS: tuple[str, ...] = (
+    "field_uniqueness",
+    "multiple_fields_uniqueness",
+)
+
 
 def get_available_configs(config_namespaces_mapping: list) -> list:
     """Return the list of names of available community configurations."""
@@ -59,22 +102,82 @@ def check_if_remote_config_namespaces_used():
         )
 
 
+# The loaded community configurations and the supported namespaces of each configuration, indexed by configuration name
+_config_namespaces_index: tuple[list, dict[str, dict]] | None = None
+
+
+def get_config_namespaces_index() -> dict[str, dict]:
+    """
+    Return the supported namespace prefixes and their corresponding full URLs for every community configuration,
+    indexed by configuration name. The index is only rebuilt when different community configurations are loaded.
+    """
+    global _config_namespaces_index
+    if (
+        _config_namespaces_index is None
+        or _config_namespaces_index[0]
+        is not mappings.CONFIG_NAMESPACES_MAPPING
+    ):
+        index = {}
+        for config in mappings.CONFIG_NAMESPACES_MAPPING:
+            index[config["config_name"]] = {
+                namespace["namespace_prefix"]: namespace["namespace_url"]
+                for namespace_group in config["namespaces"].values()
+                for namespace in namespace_group
+            }
+        _config_namespaces_index = (mappings.CONFIG_NAMESPACES_MAPPING, index)
+    return _config_namespaces_index[1]
+
+
 def get_supported_namespaces_for_config(config_name: str) -> dict:
     """Return a dictionary of supported namespace prefixes and their corresponding full URLs for a given community configuration."""
-    config_namespaces = next(
-        config["namespaces"]
-        for config in mappings.CONFIG_NAMESPACES_MAPPING
-        if config["config_name"] == config_name
-    )
+    return dict(get_config_namespaces_index()[config_name])
+
 
-    config_namespaces_dict = {}
-    for namespace_group in config_namespaces.values():
-        for namespace in namespace_group:
-            config_namespaces_dict[namespace["namespace_prefix"]] = namespace[
-                "namespace_url"
-            ]
+class DictionaryIndex:
+    """
+    Lookup tables for the annotated columns of a data dictionary, built in a single pass over the dictionary.
+    Use this instead of the individual lookup helpers when looking up columns several times for the same dictionary.
+    NOTE: The index is not updated if the annotations in the data dictionary are changed after it is built.
+    """
 
-    return config_namespaces_dict
+    def __init__(self, data_dict: dict):
+        self.annotated_columns: list[tuple[str, dict]] = []
+        self.columns_about: dict[str, list[str]] = defaultdict(list)
+        self.columns_part_of: dict[str, list[str]] = defaultdict(list)
+        for col, content in data_dict.items():
+            if "Annotations" not in content:
+                continue
+            self.annotated_columns.append((col, content))
+            annotations = content["Annotations"]
+            self.columns_about[annotations["IsAbout"]["TermURL"]].append(col)
+            part_of = annotations.get("IsPartOf")
+            if part_of is not None:
+                self.columns_part_of[part_of.get("TermURL")].append(col)
+
+    def get_columns_about(self, concept: str) -> list:
+        """Return all column names that have been annotated as "IsAbout" the desired concept."""
+        return list(self.columns_about.get(concept, []))
+
+    def map_std_vars_to_columns(self) -> dict[str, list]:
+        """
+        Return a dictionary where the keys are the aliases for Neurobagel standardized variables
+        and the values are lists of the column names linked to the variable, for variables with at least one column.
+        """
+        return {
+            std_var_name: self.get_columns_about(std_var_iri)
+            for std_var_name, std_var_iri in mappings.NEUROBAGEL.items()
+            if std_var_iri in self.columns_about
+        }
+
+    def map_tools_to_columns(self) -> dict[str, list]:
+        """Return a dictionary where the keys are the assessment tool IRIs and the values are lists of column names."""
+        return defaultdict(
+            list,
+            {
+                tool: list(columns)
+                for tool, columns in self.columns_part_of.items()
+            },
+        )
 
 
 def get_columns_about(data_dict: dict, concept: str) -> list:
@@ -94,11 +197,7 @@ def get_columns_about(data_dict: dict, concept: str) -> list:
     -------
 
     """
-    return [
-        col
-        for col, content in get_annotated_columns(data_dict)
-        if content["Annotations"]["IsAbout"]["TermURL"] == concept
-    ]
+    return DictionaryIndex(data_dict).get_columns_about(concept)
 
 
 def get_annotated_columns(data_dict: dict) -> list[tuple[str, dict]]:
@@ -114,6 +213,22 @@ def get_annotated_columns(data_dict: dict) -> list[tuple[str, dict]]:
     ]
 
 
+def get_columns_to_load(data_dict: dict) -> list | None:
+    """
+    Return the names of all columns with Neurobagel annotations in a (not yet validated) data dictionary,
+    i.e., the only phenotypic table columns that need to be loaded.
+    Return None if the data dictionary is not shaped as expected, so that the whole table is loaded
+    and the problem is reported by the regular data dictionary validation.
+    """
+    if not isinstance(data_dict, dict):
+        return None
+    return [
+        col
+        for col, content in data_dict.items()
+        if isinstance(content, dict) and "Annotations" in content
+    ]
+
+
 def recursive_find_values_for_key(data: dict, target: str) -> list:
     """
     Recursively search for a key in a possibly nested dictionary and return a list of all values found for that key.
@@ -171,11 +286,7 @@ def map_std_vars_to_columns(data_dict: dict) -> dict[str, list]:
 
     Returns a dictionary where the keys are the aliases for Neurobagel standardized variables and the values are lists of column names.
     """
-    return {
-        std_var_name: get_columns_about(data_dict, std_var_iri)
-        for std_var_name, std_var_iri in mappings.NEUROBAGEL.items()
-        if get_columns_about(data_dict, std_var_iri)
-    }
+    return DictionaryIndex(data_dict).map_std_vars_to_columns()
 
 
 def map_tools_to_columns(data_dict: dict) -> dict[str, list]:
@@ -185,13 +296,7 @@ def map_tools_to_columns(data_dict: dict) -> dict[str, list]:
 
     Returns a dictionary where the keys are the assessment tool IRIs and the values are lists of column names.
     """
-    out_dict = defaultdict(list)
-    for col, content in get_annotated_columns(data_dict):
-        part_of = content["Annotations"].get("IsPartOf")
-        if part_of is not None:
-            out_dict[part_of.get("TermURL")].append(col)
-
-    return out_dict
+    return DictionaryIndex(data_dict).map_tools_to_columns()
 
 
 def is_missing_value(value: str | int, column: str, data_dict: dict) -> bool:
@@ -223,32 +328,45 @@ def get_age_format(column: str, data_dict: dict) -> str:
     return data_dict[column]["Annotations"]["Format"]["TermURL"]
 
 
+def parse_age(value: str, value_format: str) -> float | None:
+    """
+    Return an age value converted to years according to the specified age format, or None if the format is not recognized.
+    Raises a ValueError or ISO8601Error if the value does not match the format.
+    """
+    if value_format in [
+        AGE_FORMATS["float"],
+        AGE_FORMATS["int"],
+    ]:
+        return float(value)
+    if value_format == AGE_FORMATS["euro"]:
+        return float(value.replace(",", "."))
+    if value_format == AGE_FORMATS["bounded"]:
+        return float(value.strip("+"))
+    if value_format == AGE_FORMATS["iso8601"]:
+        if not value.startswith("P"):
+            pvalue = "P" + value
+        else:
+            pvalue = value
+        duration = isodate.parse_duration(pvalue)
+        return float(duration.years + duration.months / 12)
+    if value_format == AGE_FORMATS["range"]:
+        a_min, a_max = value.split("-")
+        return sum(map(float, [a_min, a_max])) / 2
+    return None
+
+
+def is_valid_age(value: str, value_format: str) -> bool:
+    """Return True if an age value can be converted according to the specified (recognized) age format."""
+    try:
+        parse_age(value, value_format)
+        return True
+    except (ValueError, isodate.isoerror.ISO8601Error):
+        return False
+
+
 def transform_age(value: str, value_format: str) -> float:
     try:
-        if value_format in [
-            AGE_FORMATS["float"],
-            AGE_FORMATS["int"],
-        ]:
-            return float(value)
-        if value_format == AGE_FORMATS["euro"]:
-            return float(value.replace(",", "."))
-        if value_format == AGE_FORMATS["bounded"]:
-            return float(value.strip("+"))
-        if value_format == AGE_FORMATS["iso8601"]:
-            if not value.startswith("P"):
-                pvalue = "P" + value
-            else:
-                pvalue = value
-            duration = isodate.parse_duration(pvalue)
-            return float(duration.years + duration.months / 12)
-        if value_format == AGE_FORMATS["range"]:
-            a_min, a_max = value.split("-")
-            return sum(map(float, [a_min, a_max])) / 2
-        log_error(
-            logger,
-            f"The data dictionary contains an unrecognized age format: {value_format}. "
-            f"Ensure that the format TermURL is one of {list(AGE_FORMATS.values())}.",
-        )
+        age = parse_age(value, value_format)
     except (ValueError, isodate.isoerror.ISO8601Error) as e:
         log_error(
             logger,
@@ -257,6 +375,13 @@ def transform_age(value: str, value_format: str) -> float:
             "and that any missing values in your age column have been correctly annotated. "
             "For examples of acceptable values for specific age formats, see https://neurobagel.org/data_models/dictionaries/#age.",
         )
+    if age is None:
+        log_error(
+            logger,
+            f"The data dictionary contains an unrecognized age format: {value_format}. "
+            f"Ensure that the format TermURL is one of {list(AGE_FORMATS.values())}.",
+        )
+    return age
 
 
 def get_transformed_values(
@@ -385,46 +510,6 @@ def are_any_available(columns: list, row: pd.Series, data_dict: dict) -> bool:
     )
 
 
-def find_missing_annotated_cols(
-    data_dict: dict, pheno_df: pd.DataFrame
-) -> list:
-    """
-    Find columns that are annotated in the data dictionary but not present in the phenotypic file.
-    """
-    missing_annotated_cols = []
-    for col, _ in get_annotated_columns(data_dict):
-        if col not in pheno_df.columns:
-            missing_annotated_cols.append(col)
-
-    return missing_annotated_cols
-
-
-def find_undefined_cat_col_values(
-    data_dict: dict, pheno_df: pd.DataFrame
-) -> dict[str, list]:
-    """
-    Checks that all categorical column values have annotations. Returns a dictionary containing
-    any categorical column names and specific column values not defined in the corresponding data
-    dictionary entry.
-    """
-    all_undefined_values = {}
-    for col, content in get_annotated_columns(data_dict):
-        if is_column_type(
-            col, data_dict, dictionary_models.CategoricalNeurobagel
-        ):
-            known_values = list(
-                content["Annotations"]["Levels"].keys()
-            ) + content["Annotations"].get("MissingValues", [])
-            unknown_values = []
-            for value in pheno_df[col].unique():
-                if value not in known_values:
-                    unknown_values.append(value)
-            if unknown_values:
-                all_undefined_values[col] = unknown_values
-
-    return all_undefined_values
-
-
 def find_unused_missing_values(
     data_dict: dict, pheno_df: pd.DataFrame
 ) -> dict[str, list]:
@@ -435,10 +520,15 @@ def find_unused_missing_values(
     """
     all_unused_missing_vals = {}
     for col, content in get_annotated_columns(data_dict):
-        unused_missing_vals = []
-        for missing_val in content["Annotations"].get("MissingValues", []):
-            if missing_val not in pheno_df[col].unique():
-                unused_missing_vals.append(missing_val)
+        missing_vals = content["Annotations"].get("MissingValues", [])
+        if not missing_vals:
+            continue
+        unique_values = set(pheno_df[col].unique())
+        unused_missing_vals = [
+            missing_val
+            for missing_val in missing_vals
+            if missing_val not in unique_values
+        ]
         if unused_missing_vals:
             all_unused_missing_vals[col] = unused_missing_vals
 
@@ -447,9 +537,10 @@ def find_unused_missing_values(
 
 def get_rows_with_empty_strings(df: pd.DataFrame, columns: list) -> list:
     """For specified columns, returns the indices of rows with empty strings"""
-    # NOTE: Profile this section if things get slow, transforming "" -> nan and then
-    # using .isna() will very likely be much faster
-    empty_row = df[columns].eq("").any(axis=1)
+    # NOTE: Combining the per-column comparisons is much faster than a row-wise .any(axis=1) for large tables
+    empty_row = pd.Series(False, index=df.index)
+    for col in columns:
+        empty_row |= df[col].eq("").astype(bool)
     # Return the row index as it would look in a spreadsheet program, 1-based and including the header
     return [idx + 2 for idx in empty_row[empty_row].index]
 
@@ -479,11 +570,26 @@ def construct_dictionary_schema_for_validation() -> dict:
     return patched_schema
 
 
+@lru_cache()
+def get_data_dict_validator() -> jsonschema.protocols.Validator:
+    """
+    Return a validator for the patched data dictionary schema.
+    The validator is created only once and reused for every data dictionary validated in the same process.
+    """
+    schema = construct_dictionary_schema_for_validation()
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
 def validate_data_dict(data_dict: dict, config: str | None) -> None:
     try:
-        jsonschema.validate(
-            data_dict, construct_dictionary_schema_for_validation()
-        )
+        # NOTE: This raises the same error as jsonschema.validate(), without re-checking the schema
+        # and creating a new validator for every data dictionary
+        if error := jsonschema.exceptions.best_match(
+            get_data_dict_validator().iter_errors(data_dict)
+        ):
+            raise error
     except jsonschema.ValidationError as e:
         # TODO: When *every* item in an input JSON is not schema valid,
         # jsonschema.validate will raise a ValidationError for only *one* item among them.
@@ -502,7 +608,9 @@ def validate_data_dict(data_dict: dict, config: str | None) -> None:
             "[italic]TIP: Ensure each annotated column contains an 'Annotations' key.[/italic]",
         )
 
-    if get_annotated_columns(data_dict) == []:
+    dict_index = DictionaryIndex(data_dict)
+
+    if dict_index.annotated_columns == []:
         log_error(
             logger,
             "The data dictionary must contain at least one column with Neurobagel annotations.",
@@ -531,11 +639,7 @@ def validate_data_dict(data_dict: dict, config: str | None) -> None:
             )
 
     if (
-        len(
-            get_columns_about(
-                data_dict, concept=mappings.NEUROBAGEL["participant"]
-            )
-        )
+        len(dict_index.get_columns_about(mappings.NEUROBAGEL["participant"]))
         == 0
     ):
         log_error(
@@ -545,19 +649,10 @@ def validate_data_dict(data_dict: dict, config: str | None) -> None:
 
     # TODO: remove this validation when we start handling multiple participant and / or session ID columns
     if (
-        len(
-            get_columns_about(
-                data_dict, concept=mappings.NEUROBAGEL["participant"]
-            )
-        )
+        len(dict_index.get_columns_about(mappings.NEUROBAGEL["participant"]))
         > 1
     ) | (
-        len(
-            get_columns_about(
-                data_dict, concept=mappings.NEUROBAGEL["session"]
-            )
-        )
-        > 1
+        len(dict_index.get_columns_about(mappings.NEUROBAGEL["session"])) > 1
     ):
         log_error(
             logger,
@@ -565,40 +660,30 @@ def validate_data_dict(data_dict: dict, config: str | None) -> None:
             "Please ensure only one column is annotated for participant and session IDs.",
         )
 
-    if (
-        set(map_std_vars_to_columns(data_dict).keys())
-        == {"participant", "session"}
-    ) or (set(map_std_vars_to_columns(data_dict).keys()) == {"participant"}):
+    if set(dict_index.map_std_vars_to_columns().keys()) in (
+        {"participant", "session"},
+        {"participant"},
+    ):
         logger.warning(
             "The only columns annotated in the data dictionary are participant ID or session ID columns. "
             "As a result, the generated graph-ready data will not contain any subject phenotypic characteristics. "
             "Check that all relevant phenotypic columns in your data table have been annotated."
         )
 
-    if (
-        len(get_columns_about(data_dict, concept=mappings.NEUROBAGEL["sex"]))
-        > 1
-    ):
+    if len(dict_index.get_columns_about(mappings.NEUROBAGEL["sex"])) > 1:
         logger.warning(
             "The data dictionary indicates more than one column about sex. "
             "Neurobagel cannot resolve multiple sex values per subject-session, and so will only consider the first identified column for sex data."
         )
 
-    if (
-        len(get_columns_about(data_dict, concept=mappings.NEUROBAGEL["age"]))
-        > 1
-    ):
+    if len(dict_index.get_columns_about(mappings.NEUROBAGEL["age"])) > 1:
         logger.warning(
             "The data dictionary indicates more than one column about age. "
             "Neurobagel cannot resolve multiple age values per subject-session, and so will use only the first identified column for age data."
         )
 
     if (
-        len(
-            get_columns_about(
-                data_dict, concept=mappings.NEUROBAGEL["subject_group"]
-            )
-        )
+        len(dict_index.get_columns_about(mappings.NEUROBAGEL["subject_group"]))
         > 1
     ):
         logger.warning(
@@ -617,24 +702,6 @@ def validate_data_dict(data_dict: dict, config: str | None) -> None:
         )
 
 
-def check_for_duplicate_ids(data_dict: dict, pheno_df: pd.DataFrame):
-    """Log an error if there are duplicate participant IDs or duplicate combinations of participant and session IDs, if both are present."""
-    id_columns = get_columns_about(
-        data_dict, concept=mappings.NEUROBAGEL["participant"]
-    ) + get_columns_about(data_dict, concept=mappings.NEUROBAGEL["session"])
-    duplicates_mask = pheno_df.duplicated(subset=id_columns, keep=False)
-    if duplicates_mask.any():
-        duplicate_indices = [
-            idx + 2 for idx in pheno_df[duplicates_mask].index
-        ]
-        log_error(
-            logger,
-            "The phenotypic table contains duplicate participant IDs or duplicate combinations of participant and session IDs. "
-            f"Duplicate IDs were found in these rows (header row is 1): {duplicate_indices}. "
-            "Ensure that each row represents a unique participant or participant-session (if a session column is present).",
-        )
-
-
 def get_validated_dataset_description_and_incomplete_fields(
     raw_dataset_desc: dict,
 ) -> tuple[dataset_description_model.DatasetDescription, set]:
@@ -689,47 +756,196 @@ def validate_dataset_description(
         )
 
 
-def validate_inputs(
-    data_dict: dict, pheno_df: pd.DataFrame, config: str | None = None
-) -> None:
-    """Determine whether the input data dictionary and phenotypic table are valid and compatible."""
-    validate_data_dict(data_dict, config)
+def matches_age_format(
+    values: pd.Series, value_format: str, missing_values: list
+) -> pd.Series:
+    """
+    Return a boolean Series indicating which values of an age column are annotated missing values
+    or can be converted according to the specified age format.
+    """
+    # Age values are usually highly repeated, so we only check each unique value once
+    unique_values = pd.Series(values.unique(), dtype=object)
+    is_valid = (
+        unique_values.str.fullmatch(AGE_FORMAT_PATTERNS[value_format])
+        .astype(bool)
+        .to_numpy(copy=True)
+    )
+    # Only the (usually few) values not matching the pattern for the format are parsed one by one
+    is_valid[~is_valid] = [
+        is_valid_age(value, value_format) for value in unique_values[~is_valid]
+    ]
+    return values.isin(unique_values[is_valid]) | values.isin(missing_values)
 
-    if missing_annotated_cols := find_missing_annotated_cols(
-        data_dict, pheno_df
-    ):
-        log_error(
-            logger,
+
+def create_pheno_table_schema(data_dict: dict) -> pa.DataFrameSchema:
+    """
+    Create a schema for the phenotypic table described by a valid data dictionary, which requires:
+    - all annotated columns to be present
+    - non-empty participant and session IDs, and unique participant IDs or combinations of participant and session IDs
+    - only annotated levels or missing values in categorical columns
+    - only values matching the annotated age format or missing values in age columns
+    """
+    dict_index = DictionaryIndex(data_dict)
+    id_columns = dict_index.get_columns_about(
+        mappings.NEUROBAGEL["participant"]
+    ) + dict_index.get_columns_about(mappings.NEUROBAGEL["session"])
+    age_columns = dict_index.get_columns_about(mappings.NEUROBAGEL["age"])
+
+    columns = {}
+    for col, content in dict_index.annotated_columns:
+        annotations = content["Annotations"]
+        missing_values = annotations.get("MissingValues", [])
+        checks = []
+        if col in id_columns:
+            checks.append(
+                pa.Check(
+                    lambda values: values != "",
+                    name=PHENO_TABLE_CHECKS["empty_id"],
+                )
+            )
+        elif is_column_type(
+            col, data_dict, dictionary_models.CategoricalNeurobagel
+        ):
+            known_values = list(annotations["Levels"].keys()) + missing_values
+            checks.append(
+                pa.Check(
+                    lambda values, known_values=known_values: values.isin(
+                        known_values
+                    ),
+                    name=PHENO_TABLE_CHECKS["undefined_value"],
+                )
+            )
+        elif col in age_columns:
+            # NOTE: The age format may still be stored under the v1 'Transformation' key at this point.
+            # Unrecognized age formats are reported when the ages are transformed.
+            age_format = (
+                annotations.get("Format") or annotations.get("Transformation")
+            )["TermURL"]
+            if age_format in AGE_FORMAT_PATTERNS:
+                checks.append(
+                    pa.Check(
+                        lambda values, age_format=age_format, missing_values=missing_values: matches_age_format(
+                            values, age_format, missing_values
+                        ),
+                        name=PHENO_TABLE_CHECKS["invalid_age"],
+                    )
+                )
+        columns[col] = pa.Column(checks=checks, required=True)
+
+    return pa.DataFrameSchema(
+        columns,
+        unique=id_columns or None,
+        report_duplicates="all",
+    )
+
+
+def get_pheno_table_errors(failure_cases: pd.DataFrame) -> list[str]:
+    """Return an error message for each type of problem found when validating a phenotypic table against its schema."""
+    errors = []
+
+    def get_failures(check_names) -> pd.DataFrame:
+        return failure_cases[failure_cases["check"].isin(check_names)]
+
+    def get_row_indices(failures: pd.DataFrame) -> list:
+        # Return the row index as it would look in a spreadsheet program, 1-based and including the header
+        return [idx + 2 for idx in sorted(set(failures["index"]))]
+
+    def get_failure_values_by_column(failures: pd.DataFrame) -> dict:
+        return {
+            col: col_failures["failure_case"].unique().tolist()
+            for col, col_failures in failures.groupby("column", sort=False)
+        }
+
+    if not (
+        missing_cols := get_failures([PHENO_TABLE_CHECKS["missing_column"]])
+    ).empty:
+        missing_col_names = missing_cols["failure_case"].tolist()
+        diagnostics_utils.record_diagnostic(
+            "annotated columns missing from the phenotypic table",
+            columns=missing_col_names,
+        )
+        errors.append(
             "The provided phenotypic table and data dictionary are incompatible. "
-            f"The following columns are annotated in the data dictionary but are missing from the phenotypic table: {missing_annotated_cols}. "
+            f"The following columns are annotated in the data dictionary but are missing from the phenotypic table: {diagnostics_utils.summarize_items(missing_col_names)}. "
             "Check that you've selected the correct data dictionary for your phenotypic table. "
-            "Each column described in the data dictionary must have a corresponding column with the same name in the phenotypic table.",
+            "Each column described in the data dictionary must have a corresponding column with the same name in the phenotypic table."
         )
 
-    columns_about_ids = get_columns_about(
-        data_dict, concept=mappings.NEUROBAGEL["participant"]
-    ) + get_columns_about(data_dict, concept=mappings.NEUROBAGEL["session"])
-    if row_indices := get_rows_with_empty_strings(pheno_df, columns_about_ids):
-        log_error(
-            logger,
+    if not (empty_ids := get_failures([PHENO_TABLE_CHECKS["empty_id"]])).empty:
+        empty_id_rows = get_row_indices(empty_ids)
+        diagnostics_utils.record_diagnostic(
+            "missing IDs in the phenotypic table (header row is 1)",
+            rows=empty_id_rows,
+        )
+        errors.append(
             "The phenotypic table contains missing values in participant or session ID columns. "
             "Ensure that each row includes a non-empty participant ID (and session ID, if the table contains a session ID column). "
-            f"Missing IDs were found in these rows (header row is 1): {row_indices}. "
-            "[italic]TIP: Check that your table does not have any completely empty rows.[/italic]",
+            f"Missing IDs were found in these rows (header row is 1): {diagnostics_utils.summarize_items(empty_id_rows)}. "
+            "[italic]TIP: Check that your table does not have any completely empty rows.[/italic]"
         )
 
-    check_for_duplicate_ids(data_dict, pheno_df)
+    if not (duplicate_ids := get_failures(DUPLICATE_ID_CHECKS)).empty:
+        duplicate_id_rows = get_row_indices(duplicate_ids)
+        diagnostics_utils.record_diagnostic(
+            "duplicate IDs in the phenotypic table (header row is 1)",
+            rows=duplicate_id_rows,
+        )
+        errors.append(
+            "The phenotypic table contains duplicate participant IDs or duplicate combinations of participant and session IDs. "
+            f"Duplicate IDs were found in these rows (header row is 1): {diagnostics_utils.summarize_items(duplicate_id_rows)}. "
+            "Ensure that each row represents a unique participant or participant-session (if a session column is present)."
+        )
 
-    undefined_cat_col_values = find_undefined_cat_col_values(
-        data_dict, pheno_df
-    )
-    if undefined_cat_col_values:
-        log_error(
-            logger,
+    if not (
+        undefined_values := get_failures(
+            [PHENO_TABLE_CHECKS["undefined_value"]]
+        )
+    ).empty:
+        unannotated_values = get_failure_values_by_column(undefined_values)
+        diagnostics_utils.record_diagnostic(
+            "unannotated values in categorical columns of the phenotypic table",
+            values_by_column=unannotated_values,
+            rows=get_row_indices(undefined_values),
+        )
+        errors.append(
             "One or more unique values found in annotated categorical columns of the phenotypic table are missing annotations in the data dictionary "
-            rf"(shown by column as 'column_name': \[unannotated_values]): {undefined_cat_col_values}. "
+            rf"(shown by column as 'column_name': \[unannotated_values]): {diagnostics_utils.summarize_items(unannotated_values)}. "
             "Check that you've selected the correct data dictionary or annotate the values that are missing. "
-            "[italic]TIP: Ensure that column values in the table exactly match the values annotated in the data dictionary.[/italic]",
+            "[italic]TIP: Ensure that column values in the table exactly match the values annotated in the data dictionary.[/italic]"
+        )
+
+    if not (
+        invalid_ages := get_failures([PHENO_TABLE_CHECKS["invalid_age"]])
+    ).empty:
+        invalid_age_values = get_failure_values_by_column(invalid_ages)
+        diagnostics_utils.record_diagnostic(
+            "invalid values in age columns of the phenotypic table",
+            values_by_column=invalid_age_values,
+            rows=get_row_indices(invalid_ages),
+        )
+        errors.append(
+            "One or more values in annotated age columns of the phenotypic table do not match the age format annotated in the data dictionary "
+            rf"(shown by column as 'column_name': \[invalid_values]): {diagnostics_utils.summarize_items(invalid_age_values)}. "
+            "Check your data dictionary to ensure that the annotated age format matches the age values in your phenotypic table, "
+            "and that any missing values in your age column have been correctly annotated. "
+            "For examples of acceptable values for specific age formats, see https://neurobagel.org/data_models/dictionaries/#age."
+        )
+
+    return errors
+
+
+def validate_inputs(
+    data_dict: dict, pheno_df: pd.DataFrame, config: str | None = None
+) -> None:
+    """Determine whether the input data dictionary and phenotypic table are valid and compatible."""
+    validate_data_dict(data_dict, config)
+
+    # All problems found in the table are reported together
+    try:
+        create_pheno_table_schema(data_dict).validate(pheno_df, lazy=True)
+    except pa.errors.SchemaErrors as err:
+        log_error(
+            logger, "\n\n".join(get_pheno_table_errors(err.failure_cases))
         )
 
     unused_missing_values = find_unused_missing_values(data_dict, pheno_df)
@@ -774,6 +990,142 @@ def convert_transformation_to_format(data_dict: dict) -> dict:
     return data_dict
 
 
+def get_subject_hashes(pheno_df: pd.DataFrame, data_dict: dict) -> dict:
+    """
+    Return a content hash for each participant in a validated phenotypic table, where keys are participant IDs.
+    A hash covers the values of all annotated columns in the participant's rows (in row order)
+    and the data dictionary entries for those columns, so it changes whenever the subject created for the participant could change.
+    """
+    participants = map_std_vars_to_columns(data_dict)["participant"][0]
+    dict_hash = hashlib.sha256(
+        json.dumps(
+            {col: data_dict[col] for col in pheno_df.columns},
+            sort_keys=True,
+        ).encode()
+    ).digest()
+    # Hash all rows at once, and then combine the row hashes of each participant
+    row_hashes = pd.util.hash_pandas_object(pheno_df, index=False)
+
+    return {
+        str(participant): hashlib.sha256(
+            dict_hash + participant_row_hashes.to_numpy().tobytes()
+        ).hexdigest()
+        for participant, participant_row_hashes in row_hashes.groupby(
+            pheno_df[participants].to_numpy(), sort=False
+        )
+    }
+
+
+def create_subjects(
+    pheno_df: pd.DataFrame,
+    data_dict: dict,
+    reusable_subjects: dict[str, models.Subject] | None = None,
+) -> list[models.Subject]:
+    """
+    Create a subject instance for each participant in a validated phenotypic table,
+    with one phenotypic session per row containing the standardized values for the annotated columns.
+    Participants found in reusable_subjects are not rebuilt, and the existing subject is used instead.
+    NOTE: Assumes that any v1 'Transformation' keys in the data dictionary have already been converted to 'Format'.
+    """
+    if reusable_subjects is None:
+        reusable_subjects = {}
+    subject_list = []
+
+    dict_index = DictionaryIndex(data_dict)
+    column_mapping = dict_index.map_std_vars_to_columns()
+    tool_mapping = dict_index.map_tools_to_columns()
+
+    # TODO: needs refactoring once we handle multiple participant IDs
+    participants = column_mapping["participant"][0]
+
+    # Note that `session_column will be None if there is no session column in the pheno.tsv
+    session_column = column_mapping.get("session")
+
+    for participant in pheno_df[participants].unique():
+        if str(participant) in reusable_subjects:
+            subject_list.append(reusable_subjects[str(participant)])
+            continue
+
+        _sub_pheno = pheno_df.query(
+            f"`{participants}` == '{str(participant)}'"
+        )
+
+        sessions = []
+        for session_row_idx, session_row in _sub_pheno.iterrows():
+            # Our data model requires a session. To support phenotypic data without sessions,
+            # we create a session with a fixed, but unusual CUSTOM_SESSION_LABEL and add the
+            # phenotypic data to that session.
+            if session_column is None:
+                session_label = mappings.CUSTOM_SESSION_LABEL
+            else:
+                # NOTE: We take the name from the first session column - we don't know how to handle multiple session columns yet
+                session_label = session_row[session_column[0]]
+
+            # Collect the attributes of the session first to create and validate it only once
+            session_attributes: dict = {"hasLabel": str(session_label)}
+            _ses_pheno = session_row
+
+            if "sex" in column_mapping.keys():
+                _sex_vals = get_transformed_values(
+                    column_mapping["sex"], _ses_pheno, data_dict
+                )
+                if _sex_vals:
+                    # NOTE: Our data model only allows a single sex value, so we only take the first instance if multiple columns are about sex
+                    session_attributes["hasSex"] = models.Sex.interned(
+                        _sex_vals[0]
+                    )
+
+            if "diagnosis" in column_mapping.keys():
+                _dx_vals = get_transformed_values(
+                    column_mapping["diagnosis"], _ses_pheno, data_dict
+                )
+                if _dx_vals:
+                    session_attributes["hasDiagnosis"] = [
+                        models.Diagnosis.interned(_dx_val)
+                        for _dx_val in _dx_vals
+                    ]
+
+            if "subject_group" in column_mapping.keys():
+                _group_vals = get_transformed_values(
+                    column_mapping["subject_group"],
+                    _ses_pheno,
+                    data_dict,
+                )
+                if _group_vals:
+                    session_attributes["isSubjectGroup"] = (
+                        models.SubjectGroup.interned(_group_vals[0])
+                    )
+
+            if "age" in column_mapping.keys():
+                # NOTE: At the moment, our data model only supports a single age value per subject.
+                # To achieve this, we transform the values from ALL columns annotated as about age
+                # (so we expect each of them to be valid according to the data dictionary model),
+                # but we take and store only the first instance in the graph data.
+                _age_vals = get_transformed_values(
+                    column_mapping["age"], _ses_pheno, data_dict
+                )
+                if _age_vals:
+                    session_attributes["hasAge"] = _age_vals[0]
+
+            if tool_mapping:
+                _assessments = [
+                    models.Assessment.interned(tool)
+                    for tool, columns in tool_mapping.items()
+                    if are_any_available(columns, _ses_pheno, data_dict)
+                ]
+                if _assessments:
+                    # Only set assessments for the subject if at least one has a non-missing item
+                    session_attributes["hasAssessment"] = _assessments
+            sessions.append(models.PhenotypicSession(**session_attributes))
+
+        subject = models.Subject(
+            hasLabel=str(participant), hasSession=sessions
+        )
+        subject_list.append(subject)
+
+    return subject_list
+
+
 def dataset_description_to_graph_attributes(
     dataset_description: dataset_description_model.DatasetDescription,
 ) -> dict:
@@ -803,3 +1155,53 @@ def dataset_description_to_graph_attributes(
     }
 
     return dataset_graph_attributes
+
+
+def validate_pheno_dataset_inputs(
+    pheno_df: pd.DataFrame,
+    data_dictionary: dict,
+    dataset_description: dict,
+    config: str,
+) -> tuple[dict, dataset_description_model.DatasetDescription]:
+    """
+    Validate the loaded phenotypic table, data dictionary and dataset description of a dataset.
+    Return the data dictionary with its annotations in the current format, and the validated dataset description.
+    """
+    with timed_stage("validate phenotypic inputs") as stage:
+        validate_inputs(data_dictionary, pheno_df, config)
+        validated_description = validate_dataset_description(
+            dataset_description
+        )
+        stage["rows"] = len(pheno_df)
+
+    # TODO: Remove once we no longer support annotation tool v1 data dictionaries
+    return (
+        convert_transformation_to_format(data_dictionary),
+        validated_description,
+    )
+
+
+def create_pheno_dataset(
+    pheno_df: pd.DataFrame,
+    data_dict: dict,
+    dataset_description: dataset_description_model.DatasetDescription,
+    reusable_subjects: dict[str, models.Subject] | None = None,
+) -> models.Dataset:
+    """
+    Return a dataset with the harmonized phenotypic data for each subject, from validated phenotypic inputs.
+    Participants found in reusable_subjects are not rebuilt, and the existing subject is used instead.
+    """
+    logger.info("Processing phenotypic annotations...")
+    with timed_stage("create subjects") as stage:
+        subject_list = create_subjects(pheno_df, data_dict, reusable_subjects)
+        stage["rows"] = len(pheno_df)
+        stage["subjects"] = len(subject_list)
+
+    with timed_stage("build models") as stage:
+        dataset = models.Dataset(
+            **dataset_description_to_graph_attributes(dataset_description),
+            hasSamples=subject_list,
+        )
+        stage["subjects"] = len(subject_list)
+
+    return dataset
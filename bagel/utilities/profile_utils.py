@@ -0,0 +1,136 @@
+import cProfile
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+
+import typer
+
+from bagel.logger import logger
+
+# Seconds between two samples of the call stack in sampling mode
+SAMPLING_INTERVAL = 0.005
+
+
+class ProfileMode(str, Enum):
+    """Enum for the available profilers."""
+
+    DETERMINISTIC = "deterministic"
+    SAMPLING = "sampling"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that periodically records the call stack of the thread that enabled it from a background thread.
+    It has a much lower overhead than cProfile and writes the same .pstats format, but the call counts are numbers
+    of samples and the times are estimates.
+    """
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL):
+        self.interval = interval
+        # Maps each sampled call stack (innermost function first) to its number of samples and total sampled time
+        self.stack_counts: Counter = Counter()
+        self.stack_times: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def enable(self):
+        self._target_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self):
+        last_sample_time = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_filename, code.co_firstlineno, code.co_name)
+                )
+                frame = frame.f_back
+            if stack:
+                self.stack_counts[tuple(stack)] += 1
+                self.stack_times[tuple(stack)] += now - last_sample_time
+            last_sample_time = now
+
+    def create_stats(self) -> dict:
+        """
+        Aggregate the sampled call stacks into the statistics format of cProfile, where each function
+        (filename, line number, function name) is mapped to (primitive calls, calls, own time, cumulative time, callers).
+        """
+        own_times: Counter = Counter()
+        cumulative_times: Counter = Counter()
+        samples: Counter = Counter()
+        callers: dict[tuple, Counter] = {}
+        caller_times: dict[tuple, Counter] = {}
+        for stack, count in self.stack_counts.items():
+            stack_time = self.stack_times[stack]
+            own_times[stack[0]] += stack_time
+            # Recursive functions appear several times in a stack but are counted once
+            for func in set(stack):
+                cumulative_times[func] += stack_time
+                samples[func] += count
+            for callee, caller in set(zip(stack, stack[1:])):
+                callers.setdefault(callee, Counter())[caller] += count
+                caller_times.setdefault(callee, Counter())[
+                    caller
+                ] += stack_time
+
+        return {
+            func: (
+                samples[func],
+                samples[func],
+                own_times[func],
+                cumulative_times[func],
+                {
+                    caller: (
+                        count,
+                        count,
+                        caller_times[func][caller],
+                        caller_times[func][caller],
+                    )
+                    for caller, count in callers.get(func, {}).items()
+                },
+            )
+            for func in samples
+        }
+
+    def dump_stats(self, file: str | Path):
+        with open(file, "wb") as f:
+            marshal.dump(self.create_stats(), f)
+
+
+def start_profiling(ctx: typer.Context, profile: Path | None) -> Path | None:
+    """
+    Profile the rest of the command and save the profile to the specified .pstats file when the command finishes,
+    including when it exits with an error.
+    """
+    if profile is None or ctx.resilient_parsing:
+        return profile
+
+    if ctx.params.get("profile_mode") == ProfileMode.SAMPLING:
+        profiler: cProfile.Profile | SamplingProfiler = SamplingProfiler()
+    else:
+        profiler = cProfile.Profile()
+
+    def save_profile():
+        profiler.disable()
+        profiler.dump_stats(profile)
+        logger.info(f"Saved profile to:  {profile}")
+
+    profiler.enable()
+    ctx.call_on_close(save_profile)
+    return profile
@@ -0,0 +1,231 @@
+import ipaddress
+import json
+from contextlib import suppress
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit
+
+import click
+import typer
+from typer import BadParameter
+from typer.core import TyperGroup
+
+from bagel._version import __version__
+from bagel.logger import (
+    LoggedErrorExit,
+    capture_logs,
+    logger,
+    restore_log_settings,
+)
+from bagel.utilities import (
+    bids_utils,
+    derivative_utils,
+    model_utils,
+    pheno_utils,
+)
+
+JOBS_PATH = "/jobs"
+HEALTH_PATH = "/health"
+# Host names that always refer to the machine running the server
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+# Commands that run once and then exit, which are the only commands that can be run as jobs of a server
+# (long-running commands like 'serve' and 'watch' would block the server indefinitely)
+JOB_COMMANDS = {
+    "bids2tsv",
+    "pheno",
+    "bids",
+    "derivatives",
+    "harmonize-pheno",
+    "run",
+    "merge",
+    "batch",
+}
+
+
+def check_loopback_host(host: str) -> str:
+    """
+    Raise an error if the host address is not a loopback address.
+    Jobs read and write arbitrary paths on the machine running the server and requests are not authenticated,
+    so the server must only be reachable from the same machine.
+    """
+    try:
+        is_loopback = ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        is_loopback = host == "localhost"
+    if not is_loopback:
+        raise BadParameter(
+            f"The server can only listen on a loopback address (e.g., {sorted(LOOPBACK_HOSTS)}), got '{host}'."
+        )
+    return host
+
+
+def warm_caches():
+    """
+    Load the vocabularies, catalogs and validators used by the commands, so that they are reused by every job
+    instead of being loaded by the first job that needs them.
+    """
+    pheno_utils.get_config_namespaces_index()
+    pheno_utils.get_data_dict_validator()
+    model_utils.get_model_context_fields()
+    bids_utils.get_all_bids_suffixes()
+    bids_utils.get_bids_raw_data_suffixes()
+    derivative_utils.get_pipeline_catalog()
+    # The error has already been logged, and only affects jobs processing BIDS tables
+    with suppress(LoggedErrorExit):
+        bids_utils.get_bids_suffix_to_std_term_mapping()
+
+
+def run_job(cli: TyperGroup, args: list[str]) -> dict:
+    """
+    Run a CLI command with the specified arguments in the current process,
+    and return its exit code along with the logs emitted while it ran.
+    """
+    if not args or args[0] not in JOB_COMMANDS:
+        return {
+            "exit_code": 2,
+            "logs": [],
+            "error": (
+                f"The '{args[0]}' command cannot be run as a job. "
+                if args
+                else "No command was specified for the job. "
+            )
+            + f"Jobs can run the following commands: {sorted(JOB_COMMANDS)}.",
+        }
+
+    error = None
+    # Commands set the log format and level from their own options, which should not persist for the server
+    with restore_log_settings(), capture_logs() as logs:
+        try:
+            # NOTE: In non-standalone mode, click returns the exit code of commands that exit
+            # (including on errors logged by the CLI) instead of exiting the process
+            exit_code = cli.main(
+                args=args, prog_name="bagel", standalone_mode=False
+            )
+        except typer.TyperException as err:
+            # Invalid command-line arguments
+            exit_code, error = err.exit_code, err.format_message()
+        except typer.Abort:
+            exit_code, error = 1, "Aborted."
+        except Exception as err:
+            logger.exception("Unexpected error while running the job.")
+            exit_code, error = 1, repr(err)
+
+    if exit_code is None:
+        # Commands that complete normally return None
+        exit_code = 0
+    elif not isinstance(exit_code, int):
+        # Commands can also exit with a message instead of an exit code (e.g., when the output file already exists)
+        exit_code, error = 1, click.unstyle(str(exit_code))
+
+    job_result = {"exit_code": exit_code, "logs": logs}
+    if error is not None:
+        job_result["error"] = error
+    return job_result
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handle requests to a bagel server:
+    - GET /health returns the CLI version
+    - POST /jobs with a JSON body {"args": [...]} runs a CLI command with the listed arguments (e.g., ["pheno", "--pheno", ...])
+    and returns its exit code and logs
+    """
+
+    # The CLI running the jobs, set when the server is created
+    cli: TyperGroup
+    # Host names accepted in the Host and Origin headers of job requests, set when the server is created
+    allowed_hosts: set[str]
+
+    def send_json(self, status: HTTPStatus, content: dict):
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != HEALTH_PATH:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+        self.send_json(
+            HTTPStatus.OK, {"status": "ok", "bagel_version": __version__}
+        )
+
+    def is_from_web_page(self) -> bool:
+        """
+        Return whether a request could have been sent by a web page open in a browser,
+        either directly (a cross-site request) or through a host name resolving to the server (DNS rebinding).
+        """
+        host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        if host not in self.allowed_hosts:
+            return True
+        origin = self.headers.get("Origin")
+        return (
+            origin is not None
+            and urlsplit(origin).hostname not in self.allowed_hosts
+        )
+
+    def do_POST(self):
+        if self.path != JOBS_PATH:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+        if self.is_from_web_page():
+            self.send_json(
+                HTTPStatus.FORBIDDEN,
+                {
+                    "error": "The request must be addressed to the host the server listens on, and cannot be sent from a web page."
+                },
+            )
+            return
+        content_type = self.headers.get_content_type()
+        if content_type != "application/json":
+            self.send_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                {
+                    "error": f"The request body must be JSON, with the header 'Content-Type: application/json' (got '{content_type}')."
+                },
+            )
+            return
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(content_length))
+            args = job["args"]
+            if not (
+                isinstance(args, list)
+                and all(isinstance(arg, str) for arg in args)
+            ):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            self.send_json(
+                HTTPStatus.BAD_REQUEST,
+                {
+                    "error": 'The request body must be a JSON object with a list of CLI arguments, e.g. {"args": ["pheno", "--pheno", "/data/pheno.tsv", ...]}.'
+                },
+            )
+            return
+
+        logger.debug("Running job: bagel %s", " ".join(args))
+        self.send_json(HTTPStatus.OK, run_job(self.cli, args))
+
+    def log_message(self, format: str, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host: str, port: int, app: typer.Typer) -> HTTPServer:
+    """
+    Create a server running jobs of the specified CLI app one at a time, in the current process.
+    Jobs are not run concurrently because the CLI keeps the state of the running command (e.g., recorded timings) in memory.
+    The server only listens on a loopback address, and job requests must be addressed to the host
+    the server listens on or to another loopback address.
+    """
+    check_loopback_host(host)
+    handler_cls = type(
+        "BoundJobRequestHandler",
+        (JobRequestHandler,),
+        {
+            "cli": typer.main.get_command(app),
+            "allowed_hosts": LOOPBACK_HOSTS | {host.strip("[]")},
+        },
+    )
+    return HTTPServer((host, port), handler_cls)
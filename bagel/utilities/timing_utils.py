@@ -0,0 +1,110 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import typer
+
+from bagel.logger import logger
+from bagel.utilities import memory_utils
+
+# Records of the completed stages of the current command, only collected when a timing file is requested
+_stage_records: list[dict] | None = None
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[dict]:
+    """
+    Time a named stage of a command and log its duration at the DEBUG level once the stage completes.
+    Counts of the items processed in the stage (e.g., rows or subjects) can be added to the yielded dictionary,
+    and are logged along with the corresponding throughput.
+    If memory tracking is enabled, the memory use of the stage is also measured and logged.
+    A stage that raises an error is still logged and recorded, and marked as failed.
+    """
+    counts: dict[str, int] = {}
+    memory_tracker = None
+    if memory_utils.is_tracking_enabled():
+        memory_tracker = memory_utils.StageMemoryTracker()
+        memory_tracker.start()
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield counts
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        memory_stats = {}
+        if memory_tracker is not None:
+            memory_stats = memory_tracker.stop()
+            logger.info(
+                "Memory use of stage '%s': %s",
+                name,
+                memory_utils.format_memory_stats(memory_stats),
+            )
+
+        throughputs = {
+            f"{item}_per_s": (
+                round(count / duration, 1) if duration > 0 else None
+            )
+            for item, count in counts.items()
+        }
+        logger.debug(
+            "Stage '%s' %s %.3f s%s",
+            name,
+            "failed after" if failed else "took",
+            duration,
+            "".join(
+                f"; {count} {item} ({throughputs[f'{item}_per_s']} {item}/s)"
+                for item, count in counts.items()
+            ),
+        )
+        if _stage_records is not None:
+            _stage_records.append(
+                {
+                    "stage": name,
+                    "duration_s": round(duration, 4),
+                    **({"failed": True} if failed else {}),
+                    **counts,
+                    **throughputs,
+                    **memory_stats,
+                }
+            )
+
+
+def save_timings(command: str, total_duration: float, output: Path):
+    """Save the durations of all stages of a command recorded so far to a .json file."""
+    output.write_text(
+        json.dumps(
+            {
+                "command": command,
+                "duration_s": round(total_duration, 4),
+                "stages": _stage_records,
+            },
+            indent=2,
+        )
+    )
+    logger.info(f"Saved stage timings to:  {output}")
+
+
+def start_timing(ctx: typer.Context, timings: Path | None) -> Path | None:
+    """
+    Record the durations of the stages of the rest of the command, and save them to the specified .json file
+    when the command finishes. If the command exits with an error, the stages run until then are saved, including the failed stage.
+    """
+    global _stage_records
+    _stage_records = None
+    if timings is None or ctx.resilient_parsing:
+        return timings
+
+    _stage_records = []
+    start = time.perf_counter()
+
+    ctx.call_on_close(
+        lambda: save_timings(
+            ctx.info_name or "bagel", time.perf_counter() - start, timings
+        )
+    )
+    return timings
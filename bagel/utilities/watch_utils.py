@@ -0,0 +1,52 @@
+import time
+from pathlib import Path
+from typing import Iterator
+
+# Default number of seconds between checks of the watched files for changes
+DEFAULT_WATCH_INTERVAL = 0.5
+
+
+def get_modification_times(paths: list[Path]) -> dict[Path, int | None]:
+    """Return the last modification time of each file in nanoseconds, or None for files that do not currently exist."""
+    modification_times: dict[Path, int | None] = {}
+    for path in paths:
+        try:
+            modification_times[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            # e.g., while an editor replaces the file
+            modification_times[path] = None
+    return modification_times
+
+
+def watch_files(
+    paths: list[Path], interval: float = DEFAULT_WATCH_INTERVAL
+) -> Iterator[list[Path]]:
+    """
+    Yield all of the files once, and then yield the files that changed each time any of them change,
+    checking for changes every `interval` seconds.
+    A change is only reported once the files have stopped changing for one interval, so that files being saved are not read partially.
+    """
+    previous_times = get_modification_times(paths)
+    yield list(paths)
+    while True:
+        time.sleep(interval)
+        current_times = get_modification_times(paths)
+        if current_times == previous_times:
+            continue
+
+        # Wait until the files have stopped changing
+        time.sleep(interval)
+        while (
+            settled_times := get_modification_times(paths)
+        ) != current_times:
+            current_times = settled_times
+            time.sleep(interval)
+        # Wait for the files to exist again, e.g. if they are replaced rather than modified in place
+        if None in current_times.values():
+            continue
+        yield [
+            path
+            for path in paths
+            if current_times[path] != previous_times[path]
+        ]
+        previous_times = current_times
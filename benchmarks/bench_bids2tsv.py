@@ -0,0 +1,87 @@
+"""Runtime of the separate stages of crawling synthetic BIDS datasets of increasing size with bagel bids2tsv."""
+
+from pathlib import Path
+
+import bids2table as b2t2
+from bids import BIDSLayout
+
+from bagel.utilities import bids_utils
+
+from . import generators
+from .common import invoke_bagel
+
+N_SUBJECTS = [10, 100, 1_000]
+N_SESSIONS = [1, 4]
+SUFFIXES = ["T1w", "bold", "dwi"]
+
+
+class Bids2tsv:
+    params = [N_SUBJECTS, N_SESSIONS]
+    param_names = ["n_subjects", "n_sessions"]
+    timeout = 600
+
+    def setup_cache(self):
+        """Write a BIDS dataset for every combination of parameters once, to be reused by all benchmarks."""
+        bids_dirs = {}
+        for n_subjects in N_SUBJECTS:
+            for n_sessions in N_SESSIONS:
+                bids_dirs[(n_subjects, n_sessions)] = (
+                    generators.write_bids_tree(
+                        Path(f"bids_{n_subjects}x{n_sessions}").absolute(),
+                        n_subjects=n_subjects,
+                        n_sessions=n_sessions,
+                        suffixes=SUFFIXES,
+                        file_size=1024,
+                    )
+                )
+        return bids_dirs
+
+    def setup(self, bids_dirs, n_subjects, n_sessions):
+        self.bids_dir = bids_dirs[(n_subjects, n_sessions)]
+        self.output = self.bids_dir.parent / f"{self.bids_dir.name}.tsv"
+        self.dataset_df = b2t2.index_dataset(self.bids_dir).to_pandas()
+        self.nb_bids_suffix_term_map = (
+            bids_utils.get_bids_suffix_to_std_term_mapping()
+        )
+        self.supported_suffixes = self.partition_suffixes()
+
+    def partition_suffixes(self) -> set[str]:
+        """Return the Neurobagel-supported image suffixes found in the dataset, as determined in bids2tsv."""
+        bids_recognized_suffixes, _ = bids_utils.partition_suffixes(
+            suffixes=self.dataset_df["suffix"].unique().tolist(),
+            reference_suffixes=bids_utils.get_all_bids_suffixes(),
+        )
+        bids_raw_data_suffixes, _ = bids_utils.partition_suffixes(
+            suffixes=bids_recognized_suffixes,
+            reference_suffixes=bids_utils.get_bids_raw_data_suffixes(),
+        )
+        neurobagel_supported_suffixes, _ = bids_utils.partition_suffixes(
+            suffixes=bids_raw_data_suffixes,
+            reference_suffixes=self.nb_bids_suffix_term_map.keys(),
+        )
+        return neurobagel_supported_suffixes
+
+    def time_bids_layout_validation(self, bids_dirs, n_subjects, n_sessions):
+        BIDSLayout(self.bids_dir, validate=True)
+
+    def time_index_dataset(self, bids_dirs, n_subjects, n_sessions):
+        b2t2.index_dataset(self.bids_dir).to_pandas()
+
+    def time_partition_suffixes(self, bids_dirs, n_subjects, n_sessions):
+        self.partition_suffixes()
+
+    def time_write_tsv(self, bids_dirs, n_subjects, n_sessions):
+        """Time the formatting and writing of the BIDS table, as done at the end of bids2tsv."""
+        bids_utils.format_indexed_bids_table(
+            self.dataset_df, self.supported_suffixes
+        ).to_csv(self.output, sep="\t", index=False)
+
+    def time_bids2tsv(self, bids_dirs, n_subjects, n_sessions):
+        invoke_bagel(
+            "bids2tsv", "--bids-dir", self.bids_dir, "--output", self.output
+        )
+
+    def peakmem_bids2tsv(self, bids_dirs, n_subjects, n_sessions):
+        invoke_bagel(
+            "bids2tsv", "--bids-dir", self.bids_dir, "--output", self.output
+        )
@@ -0,0 +1,133 @@
+"""Runtime and peak memory of the bagel commands on synthetic inputs of increasing size."""
+
+import tempfile
+from pathlib import Path
+
+from . import generators
+from .common import ROW_COUNTS, invoke_bagel
+
+
+class CommandBenchmark:
+    params = ROW_COUNTS
+    param_names = ["n_rows"]
+    # The largest inputs take much longer than the asv default of 60 seconds
+    timeout = 3600
+
+    def setup(self, n_rows):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.inputs = generators.write_inputs(self.tmp_path, n_rows)
+        self.output = self.tmp_path / "output.jsonld"
+
+    def teardown(self, n_rows):
+        self._tmp_dir.cleanup()
+
+    def pheno_args(self) -> list:
+        return [
+            "--pheno",
+            self.inputs["pheno"],
+            "--dictionary",
+            self.inputs["dictionary"],
+            "--dataset-description",
+            self.inputs["description"],
+        ]
+
+
+class Pheno(CommandBenchmark):
+    def time_pheno(self, n_rows):
+        invoke_bagel("pheno", *self.pheno_args(), "--output", self.output)
+
+    def peakmem_pheno(self, n_rows):
+        invoke_bagel("pheno", *self.pheno_args(), "--output", self.output)
+
+
+class PhenoJsonldBenchmark(CommandBenchmark):
+    """Base class for commands that take the output of bagel pheno as input."""
+
+    def setup(self, n_rows):
+        super().setup(n_rows)
+        self.pheno_jsonld = self.tmp_path / "pheno.jsonld"
+        invoke_bagel(
+            "pheno", *self.pheno_args(), "--output", self.pheno_jsonld
+        )
+
+
+class Bids(PhenoJsonldBenchmark):
+    def run_bids(self):
+        invoke_bagel(
+            "bids",
+            "--jsonld-path",
+            self.pheno_jsonld,
+            "--bids-table",
+            self.inputs["bids_table"],
+            "--dataset-source-dir",
+            "/data/synthetic",
+            "--output",
+            self.output,
+        )
+
+    def time_bids(self, n_rows):
+        self.run_bids()
+
+    def peakmem_bids(self, n_rows):
+        self.run_bids()
+
+
+class Derivatives(PhenoJsonldBenchmark):
+    def run_derivatives(self):
+        invoke_bagel(
+            "derivatives",
+            "--tabular",
+            self.inputs["processing_status"],
+            "--jsonld-path",
+            self.pheno_jsonld,
+            "--output",
+            self.output,
+        )
+
+    def time_derivatives(self, n_rows):
+        self.run_derivatives()
+
+    def peakmem_derivatives(self, n_rows):
+        self.run_derivatives()
+
+
+class HarmonizePheno(CommandBenchmark):
+    def run_harmonize_pheno(self):
+        invoke_bagel(
+            "harmonize-pheno",
+            "--pheno",
+            self.inputs["pheno"],
+            "--dictionary",
+            self.inputs["dictionary"],
+            "--output",
+            self.tmp_path / "harmonized.tsv",
+        )
+
+    def time_harmonize_pheno(self, n_rows):
+        self.run_harmonize_pheno()
+
+    def peakmem_harmonize_pheno(self, n_rows):
+        self.run_harmonize_pheno()
+
+
+class Run(CommandBenchmark):
+    def run_all(self):
+        invoke_bagel(
+            "run",
+            *self.pheno_args(),
+            "--bids-table",
+            self.inputs["bids_table"],
+            "--dataset-source-dir",
+            "/data/synthetic",
+            "--processing-status",
+            self.inputs["processing_status"],
+            "--output",
+            self.output,
+        )
+
+    def time_run(self, n_rows):
+        self.run_all()
+
+    def peakmem_run(self, n_rows):
+        self.run_all()
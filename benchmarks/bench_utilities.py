@@ -0,0 +1,102 @@
+"""Runtime and peak memory of the utility functions on the hot paths of the bagel commands."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from bagel.utilities import file_utils, pheno_utils
+
+from . import generators
+from .common import ROW_COUNTS, invoke_bagel
+
+
+class TransformedValues:
+    params = ROW_COUNTS
+    param_names = ["n_rows"]
+
+    def setup(self, n_rows):
+        self.pheno_df = generators.make_pheno_table(n_rows)
+        self.data_dict = generators.make_data_dictionary()
+        column_mapping = pheno_utils.map_std_vars_to_columns(self.data_dict)
+        self.columns = [
+            column_mapping[std_var] for std_var in ["sex", "diagnosis", "age"]
+        ]
+
+    def transform_all_rows(self):
+        for _, row in self.pheno_df.iterrows():
+            for columns in self.columns:
+                pheno_utils.get_transformed_values(
+                    columns, row, self.data_dict
+                )
+
+    def time_get_transformed_values(self, n_rows):
+        self.transform_all_rows()
+
+    def peakmem_get_transformed_values(self, n_rows):
+        self.transform_all_rows()
+
+
+class ValidateDataDict:
+    # Number of assessment tool item columns in addition to the standard ones
+    params = [10, 100, 1_000, 10_000]
+    param_names = ["n_extra_items"]
+
+    def setup(self, n_extra_items):
+        self.data_dict = generators.make_data_dictionary(n_extra_items)
+        # Create the cached validator outside of the timed code
+        pheno_utils.get_data_dict_validator()
+
+    def time_validate_data_dict(self, n_extra_items):
+        pheno_utils.validate_data_dict(self.data_dict, "Neurobagel")
+
+    def peakmem_validate_data_dict(self, n_extra_items):
+        pheno_utils.validate_data_dict(self.data_dict, "Neurobagel")
+
+
+class ValidatePhenoTable:
+    params = ROW_COUNTS
+    param_names = ["n_rows"]
+
+    def setup(self, n_rows):
+        self.pheno_df = generators.make_pheno_table(n_rows)
+        self.data_dict = generators.make_data_dictionary()
+
+    def time_validate_inputs(self, n_rows):
+        pheno_utils.validate_inputs(self.data_dict, self.pheno_df)
+
+    def peakmem_validate_inputs(self, n_rows):
+        pheno_utils.validate_inputs(self.data_dict, self.pheno_df)
+
+
+class SaveJsonld:
+    params = ROW_COUNTS
+    param_names = ["n_rows"]
+    # Creating the JSONLD data to save runs the pheno command on the largest inputs
+    timeout = 3600
+
+    def setup(self, n_rows):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        inputs = generators.write_inputs(self.tmp_path, n_rows)
+        pheno_jsonld = self.tmp_path / "pheno.jsonld"
+        invoke_bagel(
+            "pheno",
+            "--pheno",
+            inputs["pheno"],
+            "--dictionary",
+            inputs["dictionary"],
+            "--dataset-description",
+            inputs["description"],
+            "--output",
+            pheno_jsonld,
+        )
+        self.jsonld = json.loads(pheno_jsonld.read_text())
+
+    def teardown(self, n_rows):
+        self._tmp_dir.cleanup()
+
+    def time_save_jsonld(self, n_rows):
+        file_utils.save_jsonld(self.jsonld, self.tmp_path / "output.jsonld")
+
+    def peakmem_save_jsonld(self, n_rows):
+        file_utils.save_jsonld(self.jsonld, self.tmp_path / "output.jsonld")
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from bagel.cli import bagel
+
+# Number of rows of each synthetic input table
+ROW_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+
+runner = CliRunner()
+
+
+def invoke_bagel(*args: str | Path):
+    """Run a bagel command without console logging and raise an error if it does not exit successfully."""
+    result = runner.invoke(
+        bagel, [*map(str, args), "--overwrite", "--verbosity", "0"]
+    )
+    if result.exit_code != 0:
+        raise RuntimeError(
+            f"'bagel {args[0]}' exited with code {result.exit_code}. Output: {result.output}"
+        ) from result.exception
@@ -0,0 +1,317 @@
+"""Generators for synthetic Neurobagel inputs of arbitrary size, used by the benchmarks."""
+
+import json
+import os
+import random
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+SESSIONS_PER_SUBJECT = 2
+BIDS_SUFFIXES = ["T1w", "bold", "dwi"]
+# Pipeline names and versions that are recognized in the Nipoppy pipeline catalog
+PIPELINES = [("fmriprep", "23.1.3"), ("freesurfer", "7.3.2")]
+PROC_STATUSES = ["SUCCESS", "FAIL", "INCOMPLETE", "UNAVAILABLE"]
+# BIDS datatype directory and extra filename entities for the image suffixes of synthetic BIDS trees
+BIDS_SUFFIX_FILE_PARTS = {
+    "T1w": ("anat", ""),
+    "T2w": ("anat", ""),
+    "FLAIR": ("anat", ""),
+    "bold": ("func", "_task-rest"),
+    "dwi": ("dwi", ""),
+}
+
+
+def get_subject_ids(n_subjects: int) -> list[str]:
+    """Return n_subjects zero-padded participant IDs."""
+    width = len(str(n_subjects))
+    return [f"sub-{i:0{width}d}" for i in range(1, n_subjects + 1)]
+
+
+def get_subject_session_pairs(n_rows: int) -> tuple[list[str], list[str]]:
+    """Return the participant and session ID columns of a table with n_rows unique subject-session pairs."""
+    sub_ids = []
+    ses_ids = []
+    for sub_id in get_subject_ids(-(-n_rows // SESSIONS_PER_SUBJECT)):
+        for ses_num in range(1, SESSIONS_PER_SUBJECT + 1):
+            sub_ids.append(sub_id)
+            ses_ids.append(f"ses-{ses_num:02d}")
+    return sub_ids[:n_rows], ses_ids[:n_rows]
+
+
+def make_data_dictionary(n_extra_items: int = 0) -> dict:
+    """
+    Return a data dictionary annotating every column of the table from make_pheno_table,
+    plus n_extra_items additional assessment tool item columns.
+    """
+
+    def collection_column(item: str, tool_term: str, tool_label: str) -> dict:
+        return {
+            "Description": f"{item} score for {tool_label}",
+            "Annotations": {
+                "IsAbout": {
+                    "TermURL": "nb:Assessment",
+                    "Label": "Assessment tool",
+                },
+                "VariableType": "Collection",
+                "IsPartOf": {"TermURL": tool_term, "Label": tool_label},
+                "MissingValues": ["n/a"],
+            },
+        }
+
+    data_dict = {
+        "participant_id": {
+            "Description": "A participant ID",
+            "Annotations": {
+                "IsAbout": {
+                    "TermURL": "nb:ParticipantID",
+                    "Label": "Unique participant identifier",
+                },
+                "VariableType": "Identifier",
+            },
+        },
+        "session_id": {
+            "Description": "A session ID",
+            "Annotations": {
+                "IsAbout": {
+                    "TermURL": "nb:SessionID",
+                    "Label": "Unique session identifier",
+                },
+                "VariableType": "Identifier",
+            },
+        },
+        "age": {
+            "Description": "Age of the participant",
+            "Annotations": {
+                "IsAbout": {
+                    "TermURL": "nb:Age",
+                    "Label": "Chronological age",
+                },
+                "VariableType": "Continuous",
+                "Format": {
+                    "TermURL": "nb:FromISO8601",
+                    "Label": "period of time defined according to the ISO8601 standard",
+                },
+                "MissingValues": ["n/a"],
+            },
+        },
+        "sex": {
+            "Description": "Sex of the participant",
+            "Levels": {"M": "Male", "F": "Female", "n/a": "Missing"},
+            "Annotations": {
+                "IsAbout": {"TermURL": "nb:Sex", "Label": "Sex"},
+                "VariableType": "Categorical",
+                "Levels": {
+                    "M": {"TermURL": "snomed:248153007", "Label": "Male"},
+                    "F": {"TermURL": "snomed:248152002", "Label": "Female"},
+                },
+                "MissingValues": ["n/a"],
+            },
+        },
+        "group": {
+            "Description": "Group of the participant",
+            "Levels": {"PD": "Parkinson's disease", "HC": "Healthy control"},
+            "Annotations": {
+                "IsAbout": {"TermURL": "nb:Diagnosis", "Label": "Diagnosis"},
+                "VariableType": "Categorical",
+                "Levels": {
+                    "PD": {
+                        "TermURL": "snomed:49049000",
+                        "Label": "Parkinson's disease",
+                    },
+                    "HC": {
+                        "TermURL": "ncit:C94342",
+                        "Label": "Healthy Control",
+                    },
+                },
+            },
+        },
+        "moca_total": collection_column(
+            "Total", "snomed:859351000000102", "Montreal cognitive assessment"
+        ),
+        "updrs_part1": collection_column(
+            "Part I",
+            "snomed:342061000000106",
+            "Unified Parkinson's disease rating scale",
+        ),
+        "updrs_part2": collection_column(
+            "Part II",
+            "snomed:342061000000106",
+            "Unified Parkinson's disease rating scale",
+        ),
+    }
+    for item_num in range(1, n_extra_items + 1):
+        data_dict[f"item_{item_num}"] = collection_column(
+            f"Item {item_num}", "snomed:273249006", "Assessment scales"
+        )
+    return data_dict
+
+
+def make_pheno_table(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a phenotypic table with n_rows subject-sessions, matching the dictionary from make_data_dictionary."""
+    rng = random.Random(seed)
+    sub_ids, ses_ids = get_subject_session_pairs(n_rows)
+
+    def score_or_missing(max_score: int) -> str:
+        return "n/a" if rng.random() < 0.05 else str(rng.randint(0, max_score))
+
+    return pd.DataFrame(
+        {
+            "participant_id": sub_ids,
+            "session_id": ses_ids,
+            "age": [
+                (
+                    "n/a"
+                    if rng.random() < 0.05
+                    else f"P{rng.randint(18, 90)}Y{rng.randint(0, 11)}M"
+                )
+                for _ in range(n_rows)
+            ],
+            "sex": [rng.choice(["M", "F", "n/a"]) for _ in range(n_rows)],
+            "group": [rng.choice(["PD", "HC"]) for _ in range(n_rows)],
+            "moca_total": [score_or_missing(30) for _ in range(n_rows)],
+            "updrs_part1": [score_or_missing(52) for _ in range(n_rows)],
+            "updrs_part2": [score_or_missing(52) for _ in range(n_rows)],
+        }
+    )
+
+
+def make_bids_table(
+    n_rows: int, dataset_root: str = "/data/synthetic"
+) -> pd.DataFrame:
+    """
+    Return a BIDS table (as created by bagel bids2tsv) with n_rows image files,
+    spread over the subject-sessions of a phenotypic table of the same size.
+    """
+    n_sessions = -(-n_rows // len(BIDS_SUFFIXES))
+    sub_ids, ses_ids = get_subject_session_pairs(n_sessions)
+    rows = []
+    for sub_id, ses_id in zip(sub_ids, ses_ids):
+        for suffix in BIDS_SUFFIXES:
+            datatype, entities = BIDS_SUFFIX_FILE_PARTS[suffix]
+            rows.append(
+                {
+                    "sub": sub_id,
+                    "ses": ses_id,
+                    "suffix": suffix,
+                    "path": f"{dataset_root}/{sub_id}/{ses_id}/{datatype}/{sub_id}_{ses_id}{entities}_{suffix}.nii.gz",
+                }
+            )
+    return pd.DataFrame(rows[:n_rows])
+
+
+def make_processing_status(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a Nipoppy processing status table with n_rows records for recognized pipelines."""
+    rng = random.Random(seed)
+    n_sessions = -(-n_rows // len(PIPELINES))
+    sub_ids, ses_ids = get_subject_session_pairs(n_sessions)
+    rows = []
+    for sub_id, ses_id in zip(sub_ids, ses_ids):
+        for pipeline_name, pipeline_version in PIPELINES:
+            rows.append(
+                {
+                    "participant_id": sub_id.removeprefix("sub-"),
+                    "bids_participant_id": sub_id,
+                    "session_id": ses_id.removeprefix("ses-"),
+                    "bids_session_id": ses_id,
+                    "pipeline_name": pipeline_name,
+                    "pipeline_version": pipeline_version,
+                    "pipeline_step": "default",
+                    "status": rng.choice(PROC_STATUSES),
+                }
+            )
+    return pd.DataFrame(rows[:n_rows])
+
+
+def make_dataset_description() -> dict:
+    """Return a minimal dataset description for a synthetic dataset."""
+    return {"Name": "Synthetic benchmark dataset"}
+
+
+def write_bids_tree(
+    bids_dir: Path,
+    n_subjects: int,
+    n_sessions: int,
+    suffixes: list[str] = BIDS_SUFFIXES,
+    file_size: int = 0,
+    sidecars: bool = True,
+) -> Path:
+    """
+    Write a valid synthetic BIDS dataset with an image for each suffix in every session of every subject.
+    Images are written as empty files, or as sparse files of file_size bytes so that no disk space is used for their content.
+    If n_sessions is 0, the image files are stored directly in the subject directories.
+    """
+    bids_dir.mkdir(parents=True, exist_ok=True)
+    (bids_dir / "dataset_description.json").write_text(
+        json.dumps(
+            {
+                "Name": "Synthetic benchmark dataset",
+                "BIDSVersion": "1.8.0",
+                "DatasetType": "raw",
+            }
+        )
+    )
+    sub_ids = get_subject_ids(n_subjects)
+    (bids_dir / "participants.tsv").write_text(
+        "participant_id\n" + "".join(f"{sub_id}\n" for sub_id in sub_ids)
+    )
+
+    session_ids: list[str | None] = [
+        f"ses-{i:02d}" for i in range(1, n_sessions + 1)
+    ] or [None]
+    for sub_id in sub_ids:
+        for ses_id in session_ids:
+            session_dir = bids_dir / sub_id
+            file_prefix = sub_id
+            if ses_id is not None:
+                session_dir = session_dir / ses_id
+                file_prefix = f"{sub_id}_{ses_id}"
+            for suffix in suffixes:
+                datatype, entities = BIDS_SUFFIX_FILE_PARTS[suffix]
+                datatype_dir = session_dir / datatype
+                datatype_dir.mkdir(parents=True, exist_ok=True)
+                file_stem = f"{file_prefix}{entities}_{suffix}"
+                with open(datatype_dir / f"{file_stem}.nii.gz", "wb") as f:
+                    os.truncate(f.fileno(), file_size)
+                if sidecars:
+                    sidecar: dict[str, Any] = {"RepetitionTime": 2.0}
+                    if suffix == "bold":
+                        sidecar["TaskName"] = "rest"
+                    (datatype_dir / f"{file_stem}.json").write_text(
+                        json.dumps(sidecar)
+                    )
+    return bids_dir
+
+
+def write_inputs(
+    output_dir: Path,
+    n_rows: int,
+    n_bids_rows: int | None = None,
+    n_status_rows: int | None = None,
+) -> dict[str, Path]:
+    """
+    Write a complete set of synthetic CLI inputs to output_dir and return the paths of the created files.
+    The phenotypic table has n_rows rows, and the BIDS table and processing status file
+    have n_bids_rows and n_status_rows rows respectively (n_rows by default).
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "pheno": output_dir / "pheno.tsv",
+        "dictionary": output_dir / "dictionary.json",
+        "description": output_dir / "dataset_description.json",
+        "bids_table": output_dir / "bids.tsv",
+        "processing_status": output_dir / "processing_status.tsv",
+    }
+    make_pheno_table(n_rows).to_csv(paths["pheno"], sep="\t", index=False)
+    make_bids_table(n_bids_rows or n_rows).to_csv(
+        paths["bids_table"], sep="\t", index=False
+    )
+    make_processing_status(n_status_rows or n_rows).to_csv(
+        paths["processing_status"], sep="\t", index=False
+    )
+    paths["dictionary"].write_text(
+        json.dumps(make_data_dictionary(), indent=2)
+    )
+    paths["description"].write_text(json.dumps(make_dataset_description()))
+    return paths
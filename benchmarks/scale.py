@@ -0,0 +1,193 @@
+"""
+End-to-end scale harness that runs bagel pheno, bids and derivatives one after another on synthetic datasets
+with increasing numbers of subjects, and fails if any command exceeds its wall time or peak memory (RSS) budget.
+
+Example usage: python -m benchmarks.scale --subjects 10000 --output scale_results.json
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+
+from . import generators
+
+DEFAULT_SUBJECT_COUNTS = [10_000, 100_000, 500_000]
+DEFAULT_BUDGETS_PATH = Path(__file__).parent / "scale_budgets.json"
+# Run the CLI in the same Python environment as the harness
+BAGEL_COMMAND = [sys.executable, "-c", "from bagel.cli import bagel; bagel()"]
+
+app = typer.Typer(add_completion=False)
+
+
+def run_bagel(args: list, log_path: Path) -> dict:
+    """
+    Run a bagel command in a subprocess, with its console output written to log_path,
+    and return its exit code, wall time and peak RSS.
+    """
+    with open(log_path, "w", encoding="utf-8") as log_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [*BAGEL_COMMAND, *map(str, args), "--overwrite"],
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        # Unlike Popen.wait, os.wait4 also returns the resource usage of the finished process
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_time = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak_rss_kb = (
+        rusage.ru_maxrss / 1024
+        if sys.platform == "darwin"
+        else rusage.ru_maxrss
+    )
+    return {
+        "exit_code": process.returncode,
+        "wall_time_s": round(wall_time, 2),
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+    }
+
+
+def get_budget_violations(result: dict, budget: dict) -> list[str]:
+    """Return a description of each budget exceeded by a command."""
+    violations = []
+    if result["exit_code"] != 0:
+        violations.append(f"exited with code {result['exit_code']}")
+    for metric in ["wall_time_s", "peak_rss_mb"]:
+        if result[metric] > budget[metric]:
+            violations.append(
+                f"{metric} of {result[metric]} exceeds budget of {budget[metric]}"
+            )
+    return violations
+
+
+def run_scale_test(n_subjects: int, work_dir: Path, budget: dict) -> list:
+    """
+    Run pheno, bids and derivatives in turn on a synthetic dataset with n_subjects subjects,
+    and return the results of each command. Commands after a failing command are not run.
+    """
+    n_rows = n_subjects * generators.SESSIONS_PER_SUBJECT
+    inputs = generators.write_inputs(
+        work_dir,
+        n_rows,
+        n_bids_rows=n_rows * len(generators.BIDS_SUFFIXES),
+        n_status_rows=n_rows * len(generators.PIPELINES),
+    )
+    pheno_jsonld = work_dir / "pheno.jsonld"
+    bids_jsonld = work_dir / "bids.jsonld"
+    commands = {
+        "pheno": [
+            "--pheno",
+            inputs["pheno"],
+            "--dictionary",
+            inputs["dictionary"],
+            "--dataset-description",
+            inputs["description"],
+            "--output",
+            pheno_jsonld,
+        ],
+        "bids": [
+            "--jsonld-path",
+            pheno_jsonld,
+            "--bids-table",
+            inputs["bids_table"],
+            "--dataset-source-dir",
+            "/data/synthetic",
+            "--output",
+            bids_jsonld,
+        ],
+        "derivatives": [
+            "--tabular",
+            inputs["processing_status"],
+            "--jsonld-path",
+            bids_jsonld,
+            "--output",
+            work_dir / "derivatives.jsonld",
+        ],
+    }
+
+    results = []
+    for command, args in commands.items():
+        result = {
+            "n_subjects": n_subjects,
+            "command": command,
+            **run_bagel([command, *args], work_dir / f"{command}.log"),
+        }
+        result["violations"] = get_budget_violations(result, budget)
+        results.append(result)
+        typer.echo(
+            f"{n_subjects:>9} subjects  {command:<12}"
+            f"{result['wall_time_s']:>10.1f} s{result['peak_rss_mb']:>10.0f} MB  "
+            f"{'; '.join(result['violations']) or 'OK'}"
+        )
+        if result["exit_code"] != 0:
+            typer.echo(
+                f"See {work_dir / f'{command}.log'} for the command output."
+            )
+            break
+    return results
+
+
+@app.command()
+def main(
+    subjects: list[int] = typer.Option(
+        DEFAULT_SUBJECT_COUNTS,
+        "--subjects",
+        "-n",
+        help="Number of subjects in a synthetic dataset. Can be repeated to test several dataset sizes.",
+    ),
+    budgets: Path = typer.Option(
+        DEFAULT_BUDGETS_PATH,
+        "--budgets",
+        help="Path to a .json file with the maximum wall time (s) and peak RSS (MB) of each command, per number of subjects.",
+        exists=True,
+        dir_okay=False,
+    ),
+    work_dir: Path = typer.Option(
+        None,
+        "--work-dir",
+        help="Directory to keep the generated inputs, outputs and command logs in. By default, a temporary directory is used.",
+        file_okay=False,
+    ),
+    output: Path = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="Path to save the results of all commands as a .json file.",
+        dir_okay=False,
+    ),
+):
+    """Run the bagel commands on synthetic datasets of the given sizes and exit with an error if any budget is exceeded."""
+    all_budgets = json.loads(budgets.read_text())
+    if missing_budgets := [n for n in subjects if str(n) not in all_budgets]:
+        raise typer.BadParameter(
+            f"No budgets are defined for {missing_budgets} subjects in {budgets}."
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = []
+        for n_subjects in subjects:
+            results.extend(
+                run_scale_test(
+                    n_subjects,
+                    Path(work_dir or tmp_dir) / f"{n_subjects}_subjects",
+                    all_budgets[str(n_subjects)],
+                )
+            )
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2))
+    if any(result["violations"] for result in results):
+        typer.echo("At least one command failed or exceeded its budget.")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -3,6 +3,7 @@ import logging
 import shutil
 from pathlib import Path
 
+import pandas as pd
 import pytest
 from typer.testing import CliRunner
 
@@ -91,6 +92,31 @@ def load_test_json():
     return _read_file
 
 
+@pytest.fixture()
+def example2_bids_df():
+    """Return a minimal BIDS table matching the subjects in example2.tsv."""
+    return pd.DataFrame(
+        {
+            "sub": ["sub-01", "sub-01", "sub-02"],
+            "ses": ["ses-01", "ses-02", "ses-01"],
+            "suffix": ["T1w", "T1w", "bold"],
+            "path": [
+                "/data/sub-01/ses-01/anat/sub-01_ses-01_T1w.nii.gz",
+                "/data/sub-01/ses-02/anat/sub-01_ses-02_T1w.nii.gz",
+                "/data/sub-02/ses-01/func/sub-02_ses-01_bold.nii.gz",
+            ],
+        }
+    )
+
+
+@pytest.fixture()
+def example2_bids_table(example2_bids_df, tmp_path):
+    """Return the path to a .tsv file containing the minimal BIDS table for example2.tsv."""
+    bids_table_path = tmp_path / "example2_bids.tsv"
+    example2_bids_df.to_csv(bids_table_path, sep="\t", index=False)
+    return bids_table_path
+
+
 @pytest.fixture(scope="session")
 def bids_invalid_synthetic(bids_path, bids_synthetic, tmp_path_factory):
     invalid_path = tmp_path_factory.mktemp("tmp_bids") / "synthetic_invalid"
@@ -0,0 +1,129 @@
+from copy import deepcopy
+
+import pandas as pd
+import pytest
+import typer
+
+from bagel import api
+from bagel.cli import bagel
+
+
+def load_table(path):
+    """Load a .tsv file with all values as strings, as done by the CLI."""
+    return pd.read_csv(path, sep="\t", dtype=str, keep_default_na=False)
+
+
+def test_api_matches_run_command(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_bids_df,
+    example2_bids_table,
+    tmp_path,
+    load_test_json,
+):
+    """Test that building a dataset in memory with the API gives the same JSONLD data as the run command."""
+    result = runner.invoke(
+        bagel,
+        [
+            "run",
+            "-t",
+            test_data / "example2.tsv",
+            "-d",
+            test_data / "example2.json",
+            "-m",
+            example_dataset_description,
+            "-b",
+            example2_bids_table,
+            "-s",
+            "/data",
+            "--processing-status",
+            test_data / "proc_status_synthetic.tsv",
+            "--deterministic",
+            "-o",
+            tmp_path / "run.jsonld",
+        ],
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+
+    dataset = api.build_pheno_dataset(
+        load_table(test_data / "example2.tsv"),
+        load_test_json(test_data / "example2.json"),
+        load_test_json(example_dataset_description),
+    )
+    dataset = api.add_bids(
+        dataset, example2_bids_df, dataset_source_dir="/data"
+    )
+    dataset = api.add_derivatives(
+        dataset, load_table(test_data / "proc_status_synthetic.tsv")
+    )
+
+    assert api.to_jsonld(dataset, deterministic=True) == load_test_json(
+        tmp_path / "run.jsonld"
+    )
+
+
+def test_api_does_not_modify_inputs(
+    test_data, example_dataset_description, load_test_json
+):
+    """Test that the phenotypic inputs passed to the API are left unchanged."""
+    pheno_df = load_table(test_data / "example2.tsv")
+    data_dict = load_test_json(test_data / "example2.json")
+    dataset_description = load_test_json(example_dataset_description)
+    original_inputs = deepcopy((pheno_df, data_dict, dataset_description))
+
+    api.build_pheno_dataset(pheno_df, data_dict, dataset_description)
+
+    pd.testing.assert_frame_equal(pheno_df, original_inputs[0])
+    assert (data_dict, dataset_description) == original_inputs[1:]
+
+
+@pytest.mark.parametrize(
+    "config, expected_message",
+    [
+        ("Neurobagel", "duplicate"),
+        ("not-a-config", "Unknown configuration 'not-a-config'"),
+    ],
+)
+def test_invalid_api_inputs_raise_error(
+    test_data,
+    example_dataset_description,
+    load_test_json,
+    config,
+    expected_message,
+):
+    """Test that invalid inputs raise an API error with an informative message instead of exiting."""
+    pheno_df = load_table(test_data / "example2.tsv")
+
+    with pytest.raises(api.BagelError, match=expected_message) as e:
+        api.build_pheno_dataset(
+            pd.concat([pheno_df, pheno_df]),
+            load_test_json(test_data / "example2.json"),
+            load_test_json(example_dataset_description),
+            config=config,
+        )
+
+    # The error is not the exception used to exit the CLI
+    assert not isinstance(e.value, typer.Exit)
+    assert expected_message in e.value.message
+
+
+def test_non_string_api_inputs_are_converted(
+    test_data, example_dataset_description, load_test_json
+):
+    """Test that a table with inferred (e.g., numeric) column types gives the same data as the table loaded as strings."""
+    pheno_inputs = (
+        load_test_json(test_data / "example24.json"),
+        load_test_json(example_dataset_description),
+    )
+    datasets = [
+        api.build_pheno_dataset(pheno_df, *pheno_inputs)
+        for pheno_df in [
+            pd.read_csv(test_data / "example24.tsv", sep="\t"),
+            load_table(test_data / "example24.tsv"),
+        ]
+    ]
+
+    assert api.to_jsonld(datasets[0], deterministic=True) == api.to_jsonld(
+        datasets[1], deterministic=True
+    )
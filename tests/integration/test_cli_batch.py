@@ -0,0 +1,199 @@
+import pandas as pd
+import pytest
+
+from bagel.cli import bagel
+
+
+@pytest.fixture()
+def write_manifest(tmp_path):
+    """Return a function that writes a batch manifest with the specified rows to a temporary .tsv file."""
+
+    def _write_manifest(rows):
+        manifest_path = tmp_path / "manifest.tsv"
+        pd.DataFrame(rows).to_csv(manifest_path, sep="\t", index=False)
+        return manifest_path
+
+    return _write_manifest
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_batch_processes_all_datasets(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_bids_table,
+    write_manifest,
+    tmp_path,
+    load_test_json,
+    jobs,
+):
+    """
+    Test that the batch command creates one output .jsonld and log file per dataset in the manifest,
+    including the imaging and pipeline metadata for datasets with a BIDS table and processing status file.
+    """
+    manifest = write_manifest(
+        [
+            {
+                "dataset_name": "ds-example2",
+                "pheno": test_data / "example2.tsv",
+                "dictionary": test_data / "example2.json",
+                "dataset_description": example_dataset_description,
+                "bids_table": example2_bids_table,
+                "processing_status": test_data / "proc_status_synthetic.tsv",
+            },
+            {
+                "dataset_name": "ds-example6",
+                "pheno": test_data / "example6.tsv",
+                "dictionary": test_data / "example6.json",
+                "dataset_description": example_dataset_description,
+                "bids_table": "",
+                "processing_status": "",
+            },
+        ]
+    )
+    output_dir = tmp_path / "batch_output"
+
+    result = runner.invoke(
+        bagel,
+        ["batch", "-m", manifest, "-o", output_dir, "-j", jobs],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    for dataset_name in ["ds-example2", "ds-example6"]:
+        assert (output_dir / f"{dataset_name}.jsonld").exists()
+        assert (output_dir / f"{dataset_name}.log").exists()
+
+    example2_output = load_test_json(output_dir / "ds-example2.jsonld")
+    session_types = {
+        session["schemaKey"]
+        for sub in example2_output["hasSamples"]
+        for session in sub["hasSession"]
+    }
+    assert session_types == {"PhenotypicSession", "ImagingSession"}
+
+    summary = pd.read_csv(output_dir / "batch_summary.tsv", sep="\t")
+    assert summary["dataset_name"].tolist() == ["ds-example2", "ds-example6"]
+    assert (summary["status"] == "success").all()
+
+
+def test_failed_dataset_does_not_stop_batch(
+    runner,
+    test_data,
+    example_dataset_description,
+    write_manifest,
+    tmp_path,
+    caplog,
+    propagate_errors,
+):
+    """
+    Test that when a dataset in the batch is invalid, the remaining datasets are still processed,
+    the error is written to the log file of the invalid dataset, and the batch command exits with an error.
+    """
+    manifest = write_manifest(
+        [
+            {
+                "dataset_name": "valid",
+                "pheno": test_data / "example2.tsv",
+                "dictionary": test_data / "example2.json",
+                "dataset_description": example_dataset_description,
+            },
+            {
+                "dataset_name": "invalid",
+                "pheno": test_data / "example1.tsv",
+                "dictionary": test_data / "example1.json",
+                "dataset_description": example_dataset_description,
+            },
+        ]
+    )
+    output_dir = tmp_path / "batch_output"
+
+    result = runner.invoke(bagel, ["batch", "-m", manifest, "-o", output_dir])
+
+    assert result.exit_code != 0
+    assert "1 of 2 dataset(s) could not be processed" in caplog.text
+    assert (output_dir / "valid.jsonld").exists()
+    assert not (output_dir / "invalid.jsonld").exists()
+    assert "duplicate participant IDs" in (
+        output_dir / "invalid.log"
+    ).read_text(encoding="utf-8")
+
+    summary = pd.read_csv(
+        output_dir / "batch_summary.tsv", sep="\t", keep_default_na=False
+    )
+    assert summary["status"].tolist() == ["success", "failed"]
+
+
+def test_batch_manifest_relative_paths_resolved_from_manifest_dir(
+    runner,
+    test_data,
+    tmp_path,
+):
+    """Test that relative input paths in the manifest are interpreted relative to the manifest location."""
+    manifest = test_data / "batch_manifest_relative_paths.tsv"
+    output_dir = tmp_path / "batch_output"
+
+    result = runner.invoke(bagel, ["batch", "-m", manifest, "-o", output_dir])
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert (output_dir / "example2.jsonld").exists()
+
+
+def test_batch_does_not_overwrite_existing_outputs_by_default(
+    runner,
+    test_data,
+    tmp_path,
+):
+    """Test that the batch command exits before processing if an output file already exists and --overwrite is not set."""
+    output_dir = tmp_path / "batch_output"
+    output_dir.mkdir()
+    (output_dir / "example2.jsonld").write_text("{}")
+
+    result = runner.invoke(
+        bagel,
+        [
+            "batch",
+            "-m",
+            test_data / "batch_manifest_relative_paths.tsv",
+            "-o",
+            output_dir,
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert "already exists" in result.output
+    assert (output_dir / "example2.jsonld").read_text() == "{}"
+
+
+def test_batch_diagnostics_report_saved_in_output_dir(
+    runner,
+    test_data,
+    example_dataset_description,
+    write_manifest,
+    tmp_path,
+    load_test_json,
+):
+    """Test that the diagnostics report for problems in the batch manifest is saved inside the output directory."""
+    manifest = write_manifest(
+        [
+            {
+                "dataset_name": "ds-example2",
+                "pheno": test_data / "example2.tsv",
+                "dictionary": "",
+                "dataset_description": example_dataset_description,
+            }
+        ]
+    )
+    output_dir = tmp_path / "batch_output"
+
+    result = runner.invoke(bagel, ["batch", "-m", manifest, "-o", output_dir])
+
+    assert result.exit_code != 0
+    assert load_test_json(output_dir / "diagnostics.json") == {
+        "diagnostics": [
+            {
+                "problem": "missing values in the batch manifest (header row is 1)",
+                "rows": [2],
+            }
+        ]
+    }
+    assert not (tmp_path / "batch_output.diagnostics.json").exists()
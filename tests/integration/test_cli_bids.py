@@ -141,6 +141,91 @@ def test_imaging_sessions_have_expected_metadata(
     )
 
 
+def test_aggregated_acquisitions(
+    runner,
+    test_data,
+    example2_bids_df,
+    tmp_path,
+    load_test_json,
+):
+    """
+    Check that with --aggregate-acquisitions, each imaging session has a single acquisition per contrast type,
+    with file counts that add up to the number of acquisitions created without aggregation.
+    """
+    # Add a second run of each image so that some sessions have several files of the same contrast type
+    runs_df = example2_bids_df.assign(
+        path=example2_bids_df["path"].str.replace("_", "_run-02_", n=1)
+    )
+    bids_table_path = tmp_path / "bids.tsv"
+    pd.concat([example2_bids_df, runs_df]).to_csv(
+        bids_table_path, sep="\t", index=False
+    )
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            test_data / "example24_dataset_description.json",
+            "--output",
+            tmp_path / "pheno.jsonld",
+        ],
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+
+    acquisitions = {}
+    for flags in [[], ["--aggregate-acquisitions"]]:
+        output_path = tmp_path / f"pheno_bids{''.join(flags)}.jsonld"
+        result = runner.invoke(
+            bagel,
+            [
+                "bids",
+                "--jsonld-path",
+                tmp_path / "pheno.jsonld",
+                "--bids-table",
+                bids_table_path,
+                "--output",
+                output_path,
+                *flags,
+            ],
+        )
+        assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+        acquisitions[bool(flags)] = [
+            ses["hasAcquisition"]
+            for sub in load_test_json(output_path)["hasSamples"]
+            for ses in sub["hasSession"]
+            if ses["schemaKey"] == "ImagingSession"
+        ]
+
+    for session_acquisitions in acquisitions[True]:
+        contrasts = [
+            acq["hasContrastType"]["identifier"]
+            for acq in session_acquisitions
+        ]
+        assert len(contrasts) == len(set(contrasts))
+    assert sum(
+        acq["hasFileCount"]
+        for session_acquisitions in acquisitions[True]
+        for acq in session_acquisitions
+    ) == sum(
+        len(session_acquisitions)
+        for session_acquisitions in acquisitions[False]
+    )
+    assert all(
+        acq["hasFileCount"] == 2
+        for session_acquisitions in acquisitions[True]
+        for acq in session_acquisitions
+    )
+    assert all(
+        "hasFileCount" not in acq
+        for session_acquisitions in acquisitions[False]
+        for acq in session_acquisitions
+    )
+
+
 def test_imaging_sessions_have_correct_paths(
     runner,
     test_data_upload_path,
@@ -0,0 +1,224 @@
+import json
+
+import pandas as pd
+import pytest
+
+from bagel.cli import bagel
+
+
+@pytest.fixture()
+def example2_bids_tables(example2_bids_df, tmp_path):
+    """Return the paths to BIDS tables for the first and second subject in example2.tsv, and to a table for both subjects."""
+    tables = {
+        "sub-01": example2_bids_df[example2_bids_df["sub"] == "sub-01"],
+        "sub-02": example2_bids_df[example2_bids_df["sub"] == "sub-02"],
+        "all": example2_bids_df,
+    }
+    for name, table in tables.items():
+        table.to_csv(tmp_path / f"bids_{name}.tsv", sep="\t", index=False)
+    return {name: tmp_path / f"bids_{name}.tsv" for name in tables}
+
+
+@pytest.fixture()
+def pheno_inputs(test_data, example_dataset_description):
+    return [
+        "-t",
+        test_data / "example2.tsv",
+        "-d",
+        test_data / "example2.json",
+        "-m",
+        example_dataset_description,
+    ]
+
+
+def invoke_and_check(runner, cmd_args):
+    result = runner.invoke(bagel, cmd_args)
+    assert (
+        result.exit_code == 0
+    ), f"'{cmd_args[0]}' errored out. STDOUT: {result.output}"
+
+
+def test_merge_matches_run_command(
+    runner,
+    test_data,
+    pheno_inputs,
+    example2_bids_tables,
+    tmp_path,
+    load_test_json,
+):
+    """
+    Test that merging the outputs of 'bids' for different subsets of subjects and the output of 'derivatives'
+    gives the same .jsonld as processing all inputs at once with the run command.
+    """
+    invoke_and_check(
+        runner, ["pheno", *pheno_inputs, "-o", tmp_path / "pheno.jsonld"]
+    )
+    for shard in ["sub-01", "sub-02"]:
+        invoke_and_check(
+            runner,
+            [
+                "bids",
+                "-p",
+                tmp_path / "pheno.jsonld",
+                "-b",
+                example2_bids_tables[shard],
+                "-o",
+                tmp_path / f"bids_{shard}.jsonld",
+            ],
+        )
+    invoke_and_check(
+        runner,
+        [
+            "derivatives",
+            "-t",
+            test_data / "proc_status_synthetic.tsv",
+            "-p",
+            tmp_path / "pheno.jsonld",
+            "-o",
+            tmp_path / "derivatives.jsonld",
+        ],
+    )
+    invoke_and_check(
+        runner,
+        [
+            "merge",
+            "-i",
+            tmp_path / "bids_sub-01.jsonld",
+            "-i",
+            tmp_path / "bids_sub-02.jsonld",
+            "-i",
+            tmp_path / "derivatives.jsonld",
+            "--deterministic",
+            "-o",
+            tmp_path / "merged.jsonld",
+        ],
+    )
+    invoke_and_check(
+        runner,
+        [
+            "run",
+            *pheno_inputs,
+            "-b",
+            example2_bids_tables["all"],
+            "--processing-status",
+            test_data / "proc_status_synthetic.tsv",
+            "--deterministic",
+            "-o",
+            tmp_path / "run.jsonld",
+        ],
+    )
+
+    assert load_test_json(tmp_path / "merged.jsonld") == load_test_json(
+        tmp_path / "run.jsonld"
+    )
+
+
+def test_merge_per_site_pheno_outputs(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+):
+    """Test that merging the 'pheno' outputs for separate sets of subjects gives the same .jsonld as processing all subjects together."""
+    pheno_df = pd.read_csv(
+        test_data / "example2.tsv", sep="\t", dtype=str, keep_default_na=False
+    )
+    pheno_paths = []
+    for subject, site_df in pheno_df.groupby("participant_id"):
+        site_df.to_csv(tmp_path / f"{subject}.tsv", sep="\t", index=False)
+        invoke_and_check(
+            runner,
+            [
+                "pheno",
+                "-t",
+                tmp_path / f"{subject}.tsv",
+                "-d",
+                test_data / "example2.json",
+                "-m",
+                example_dataset_description,
+                "-o",
+                tmp_path / f"{subject}.jsonld",
+            ],
+        )
+        pheno_paths += ["-i", tmp_path / f"{subject}.jsonld"]
+    invoke_and_check(
+        runner,
+        [
+            "merge",
+            *pheno_paths,
+            "--deterministic",
+            "-o",
+            tmp_path / "merged.jsonld",
+        ],
+    )
+    invoke_and_check(
+        runner,
+        [
+            "pheno",
+            "-t",
+            test_data / "example2.tsv",
+            "-d",
+            test_data / "example2.json",
+            "-m",
+            example_dataset_description,
+            "--deterministic",
+            "-o",
+            tmp_path / "pheno.jsonld",
+        ],
+    )
+
+    assert load_test_json(tmp_path / "merged.jsonld") == load_test_json(
+        tmp_path / "pheno.jsonld"
+    )
+
+
+@pytest.mark.parametrize(
+    "edit, expected_error",
+    [
+        (
+            lambda jsonld: jsonld.update(hasLabel="Another dataset"),
+            "dataset metadata",
+        ),
+        (
+            lambda jsonld: jsonld["hasSamples"][0]["hasSession"][0].update(
+                hasAge=99.0
+            ),
+            "differs from the previous input file(s)",
+        ),
+    ],
+)
+def test_merge_conflicting_inputs_errors(
+    runner,
+    pheno_inputs,
+    tmp_path,
+    load_test_json,
+    edit,
+    expected_error,
+    caplog,
+    propagate_errors,
+):
+    """Test that .jsonld files for different datasets or with different phenotypic data for the same session are not merged."""
+    invoke_and_check(
+        runner, ["pheno", *pheno_inputs, "-o", tmp_path / "pheno.jsonld"]
+    )
+    jsonld = load_test_json(tmp_path / "pheno.jsonld")
+    edit(jsonld)
+    (tmp_path / "edited.jsonld").write_text(json.dumps(jsonld))
+
+    result = runner.invoke(
+        bagel,
+        [
+            "merge",
+            "-i",
+            tmp_path / "pheno.jsonld",
+            "-i",
+            tmp_path / "edited.jsonld",
+            "-o",
+            tmp_path / "merged.jsonld",
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert expected_error in caplog.text
+    assert not (tmp_path / "merged.jsonld").exists()
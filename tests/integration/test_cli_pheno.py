@@ -1009,3 +1009,215 @@ def test_catalog_pheno_input_is_parsed(
     assert (
         temp_output_jsonld_path
     ).exists(), "The pheno.jsonld output was not created."
+
+
+def test_previous_output_unchanged_subjects_are_reused(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+):
+    """
+    Test that when a previous output is provided, subjects whose phenotypic rows are unchanged keep their identifiers,
+    while modified subjects are regenerated.
+    """
+    previous_output = tmp_path / "previous.jsonld"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            previous_output,
+            "--save-hashes",
+        ],
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert (tmp_path / "previous.hashes.json").exists()
+
+    modified_pheno = tmp_path / "example2_modified.tsv"
+    modified_pheno.write_text(
+        (test_data / "example2.tsv")
+        .read_text(encoding="utf-8")
+        .replace("P20Y6M", "P20Y7M"),
+        encoding="utf-8",
+    )
+    output = tmp_path / "pheno.jsonld"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            modified_pheno,
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--previous",
+            previous_output,
+            "--output",
+            output,
+        ],
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert (tmp_path / "pheno.hashes.json").exists()
+
+    previous_subjects = {
+        sub["hasLabel"]: sub
+        for sub in load_test_json(previous_output)["hasSamples"]
+    }
+    new_subjects = {
+        sub["hasLabel"]: sub for sub in load_test_json(output)["hasSamples"]
+    }
+    assert new_subjects["sub-02"] == previous_subjects["sub-02"]
+    assert (
+        new_subjects["sub-01"]["identifier"]
+        != previous_subjects["sub-01"]["identifier"]
+    )
+    assert new_subjects["sub-01"]["hasSession"][0]["hasAge"] == pytest.approx(
+        20 + 7 / 12
+    )
+
+
+def test_previous_output_without_hashes_regenerates_all_subjects(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    caplog,
+    propagate_warnings,
+):
+    """
+    Test that subject content hashes are only saved when requested,
+    and that a previous output without saved hashes results in a warning and all subjects being regenerated.
+    """
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "previous.jsonld",
+        ],
+    )
+    assert not (tmp_path / "previous.hashes.json").exists()
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--previous",
+            tmp_path / "previous.jsonld",
+            "--output",
+            tmp_path / "pheno.jsonld",
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert "No subject content hashes found" in caplog.text
+
+
+def test_existing_subject_hashes_are_not_overwritten(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+):
+    """
+    Test that existing subject content hashes for the output are only replaced when --overwrite is set,
+    and are removed when the output is overwritten without saving new hashes.
+    """
+    hashes_path = tmp_path / "pheno.hashes.json"
+    hashes_path.write_text("{}")
+    pheno_args = [
+        "pheno",
+        "--pheno",
+        test_data / "example2.tsv",
+        "--dictionary",
+        test_data / "example2.json",
+        "--dataset-description",
+        example_dataset_description,
+        "--output",
+        tmp_path / "pheno.jsonld",
+    ]
+
+    result = runner.invoke(bagel, [*pheno_args, "--save-hashes"])
+    assert result.exit_code != 0
+    assert "already exists" in result.output
+    assert not (tmp_path / "pheno.jsonld").exists()
+
+    result = runner.invoke(
+        bagel, [*pheno_args, "--save-hashes", "--overwrite"]
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert hashes_path.read_text() != "{}"
+
+    result = runner.invoke(bagel, [*pheno_args, "--overwrite"])
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert not hashes_path.exists()
+
+
+def test_long_lists_of_invalid_rows_are_shortened_and_saved_to_report(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+    caplog,
+    propagate_errors,
+):
+    """
+    Test that when many rows of the phenotypic table are invalid, the error lists only some of them,
+    and all of them are saved to a diagnostics report alongside the output.
+    """
+    header, *rows = (
+        (test_data / "example2.tsv").read_text(encoding="utf-8").splitlines()
+    )
+    pheno_with_duplicates = tmp_path / "example2_duplicated.tsv"
+    pheno_with_duplicates.write_text(
+        "\n".join([header] + rows * 10) + "\n", encoding="utf-8"
+    )
+
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            pheno_with_duplicates,
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "pheno.jsonld",
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert (
+        "[2, 3, 4, 5, 6, 7, 8, 9, 10, 11] (and 30 more, see the diagnostics report for all)"
+        in caplog.text
+    )
+    report = load_test_json(tmp_path / "pheno.diagnostics.json")
+    assert report["diagnostics"] == [
+        {
+            "problem": "duplicate IDs in the phenotypic table (header row is 1)",
+            "rows": list(range(2, 42)),
+        }
+    ]
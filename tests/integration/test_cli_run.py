@@ -0,0 +1,169 @@
+from bagel.cli import bagel
+from tests import utils
+
+
+def test_run_matches_chained_commands(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_bids_table,
+    tmp_path,
+    load_test_json,
+):
+    """
+    Test that the run command creates the same output .jsonld as running the pheno, bids and derivatives commands one after another.
+    """
+    pheno_inputs = [
+        "-t",
+        test_data / "example2.tsv",
+        "-d",
+        test_data / "example2.json",
+        "-m",
+        example_dataset_description,
+    ]
+    for cmd_args in [
+        ["pheno", *pheno_inputs, "-o", tmp_path / "pheno.jsonld"],
+        [
+            "bids",
+            "-p",
+            tmp_path / "pheno.jsonld",
+            "-b",
+            example2_bids_table,
+            "-s",
+            "/data",
+            "-o",
+            tmp_path / "bids.jsonld",
+        ],
+        [
+            "derivatives",
+            "-t",
+            test_data / "proc_status_synthetic.tsv",
+            "-p",
+            tmp_path / "bids.jsonld",
+            "-o",
+            tmp_path / "chained.jsonld",
+        ],
+        [
+            "run",
+            *pheno_inputs,
+            "-b",
+            example2_bids_table,
+            "-s",
+            "/data",
+            "--processing-status",
+            test_data / "proc_status_synthetic.tsv",
+            "-o",
+            tmp_path / "run.jsonld",
+        ],
+    ]:
+        result = runner.invoke(bagel, cmd_args)
+        assert (
+            result.exit_code == 0
+        ), f"'{cmd_args[0]}' errored out. STDOUT: {result.output}"
+
+    assert utils.remove_random_identifiers(
+        load_test_json(tmp_path / "run.jsonld")
+    ) == utils.remove_random_identifiers(
+        load_test_json(tmp_path / "chained.jsonld")
+    )
+
+
+def test_run_with_only_pheno_inputs_matches_pheno(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+):
+    """Test that when no BIDS table or processing status file is provided, the run command output is the same as the pheno command output."""
+    pheno_inputs = [
+        "-t",
+        test_data / "example2.tsv",
+        "-d",
+        test_data / "example2.json",
+        "-m",
+        example_dataset_description,
+    ]
+    for command in ["pheno", "run"]:
+        result = runner.invoke(
+            bagel,
+            [command, *pheno_inputs, "-o", tmp_path / f"{command}.jsonld"],
+        )
+        assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+
+    assert utils.remove_random_identifiers(
+        load_test_json(tmp_path / "run.jsonld")
+    ) == utils.remove_random_identifiers(
+        load_test_json(tmp_path / "pheno.jsonld")
+    )
+
+
+def test_run_with_invalid_optional_input_errors_before_processing(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    caplog,
+    propagate_info,
+):
+    """
+    Test that when the processing status file is invalid, the run command exits with an error
+    before processing the phenotypic data and does not create an output file.
+    """
+    output_path = tmp_path / "run.jsonld"
+    result = runner.invoke(
+        bagel,
+        [
+            "run",
+            "-t",
+            test_data / "example2.tsv",
+            "-d",
+            test_data / "example2.json",
+            "-m",
+            example_dataset_description,
+            "--processing-status",
+            test_data / "proc_status_no_recognized_pipelines.tsv",
+            "-o",
+            output_path,
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert "no recognized" in caplog.text
+    assert "Processing phenotypic annotations" not in caplog.text
+    assert not output_path.exists()
+
+
+def test_deterministic_run_outputs_are_identical(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_bids_table,
+    tmp_path,
+):
+    """Test that running the same command twice with --deterministic creates byte-identical output files."""
+    for output_name in ["first.jsonld", "second.jsonld"]:
+        result = runner.invoke(
+            bagel,
+            [
+                "run",
+                "-t",
+                test_data / "example2.tsv",
+                "-d",
+                test_data / "example2.json",
+                "-m",
+                example_dataset_description,
+                "-b",
+                example2_bids_table,
+                "--processing-status",
+                test_data / "proc_status_synthetic.tsv",
+                "--deterministic",
+                "-o",
+                tmp_path / output_name,
+            ],
+        )
+        assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+
+    assert (tmp_path / "first.jsonld").read_bytes() == (
+        tmp_path / "second.jsonld"
+    ).read_bytes()
@@ -0,0 +1,175 @@
+import shutil
+
+import pytest
+
+from bagel import cli
+from bagel.cli import bagel
+from bagel.utilities import watch_utils
+
+
+@pytest.fixture()
+def example2_pheno(test_data, tmp_path):
+    """Return the path to a copy of example2.tsv that can be edited."""
+    pheno_path = tmp_path / "example2.tsv"
+    shutil.copy(test_data / "example2.tsv", pheno_path)
+    return pheno_path
+
+
+def mock_watch_files(*edits):
+    """Return a replacement for watch_files that applies each edit to the inputs in turn, and then stops watching."""
+
+    def _watch_files(paths, interval):
+        yield list(paths)
+        for edit in edits:
+            yield edit()
+        raise KeyboardInterrupt
+
+    return _watch_files
+
+
+def test_watch_regenerates_only_changed_subjects(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_pheno,
+    tmp_path,
+    load_test_json,
+    monkeypatch,
+    caplog,
+    propagate_info,
+):
+    """Test that after an input file changes, only the changed subjects are regenerated and the output matches a new 'run'."""
+
+    def edit_age():
+        example2_pheno.write_text(
+            example2_pheno.read_text().replace("P25Y8M", "P25Y9M")
+        )
+        return [example2_pheno]
+
+    monkeypatch.setattr(watch_utils, "watch_files", mock_watch_files(edit_age))
+    pheno_inputs = [
+        "-t",
+        example2_pheno,
+        "-d",
+        test_data / "example2.json",
+        "-m",
+        example_dataset_description,
+        "--deterministic",
+    ]
+
+    result = runner.invoke(
+        bagel, ["watch", *pheno_inputs, "-o", tmp_path / "watch.jsonld"]
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert (
+        "Reusing 1 unchanged subject(s) from the previous output. 1 new or changed subject(s) will be regenerated."
+        in caplog.text
+    )
+
+    result = runner.invoke(
+        bagel, ["run", *pheno_inputs, "-o", tmp_path / "run.jsonld"]
+    )
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert load_test_json(tmp_path / "watch.jsonld") == load_test_json(
+        tmp_path / "run.jsonld"
+    )
+
+
+def test_watch_continues_after_invalid_inputs(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_pheno,
+    tmp_path,
+    monkeypatch,
+    caplog,
+    propagate_info,
+):
+    """Test that invalid input changes are reported without stopping the command, and that the output is updated once they are fixed."""
+    original_pheno = example2_pheno.read_text()
+    output_path = tmp_path / "watch.jsonld"
+
+    def add_invalid_value():
+        example2_pheno.write_text(original_pheno.replace("CTRL", "unknown"))
+        return [example2_pheno]
+
+    def revert_invalid_value():
+        output_path.unlink()
+        example2_pheno.write_text(original_pheno)
+        return [example2_pheno]
+
+    monkeypatch.setattr(
+        watch_utils,
+        "watch_files",
+        mock_watch_files(add_invalid_value, revert_invalid_value),
+    )
+
+    result = runner.invoke(
+        bagel,
+        [
+            "watch",
+            "-t",
+            example2_pheno,
+            "-d",
+            test_data / "example2.json",
+            "-m",
+            example_dataset_description,
+            "-o",
+            output_path,
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert "was not updated because of the error(s) above" in caplog.text
+    assert output_path.exists()
+
+
+def test_watch_continues_after_unexpected_errors(
+    runner,
+    test_data,
+    example_dataset_description,
+    example2_pheno,
+    tmp_path,
+    monkeypatch,
+    caplog,
+    propagate_info,
+):
+    """Test that an unexpected error while updating the output is logged without stopping the command."""
+    process_dataset = cli._process_dataset
+    calls = []
+
+    def fail_first_update(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise OSError("Input file is being saved")
+        return process_dataset(**kwargs)
+
+    monkeypatch.setattr(cli, "_process_dataset", fail_first_update)
+    monkeypatch.setattr(
+        watch_utils,
+        "watch_files",
+        mock_watch_files(lambda: [example2_pheno]),
+    )
+    output_path = tmp_path / "watch.jsonld"
+
+    result = runner.invoke(
+        bagel,
+        [
+            "watch",
+            "-t",
+            example2_pheno,
+            "-d",
+            test_data / "example2.json",
+            "-m",
+            example_dataset_description,
+            "-o",
+            output_path,
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert len(calls) == 2
+    assert "Input file is being saved" in caplog.text
+    assert "was not updated because of the error(s) above" in caplog.text
+    assert output_path.exists()
@@ -1,3 +1,6 @@
+import pstats
+import tracemalloc
+
 import pytest
 from packaging.version import Version
 
@@ -6,7 +9,7 @@ from bagel.cli import bagel
 
 @pytest.mark.parametrize(
     "command",
-    ["bids2tsv", "pheno", "derivatives", "bids"],
+    ["bids2tsv", "pheno", "derivatives", "bids", "run", "batch"],
 )
 @pytest.mark.parametrize(
     "help_flag",
@@ -24,7 +27,7 @@ def test_help_option_override_printed_in_command_help(
 
 @pytest.mark.parametrize(
     "command",
-    ["bids2tsv", "pheno", "derivatives", "bids"],
+    ["bids2tsv", "pheno", "derivatives", "bids", "run", "batch"],
 )
 def test_help_printed_if_no_args(runner, command, caplog, disable_rich_markup):
     """Test that the command help is printed if no arguments are provided."""
@@ -45,3 +48,143 @@ def test_version_option(runner, caplog):
     assert len(caplog.records) == 0
     assert output.startswith("bagel")
     assert version != Version("0.0.0")
+
+
+@pytest.mark.parametrize("profile_mode", ["deterministic", "sampling"])
+def test_profile_option_saves_profile(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    profile_mode,
+):
+    """Test that the --profile option saves a readable profile of the command in both profiling modes."""
+    profile_path = tmp_path / "pheno.pstats"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "pheno.jsonld",
+            "--profile",
+            profile_path,
+            "--profile-mode",
+            profile_mode,
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    stats = pstats.Stats(str(profile_path))
+    assert any(func_name == "pheno" for _, _, func_name in stats.stats.keys())
+
+
+def test_profile_saved_when_command_errors(runner, test_data, tmp_path):
+    """Test that the profile is still saved when the profiled command exits with an error."""
+    profile_path = tmp_path / "pheno.pstats"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example_invalid.tsv",
+            "--dictionary",
+            test_data / "example_invalid.json",
+            "--dataset-description",
+            test_data / "example24_dataset_description.json",
+            "--output",
+            tmp_path / "pheno.jsonld",
+            "--profile",
+            profile_path,
+        ],
+    )
+
+    assert result.exit_code != 0
+    assert profile_path.exists()
+
+
+def test_timings_option_saves_stage_timings(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+):
+    """Test that the --timings option saves the duration and throughput of each stage of the command."""
+    timings_path = tmp_path / "timings.json"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "pheno.jsonld",
+            "--timings",
+            timings_path,
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    timings = load_test_json(timings_path)
+    stages = {stage["stage"]: stage for stage in timings["stages"]}
+    assert timings["command"] == "pheno"
+    assert list(stages) == [
+        "load phenotypic inputs",
+        "validate phenotypic inputs",
+        "create subjects",
+        "build models",
+        "serialize",
+        "write",
+    ]
+    assert stages["create subjects"]["subjects"] == 2
+    assert stages["create subjects"]["subjects_per_s"] > 0
+    assert timings["duration_s"] >= sum(
+        stage["duration_s"] for stage in timings["stages"]
+    )
+
+
+def test_trace_memory_option_reports_stage_memory(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    load_test_json,
+    caplog,
+):
+    """Test that the --trace-memory option logs the memory use of each stage and adds it to the saved stage timings."""
+    timings_path = tmp_path / "timings.json"
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "pheno.jsonld",
+            "--timings",
+            timings_path,
+            "--trace-memory",
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    assert "Memory use of stage 'create subjects'" in caplog.text
+    timings = load_test_json(timings_path)
+    for stage in timings["stages"]:
+        assert stage["traced_peak_mb"] >= 0
+        assert isinstance(stage["top_allocation_sites"], list)
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+import typer
+
+from bagel.utilities import batch_utils
+
+
+@pytest.fixture()
+def valid_manifest_df():
+    return pd.DataFrame(
+        {
+            "dataset_name": ["ds1", "ds2"],
+            "pheno": ["example2.tsv", "example6.tsv"],
+            "dictionary": ["example2.json", "example6.json"],
+            "dataset_description": [
+                "example24_dataset_description.json",
+                "example24_dataset_description.json",
+            ],
+            "processing_status": ["proc_status_synthetic.tsv", ""],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "column,values,expected_message",
+    [
+        ("dictionary", None, "missing the following required columns"),
+        ("pheno", ["example2.tsv", ""], "missing values in required columns"),
+        ("dataset_name", ["ds1", "ds1"], "duplicate values"),
+        ("dataset_name", ["ds1", "../ds2"], "path separators"),
+    ],
+)
+def test_invalid_batch_manifest_raises_error(
+    valid_manifest_df,
+    column,
+    values,
+    expected_message,
+    caplog,
+    propagate_errors,
+):
+    """Test that an invalid batch manifest results in an informative error."""
+    if values is None:
+        manifest_df = valid_manifest_df.drop(columns=column)
+    else:
+        manifest_df = valid_manifest_df.assign(**{column: values})
+
+    with pytest.raises(typer.Exit):
+        batch_utils.validate_batch_manifest(manifest_df)
+
+    assert expected_message in caplog.text
+
+
+def test_get_batch_datasets(valid_manifest_df, test_data):
+    """Test that paths are resolved relative to the manifest directory and that unset optional inputs are None."""
+    datasets = batch_utils.get_batch_datasets(valid_manifest_df, test_data)
+
+    assert [dataset["name"] for dataset in datasets] == ["ds1", "ds2"]
+    assert datasets[0]["pheno"] == test_data / "example2.tsv"
+    assert datasets[0]["status"] == test_data / "proc_status_synthetic.tsv"
+    assert datasets[1]["status"] is None
+    assert all(dataset["bids_table"] is None for dataset in datasets)
+
+
+def test_nonexistent_manifest_input_files_raise_error(
+    valid_manifest_df, tmp_path, caplog, propagate_errors
+):
+    """Test that input files in the manifest that do not exist are reported."""
+    with pytest.raises(typer.Exit):
+        batch_utils.get_batch_datasets(valid_manifest_df, tmp_path)
+
+    assert "do not exist" in caplog.text
+    assert str(tmp_path / "example2.tsv") in caplog.text
@@ -119,6 +119,35 @@ def test_create_acquisitions(session_df_rows, expected_acquisitions):
         assert extracted_image_counts[expected_contrast] == expected_count
 
 
+def test_create_aggregated_acquisitions():
+    """
+    Test that when acquisitions are aggregated, create_acquisitions() creates one acquisition per contrast type
+    with the number of matching image files, and ignores files with unsupported suffixes.
+    """
+    session_df = pd.DataFrame(
+        {
+            "sub": "sub-01",
+            "ses": "ses-01",
+            "suffix": ["T1w", "bold", "bold", "events", "bold", "T1w"],
+            "path": "/data/synthetic/sub-01/ses-01",
+        }
+    )
+
+    image_list = bids_utils.create_acquisitions(
+        session_df=session_df,
+        bids_suffix_term_map={
+            "T1w": "nidm:T1Weighted",
+            "bold": "nidm:FlowWeighted",
+        },
+        aggregate=True,
+    )
+
+    assert [
+        (image.hasContrastType.identifier, image.hasFileCount)
+        for image in image_list
+    ] == [("nidm:T1Weighted", 2), ("nidm:FlowWeighted", 3)]
+
+
 @pytest.mark.parametrize(
     "dataset_root, ses, expected_session_path",
     [
@@ -444,3 +473,44 @@ def test_partition_suffixes():
     )
     assert found_in_reference == {"T1w", "bold"}
     assert not_found_in_reference == {"unknown1", "unknown2"}
+
+
+@pytest.mark.parametrize(
+    "strip_id_prefixes, expected_sub_ids, expected_ses_id",
+    [
+        (False, ["sub-01", "sub-02"], "ses-01"),
+        (True, ["01", "02"], "01"),
+    ],
+)
+def test_format_indexed_bids_table(
+    strip_id_prefixes, expected_sub_ids, expected_ses_id
+):
+    """Test that an indexed BIDS dataset is formatted with only supported suffixes, absolute paths, and optionally prefixed IDs."""
+    dataset_df = pd.DataFrame(
+        {
+            "sub": ["01", "01", "02"],
+            "ses": ["01", "01", None],
+            "suffix": ["T1w", "events", "bold"],
+            "root": ["/data/ds"] * 3,
+            "path": [
+                "sub-01/ses-01/anat/sub-01_ses-01_T1w.nii.gz",
+                "sub-01/ses-01/func/sub-01_ses-01_events.tsv",
+                "sub-02/func/sub-02_bold.nii.gz",
+            ],
+            "datatype": ["anat", "func", "func"],
+        }
+    )
+
+    bids_df = bids_utils.format_indexed_bids_table(
+        dataset_df, {"T1w", "bold"}, strip_id_prefixes
+    )
+
+    assert list(bids_df.columns) == ["sub", "ses", "suffix", "path"]
+    assert list(bids_df["sub"]) == expected_sub_ids
+    assert bids_df["ses"].iloc[0] == expected_ses_id
+    # Missing sessions are left empty
+    assert pd.isna(bids_df["ses"].iloc[1])
+    assert list(bids_df["path"]) == [
+        "/data/ds/sub-01/ses-01/anat/sub-01_ses-01_T1w.nii.gz",
+        "/data/ds/sub-02/func/sub-02_bold.nii.gz",
+    ]
@@ -0,0 +1,54 @@
+import pytest
+
+from bagel.utilities import diagnostics_utils
+
+
+@pytest.mark.parametrize(
+    "items,expected_summary",
+    [
+        ([1, 2, 3], "[1, 2, 3]"),
+        (range(12), "[0, 1, 2, 3, 4, 5, 6, 7, 8, 9] (and 2 more)"),
+        (
+            {"sex": ["M", "F"], "group": list("abcdefghijkl")},
+            "{'sex': ['M', 'F'], 'group': ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j'] (and 2 more)}",
+        ),
+    ],
+)
+def test_summarize_items(items, expected_summary):
+    """Test that long lists of values are shortened when no diagnostics report is being saved."""
+    assert diagnostics_utils.summarize_items(items) == expected_summary
+
+
+def test_diagnostics_report_only_saved_when_problems_found(
+    tmp_path, load_test_json
+):
+    """Test that a diagnostics report is only saved when problems are recorded within the context."""
+    report_path = tmp_path / "pheno.diagnostics.json"
+    with diagnostics_utils.collect_diagnostics(report_path):
+        pass
+    assert not report_path.exists()
+
+    with diagnostics_utils.collect_diagnostics(report_path):
+        diagnostics_utils.record_diagnostic("missing IDs", rows=[2, 5])
+    assert load_test_json(report_path) == {
+        "diagnostics": [{"problem": "missing IDs", "rows": [2, 5]}]
+    }
+
+    # Problems found outside of the context are not recorded
+    diagnostics_utils.record_diagnostic("missing IDs", rows=[3])
+    assert len(load_test_json(report_path)["diagnostics"]) == 1
+
+
+def test_stale_diagnostics_report_removed_after_success(tmp_path):
+    """Test that a report from an earlier run is removed when a later run succeeds without problems, but kept if it fails."""
+    report_path = tmp_path / "pheno.diagnostics.json"
+    report_path.write_text("{}")
+
+    with pytest.raises(ValueError):
+        with diagnostics_utils.collect_diagnostics(report_path):
+            raise ValueError("Output file already exists")
+    assert report_path.exists()
+
+    with diagnostics_utils.collect_diagnostics(report_path):
+        pass
+    assert not report_path.exists()
@@ -33,6 +33,90 @@ def test_unsupported_tsv_encoding_raises_informative_error(
     assert "Failed to decode the input file" in caplog.text
 
 
+def test_load_tabular_only_reads_requested_columns(test_data):
+    """
+    Test that when a set of columns is requested, only those columns are loaded from the table,
+    in the order they appear in the table, and requested columns missing from the table are ignored.
+    """
+    tabular_df = file_utils.load_tabular(
+        test_data / "example2.tsv",
+        columns={"sex", "participant_id", "not_a_column"},
+    )
+
+    assert list(tabular_df.columns) == ["participant_id", "sex"]
+    assert all(dtype == "string[pyarrow]" for dtype in tabular_df.dtypes)
+
+
+def test_load_tabular_keeps_raw_values_as_strings(tmp_path):
+    """
+    Test that values are loaded exactly as they appear in the table,
+    without type inference or parsing empty cells and common missing value markers as NaN.
+    """
+    tabular_p = tmp_path / "pheno.tsv"
+    tabular_p.write_text(
+        "participant_id\tage\tis_control\n007\t\tfalse\n008\tNA\ttrue\n"
+    )
+
+    tabular_df = file_utils.load_tabular(tabular_p)
+
+    assert tabular_df["participant_id"].tolist() == ["007", "008"]
+    assert tabular_df["age"].tolist() == ["", "NA"]
+    assert tabular_df["is_control"].tolist() == ["false", "true"]
+
+
+@pytest.mark.parametrize(
+    "columns,expected_columns",
+    [
+        # Duplicate columns that are not requested are not read
+        ({"participant_id", "sex"}, ["participant_id", "sex"]),
+        ({"participant_id", "not_a_column"}, ["participant_id"]),
+        ({"not_a_column"}, []),
+    ],
+)
+def test_load_tabular_with_duplicate_or_missing_columns(
+    tmp_path, columns, expected_columns
+):
+    """Test that only requested columns found in the table are read, even when none of them are found or other columns have duplicate names."""
+    tabular_p = tmp_path / "pheno.tsv"
+    tabular_p.write_text(
+        "participant_id\tnotes\tsex\tnotes\nsub-01\ta\tM\tb\n"
+    )
+
+    tabular_df = file_utils.load_tabular(tabular_p, columns=columns)
+
+    assert list(tabular_df.columns) == expected_columns
+
+
+@pytest.mark.parametrize("columns", [None, {"participant_id", "sex"}])
+def test_load_tabular_duplicate_columns_raises_informative_error(
+    tmp_path, columns, caplog, propagate_errors
+):
+    """Test that when a column to be read has a duplicate name in the table, the CLI exits with an informative error message."""
+    tabular_p = tmp_path / "pheno.tsv"
+    tabular_p.write_text("participant_id\tsex\tsex\nsub-01\tM\tF\n")
+
+    with pytest.raises(typer.Exit):
+        file_utils.load_tabular(tabular_p, columns=columns)
+
+    assert "duplicate column names: ['sex']" in caplog.text
+
+
+def test_load_tabular_pads_short_rows(tmp_path):
+    """Test that rows with fewer values than the header are padded with empty strings."""
+    tabular_p = tmp_path / "pheno.tsv"
+    tabular_p.write_text(
+        "participant_id\tsex\tage\nsub-01\tM\nsub-02\tF\t30\n"
+    )
+
+    tabular_df = file_utils.load_tabular(
+        tabular_p, columns={"participant_id", "age"}
+    )
+
+    assert tabular_df["participant_id"].tolist() == ["sub-01", "sub-02"]
+    assert tabular_df["age"].tolist() == ["", "30"]
+    assert all(dtype == "string[pyarrow]" for dtype in tabular_df.dtypes)
+
+
 @pytest.mark.parametrize(
     "backup_path",
     [
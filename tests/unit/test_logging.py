@@ -1,7 +1,12 @@
+import io
+import json
 import logging
+import re
+import sys
 
 import pytest
 
+from bagel import logger
 from bagel.cli import bagel
 
 
@@ -74,3 +79,161 @@ def test_no_progress_graphic_with_min_verbosity(
 
     assert result.exit_code == 0
     assert result.output.strip() == ""
+
+
+def test_stage_durations_logged_with_debug_verbosity(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    caplog,
+):
+    """Test that the duration of each stage of a command is logged only when verbosity is set to 2 (debug)."""
+    for verbosity_level in ["1", "2"]:
+        caplog.clear()
+        result = runner.invoke(
+            bagel,
+            [
+                "pheno",
+                "--pheno",
+                test_data / "example2.tsv",
+                "--dictionary",
+                test_data / "example2.json",
+                "--dataset-description",
+                example_dataset_description,
+                "--output",
+                tmp_path / "pheno.jsonld",
+                "--overwrite",
+                "--verbosity",
+                verbosity_level,
+            ],
+        )
+        assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+
+        stage_logs = [
+            record.getMessage()
+            for record in caplog.records
+            if record.levelno == logging.DEBUG
+            and record.getMessage().startswith("Stage ")
+        ]
+        if verbosity_level == "1":
+            assert stage_logs == []
+        else:
+            assert any(
+                log.startswith("Stage 'create subjects' took")
+                and "subjects/s" in log
+                for log in stage_logs
+            )
+
+
+@pytest.mark.parametrize("log_format", ["json", "auto"])
+def test_non_rich_log_formats(
+    runner,
+    test_data,
+    example_dataset_description,
+    tmp_path,
+    log_format,
+):
+    """
+    Test that logs are written as JSON lines with --log-format json,
+    and as plain text lines by default when the output is not a terminal.
+    """
+    result = runner.invoke(
+        bagel,
+        [
+            "pheno",
+            "--pheno",
+            test_data / "example2.tsv",
+            "--dictionary",
+            test_data / "example2.json",
+            "--dataset-description",
+            example_dataset_description,
+            "--output",
+            tmp_path / "pheno.jsonld",
+            "--log-format",
+            log_format,
+        ],
+    )
+
+    assert result.exit_code == 0, f"Errored out. STDOUT: {result.output}"
+    log_lines = result.output.strip().splitlines()
+    assert log_lines
+    if log_format == "json":
+        logs = [json.loads(line) for line in log_lines]
+        assert all(log["level"] in {"INFO", "WARNING"} for log in logs)
+        assert any(
+            log["message"].startswith("Saved output to:") for log in logs
+        )
+    else:
+        assert any(
+            re.match(r"\[.+\] INFO +Saved output to:", line)
+            for line in log_lines
+        )
+
+
+@pytest.mark.parametrize(
+    "formatter",
+    [
+        logger.PlainFormatter(fmt=logger.LOG_FMT),
+        logger.JSONLinesFormatter(),
+    ],
+)
+def test_markup_removed_from_non_rich_logs(formatter):
+    """Test that Rich markup tags are removed from logs that are not rendered with Rich, while other brackets are kept."""
+    record = logging.LogRecord(
+        name="bagel.logger",
+        level=logging.WARNING,
+        pathname=__file__,
+        lineno=0,
+        msg="[bold red]WARNING: Suffixes ['T1w'] found.[/bold red] [italic]TIP: Check the table.[/italic]",
+        args=None,
+        exc_info=None,
+    )
+
+    assert "WARNING: Suffixes ['T1w'] found. TIP: Check the table." in (
+        formatter.format(record)
+    )
+
+
+@pytest.mark.parametrize(
+    "formatter",
+    [
+        logger.PlainFormatter(fmt=logger.FILE_LOG_FMT),
+        logger.JSONLinesFormatter(),
+    ],
+)
+def test_escaped_brackets_unescaped_in_non_rich_logs(formatter):
+    """Test that brackets escaped from Rich markup are shown as in Rich logs, without the escape character."""
+    record = logging.LogRecord(
+        name="bagel.logger",
+        level=logging.ERROR,
+        pathname=__file__,
+        lineno=0,
+        msg="Values are not annotated. See \\[unannotated_values] in the [bold]report[/bold].",
+        args=None,
+        exc_info=None,
+    )
+
+    formatted_log = formatter.format(record)
+
+    assert "See [unannotated_values] in the report." in formatted_log
+    assert "\\[" not in formatted_log
+
+
+def test_plain_logs_written_to_current_stdout(monkeypatch):
+    """Test that plain logs are written to stdout even if it has been replaced since the log format was set."""
+    handler = logger.create_console_handler(logger.LogFormat.PLAIN)
+    record = logging.LogRecord(
+        name="bagel.logger",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=0,
+        msg="Saved output.",
+        args=None,
+        exc_info=None,
+    )
+    monkeypatch.setattr("sys.stdout", io.StringIO())
+
+    handler.emit(record)
+
+    assert "Saved output." in sys.stdout.getvalue()
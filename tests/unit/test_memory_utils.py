@@ -0,0 +1,74 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from bagel.utilities import file_utils, memory_utils
+
+
+@pytest.fixture
+def traced_memory():
+    tracemalloc.start(memory_utils.TRACEBACK_DEPTH)
+    yield
+    tracemalloc.stop()
+
+
+def test_stage_memory_tracker_stats(traced_memory):
+    """Test that the memory allocated during a stage is attributed to the line that allocated it."""
+    tracker = memory_utils.StageMemoryTracker()
+    tracker.start()
+    allocated = [str(i) for i in range(50_000)]  # noqa: F841
+    stats = tracker.stop()
+
+    assert stats["traced_delta_mb"] > 1
+    assert stats["traced_peak_mb"] >= stats["traced_delta_mb"]
+    assert stats["top_allocation_sites"][0]["site"].startswith(__file__)
+    assert stats["top_allocation_sites"][0]["size_delta_mb"] > 1
+
+
+def test_format_memory_stats_without_rss():
+    """Test that the memory summary of a stage omits the RSS when it cannot be measured on the platform."""
+    stats = {
+        "rss_peak_mb": None,
+        "rss_delta_mb": None,
+        "traced_peak_mb": 12.5,
+        "traced_delta_mb": -2.0,
+        "top_allocation_sites": [],
+    }
+
+    assert (
+        memory_utils.format_memory_stats(stats)
+        == "Python allocations peak 12.5 MB (-2.0 MB)"
+    )
+
+
+def test_library_allocations_attributed_to_bagel_code(traced_memory, tmp_path):
+    """Test that memory allocated by a library called from bagel is attributed to the calling line in bagel."""
+    table_path = tmp_path / "pheno.tsv"
+    table_path.write_text(
+        "participant_id\tage\n"
+        + "".join(f"sub-{i}\t{i}\n" for i in range(20_000))
+    )
+    tracker = memory_utils.StageMemoryTracker()
+    tracker.start()
+    table = file_utils.load_tabular(table_path)  # noqa: F841
+    stats = tracker.stop()
+
+    assert stats["top_allocation_sites"][0]["site"].startswith(
+        str(Path(file_utils.__file__))
+    )
+
+
+def test_nested_stage_does_not_reset_outer_peak(traced_memory):
+    """Test that the peak reported for a stage includes memory freed before a nested stage started."""
+    outer_tracker = memory_utils.StageMemoryTracker()
+    outer_tracker.start()
+    allocated = [str(i) for i in range(50_000)]
+    del allocated
+    inner_tracker = memory_utils.StageMemoryTracker()
+    inner_tracker.start()
+    inner_stats = inner_tracker.stop()
+    outer_stats = outer_tracker.stop()
+
+    assert outer_stats["traced_peak_mb"] > 1
+    assert inner_stats["traced_peak_mb"] < outer_stats["traced_peak_mb"]
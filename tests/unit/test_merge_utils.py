@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+import typer
+
+from bagel import models
+from bagel.utilities import merge_utils
+
+
+def make_subject(*sessions):
+    return models.Subject(hasLabel="sub-01", hasSession=list(sessions))
+
+
+def test_merge_subject_combines_sessions_by_label():
+    """
+    Test that sessions with new labels are added to the existing subject, and that imaging sessions with the same label
+    are combined, with metadata from the new input replacing existing metadata.
+    """
+    t1w = models.Acquisition(
+        hasContrastType=models.Image(identifier="nidm:T1Weighted")
+    )
+    bold = models.Acquisition(
+        hasContrastType=models.Image(identifier="nidm:FlowWeighted")
+    )
+    pipeline = models.CompletedPipeline(
+        hasPipelineName=models.Pipeline(identifier="np:fmriprep"),
+        hasPipelineVersion="23.1.3",
+    )
+    pheno_session = models.PhenotypicSession(hasLabel="ses-01", hasAge=20.5)
+    subject = make_subject(
+        pheno_session,
+        models.ImagingSession(
+            hasLabel="ses-01",
+            hasFilePath="/data/sub-01/ses-01",
+            hasAcquisition=[t1w],
+        ),
+    )
+
+    merge_utils.merge_subject(
+        subject,
+        make_subject(
+            models.PhenotypicSession(hasLabel="ses-01", hasAge=20.5),
+            models.PhenotypicSession(hasLabel="ses-02", hasAge=21.0),
+            models.ImagingSession(
+                hasLabel="ses-01", hasCompletedPipeline=[pipeline]
+            ),
+            models.ImagingSession(hasLabel="ses-02", hasAcquisition=[bold]),
+        ),
+        Path("shard.jsonld"),
+    )
+
+    pheno_sessions = [
+        session
+        for session in subject.hasSession
+        if isinstance(session, models.PhenotypicSession)
+    ]
+    imaging_sessions = {
+        session.hasLabel: session
+        for session in subject.hasSession
+        if isinstance(session, models.ImagingSession)
+    }
+    assert [session.hasLabel for session in pheno_sessions] == [
+        "ses-01",
+        "ses-02",
+    ]
+    assert pheno_sessions[0] is pheno_session
+    assert imaging_sessions["ses-01"].hasAcquisition == [t1w]
+    assert imaging_sessions["ses-01"].hasFilePath == "/data/sub-01/ses-01"
+    assert imaging_sessions["ses-01"].hasCompletedPipeline == [pipeline]
+    assert imaging_sessions["ses-02"].hasAcquisition == [bold]
+
+
+def test_merge_without_inputs_produces_error(caplog, propagate_errors):
+    """Test that merging an empty list of files logs an error instead of failing on a missing dataset."""
+    with pytest.raises(typer.Exit):
+        merge_utils.merge_jsonld_files([])
+
+    assert "No input .jsonld files" in caplog.text
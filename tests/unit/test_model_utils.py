@@ -1,4 +1,6 @@
+import uuid
 from contextlib import nullcontext as does_not_raise
+from copy import deepcopy
 
 import pytest
 from pydantic import ValidationError
@@ -95,6 +97,89 @@ def test_get_subjects_missing_from_pheno_data(
     assert sorted(bids_exclusive_subs) == expected_bids_exclusive_subs
 
 
+def test_generated_identifiers_are_random_uuids():
+    """Test that the default identifiers of graph objects are unique Neurobagel identifiers containing valid version 4 UUIDs."""
+    identifiers = {
+        models.Acquisition(
+            hasContrastType=models.Image(identifier="nidm:T1Weighted")
+        ).identifier
+        for _ in range(1000)
+    }
+
+    assert len(identifiers) == 1000
+    for identifier in identifiers:
+        prefix, uuid_str = identifier.split(":")
+        parsed_uuid = uuid.UUID(uuid_str)
+        assert prefix == "nb"
+        assert str(parsed_uuid) == uuid_str
+        assert parsed_uuid.version == 4
+        assert parsed_uuid.variant == uuid.RFC_4122
+
+
+def test_controlled_terms_are_shared_between_sessions(
+    neurobagel_test_config,
+):
+    """Test that interned controlled terms are shared between sessions and serialized in full for each session."""
+    sessions = [
+        models.PhenotypicSession(
+            hasLabel=label, hasSex=models.Sex.interned("snomed:248153007")
+        )
+        for label in ["ses-01", "ses-02"]
+    ]
+    dataset = models.Dataset(
+        hasLabel="My dataset",
+        hasSamples=[models.Subject(hasLabel="sub-01", hasSession=sessions)],
+    )
+
+    assert sessions[0].hasSex is sessions[1].hasSex
+    assert models.Sex.interned("snomed:248153007") is not (
+        models.Diagnosis.interned("snomed:248153007")
+    )
+    jsonld = model_utils.dataset_to_jsonld(
+        context=model_utils.generate_context(neurobagel_test_config),
+        dataset=dataset,
+    )
+    assert [
+        session["hasSex"] for session in jsonld["hasSamples"][0]["hasSession"]
+    ] == [{"identifier": "snomed:248153007", "schemaKey": "Sex"}] * 2
+
+
+def test_interned_controlled_terms_cannot_be_modified():
+    """Test that a shared controlled term cannot be modified, since the change would apply to every session using it."""
+    sex = models.Sex.interned("snomed:248153007")
+
+    with pytest.raises(ValidationError):
+        sex.identifier = "snomed:248152002"
+
+    assert models.Sex.interned("snomed:248153007").identifier == (
+        "snomed:248153007"
+    )
+
+
+def test_generated_contexts_are_independent(neurobagel_test_config):
+    """Test that modifying a generated context does not affect contexts generated later from the cached context terms."""
+    context = model_utils.generate_context(neurobagel_test_config)
+    expected_context = deepcopy(context)
+    context["@context"]["hasFileCount"] = "modified"
+    context["@context"].pop("nb")
+
+    assert model_utils.generate_context(neurobagel_test_config) == (
+        expected_context
+    )
+
+
+def test_model_context_fields_are_independent():
+    """Test that modifying the nested context terms of the data model does not affect the terms returned later."""
+    context_fields = model_utils.get_model_context_fields()
+    expected_context_fields = deepcopy(context_fields)
+    context_fields["hasAge"]["@id"] = "modified"
+    model_utils.generate_context("Neurobagel")["@context"]["hasSex"][
+        "@type"
+    ] = "@id"
+
+    assert model_utils.get_model_context_fields() == expected_context_fields
+
+
 def test_get_subject_instances():
     """Test that subjects are correctly extracted from a Neurobagel dataset instance."""
     dataset = models.Dataset(
@@ -125,6 +210,40 @@ def test_get_subject_instances():
     assert list(subjects.keys()) == ["sub-01", "sub-02"]
 
 
+def test_unchanged_subjects_are_independent_copies():
+    """
+    Test that only subjects with matching content hashes are reused, without their imaging sessions,
+    and that modifying a reused subject does not affect the previous dataset.
+    """
+    previous_dataset = models.Dataset(
+        hasLabel="test_dataset",
+        hasSamples=[
+            models.Subject(
+                hasLabel=label,
+                hasSession=[
+                    models.PhenotypicSession(hasLabel="ses-01", hasAge=26),
+                    models.ImagingSession(hasLabel="ses-01"),
+                ],
+            )
+            for label in ["sub-01", "sub-02"]
+        ],
+    )
+    expected_dataset = previous_dataset.model_copy(deep=True)
+
+    reusable_subjects = model_utils.get_unchanged_subjects(
+        previous_dataset,
+        {"sub-01": "hash1", "sub-02": "hash2"},
+        {"sub-01": "hash1", "sub-02": "modified"},
+    )
+    reusable_subjects["sub-01"].hasSession[0].hasAge = 99
+    reusable_subjects["sub-01"].hasSession.append(
+        models.ImagingSession(hasLabel="ses-02")
+    )
+
+    assert list(reusable_subjects.keys()) == ["sub-01"]
+    assert previous_dataset == expected_dataset
+
+
 def test_get_imaging_session_instances():
     """Test that get_imaging_session_instances() correctly returns existing imaging sessions for a given subject."""
     example_subject_jsonld = {
@@ -229,3 +348,73 @@ def test_dataset_to_jsonld(neurobagel_test_config):
 
     assert "@context" in jsonld.keys()
     assert len(jsonld["hasSamples"]) == 2
+
+
+def test_canonicalize_dataset_is_independent_of_random_identifiers_and_order():
+    """
+    Test that two datasets with the same content but different random identifiers and subject/session order
+    are identical after canonicalization, and that all graph objects get distinct identifiers.
+    """
+
+    def create_dataset(subject_labels, session_labels):
+        return models.Dataset(
+            hasLabel="My Dataset",
+            hasSamples=[
+                models.Subject(
+                    hasLabel=sub_label,
+                    hasSession=[
+                        models.ImagingSession(
+                            hasLabel="ses-01",
+                            hasAcquisition=[
+                                models.Acquisition(
+                                    hasContrastType=models.Image(
+                                        identifier="nidm:T1Weighted"
+                                    )
+                                ),
+                                models.Acquisition(
+                                    hasContrastType=models.Image(
+                                        identifier="nidm:T1Weighted"
+                                    )
+                                ),
+                            ],
+                        ),
+                        *[
+                            models.PhenotypicSession(hasLabel=ses_label)
+                            for ses_label in session_labels
+                        ],
+                    ],
+                )
+                for sub_label in subject_labels
+            ],
+        )
+
+    dataset = create_dataset(["sub-01", "sub-02"], ["ses-01", "ses-02"])
+    reordered_dataset = create_dataset(
+        ["sub-02", "sub-01"], ["ses-02", "ses-01"]
+    )
+    model_utils.canonicalize_dataset(dataset)
+    model_utils.canonicalize_dataset(reordered_dataset)
+
+    dataset_dict = dataset.model_dump(mode="json")
+    assert dataset_dict == reordered_dataset.model_dump(mode="json")
+    assert [sub["hasLabel"] for sub in dataset_dict["hasSamples"]] == [
+        "sub-01",
+        "sub-02",
+    ]
+    assert [
+        (ses["hasLabel"], ses["schemaKey"])
+        for ses in dataset_dict["hasSamples"][0]["hasSession"]
+    ] == [
+        ("ses-01", "ImagingSession"),
+        ("ses-01", "PhenotypicSession"),
+        ("ses-02", "PhenotypicSession"),
+    ]
+
+    identifiers = [dataset.identifier]
+    for subject in dataset.hasSamples:
+        identifiers.append(subject.identifier)
+        for session in subject.hasSession:
+            identifiers.append(session.identifier)
+            for acquisition in getattr(session, "hasAcquisition", None) or []:
+                identifiers.append(acquisition.identifier)
+    assert len(identifiers) == len(set(identifiers))
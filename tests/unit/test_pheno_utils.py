@@ -283,6 +283,28 @@ def test_map_std_vars_to_columns(test_data, load_test_json):
     assert ["sex"] == result["sex"]
 
 
+def test_dictionary_index_matches_column_lookups(test_data, load_test_json):
+    """Test that the lookups of a dictionary index built in a single pass match the results of the individual lookup helpers."""
+    data_dict = load_test_json(test_data / "example6.json")
+
+    dict_index = pheno_utils.DictionaryIndex(data_dict)
+
+    assert dict_index.annotated_columns == pheno_utils.get_annotated_columns(
+        data_dict
+    )
+    for concept in mappings.NEUROBAGEL.values():
+        assert dict_index.get_columns_about(concept) == [
+            col
+            for col, content in data_dict.items()
+            if "Annotations" in content
+            and content["Annotations"]["IsAbout"]["TermURL"] == concept
+        ]
+    assert dict_index.map_tools_to_columns() == {
+        "snomed:1234": ["tool_item1", "tool_item2"],
+        "snomed:4321": ["other_tool_item1"],
+    }
+
+
 @pytest.mark.parametrize(
     "tool, columns",
     [
@@ -1215,3 +1237,118 @@ def test_invalid_dataset_description_raises_error(
     assert "dataset description is invalid" in errors[0]
     for invalid_field in invalid_fields:
         assert invalid_field in errors[0]
+
+
+def test_subject_hashes_only_change_for_modified_participants(
+    test_data, load_test_json
+):
+    """
+    Test that modifying the row of one participant only changes the content hash of that participant,
+    while modifying the annotations in the data dictionary changes the hashes of all participants.
+    """
+    pheno_df = pd.read_csv(
+        test_data / "example2.tsv", sep="\t", keep_default_na=False, dtype=str
+    )
+    data_dict = load_test_json(test_data / "example2.json")
+    original_hashes = pheno_utils.get_subject_hashes(pheno_df, data_dict)
+
+    modified_df = pheno_df.copy()
+    modified_df.loc[0, "participant_age"] = "P21Y"
+    modified_hashes = pheno_utils.get_subject_hashes(modified_df, data_dict)
+
+    modified_dict = load_test_json(test_data / "example2.json")
+    modified_dict["sex"]["Description"] = "A new description"
+    modified_dict_hashes = pheno_utils.get_subject_hashes(
+        pheno_df, modified_dict
+    )
+
+    assert list(original_hashes.keys()) == ["sub-01", "sub-02"]
+    assert modified_hashes["sub-01"] != original_hashes["sub-01"]
+    assert modified_hashes["sub-02"] == original_hashes["sub-02"]
+    assert all(
+        modified_dict_hashes[sub] != original_hashes[sub]
+        for sub in original_hashes
+    )
+
+
+def test_data_dict_validator_is_reused():
+    """Test that the data dictionary schema validator is only created once and reused for subsequent validations."""
+    assert (
+        pheno_utils.get_data_dict_validator()
+        is pheno_utils.get_data_dict_validator()
+    )
+
+
+def test_problems_in_phenotypic_table_are_reported_together(
+    test_data, load_test_json, caplog, propagate_errors
+):
+    """
+    Test that when the phenotypic table has several problems (missing IDs, duplicate IDs, and unannotated categorical values),
+    all of them are reported in a single error.
+    """
+    data_dict = load_test_json(test_data / "example2.json")
+    pheno_df = pd.DataFrame(
+        {
+            "participant_id": ["sub-01", "sub-01", ""],
+            "session_id": ["ses-01", "ses-01", "ses-01"],
+            "group": ["PAT", "CTRL", "UNKNOWN"],
+            "sex": ["M", "M", "F"],
+            "participant_age": ["P20Y6M", "P20Y6M", "P25Y8M"],
+        }
+    )
+
+    with pytest.raises(typer.Exit):
+        pheno_utils.validate_inputs(data_dict, pheno_df)
+
+    assert len(caplog.records) == 1
+    for expected_message in [
+        "missing values in participant or session ID columns",
+        "duplicate participant IDs",
+        "{'group': ['UNKNOWN']}",
+    ]:
+        assert expected_message in caplog.text
+
+
+@pytest.mark.parametrize(
+    "value_format,values,expected_valid",
+    [
+        ("nb:FromFloat", ["11.0", "11", "1e1", "11,0", "NA"], [1, 1, 1, 0, 1]),
+        ("nb:FromEuro", ["11,0", "11.5", "eleven"], [1, 1, 0]),
+        ("nb:FromBounded", ["90+", "85", "20-30"], [1, 1, 0]),
+        ("nb:FromISO8601", ["20Y6M", "P56Y4M", "11.0", "NA"], [1, 1, 0, 1]),
+        ("nb:FromRange", ["20-25", "20.00-25.00", "20", "-30"], [1, 1, 0, 0]),
+    ],
+)
+def test_matches_age_format(value_format, values, expected_valid):
+    """Test that age values are checked against the annotated age format, and that annotated missing values are allowed."""
+    result = pheno_utils.matches_age_format(
+        pd.Series(values), value_format, missing_values=["NA"]
+    )
+
+    assert result.tolist() == [bool(valid) for valid in expected_valid]
+
+
+def test_pheno_table_schema_reports_invalid_ages_with_other_problems(
+    test_data, load_test_json, caplog, propagate_errors
+):
+    """
+    Test that age values not matching the annotated age format are reported in the same error
+    as other problems in the phenotypic table, with the invalid values shown by column.
+    """
+    data_dict = load_test_json(test_data / "example2.json")
+    pheno_df = pd.DataFrame(
+        {
+            "participant_id": ["sub-01", "sub-02"],
+            "session_id": ["ses-01", "ses-01"],
+            "group": ["PAT", "UNKNOWN"],
+            "sex": ["M", "F"],
+            "participant_age": ["P20Y6M", "twenty"],
+        }
+    )
+
+    with pytest.raises(typer.Exit):
+        pheno_utils.validate_inputs(data_dict, pheno_df)
+
+    assert len(caplog.records) == 1
+    assert "{'group': ['UNKNOWN']}" in caplog.text
+    assert "{'participant_age': ['twenty']}" in caplog.text
@@ -0,0 +1,32 @@
+import time
+
+from bagel.utilities import profile_utils
+
+
+def busy_wait(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler_stats():
+    """Test that the sampling profiler attributes the sampled time to the running function and its callers."""
+    profiler = profile_utils.SamplingProfiler(interval=0.001)
+    profiler.enable()
+    busy_wait(0.2)
+    profiler.disable()
+
+    stats = profiler.create_stats()
+    busy_wait_stats = next(
+        func_stats
+        for (_, _, func_name), func_stats in stats.items()
+        if func_name == "busy_wait"
+    )
+    n_samples, _, own_time, cumulative_time, callers = busy_wait_stats
+
+    assert n_samples > 0
+    assert 0 < own_time <= cumulative_time
+    assert any(
+        func_name == "test_sampling_profiler_stats"
+        for _, _, func_name in callers
+    )
@@ -0,0 +1,192 @@
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+import typer
+
+from bagel import logger as bagel_logger
+from bagel.cli import bagel
+from bagel.utilities import derivative_utils, serve_utils
+
+
+@pytest.fixture()
+def pheno_job_args(test_data, example_dataset_description, tmp_path):
+    return [
+        "pheno",
+        "--pheno",
+        str(test_data / "example2.tsv"),
+        "--dictionary",
+        str(test_data / "example2.json"),
+        "--dataset-description",
+        str(example_dataset_description),
+        "--output",
+        str(tmp_path / "pheno.jsonld"),
+    ]
+
+
+def post_job(url, body, headers=None):
+    """Send a job request to the server, as JSON unless other headers are specified."""
+    request = urllib.request.Request(
+        f"{url}/jobs",
+        data=body,
+        headers=headers or {"Content-Type": "application/json"},
+        method="POST",
+    )
+    return urllib.request.urlopen(request)
+
+
+@pytest.fixture()
+def server_url():
+    """Start a server on a free port in a background thread and return its URL."""
+    server = serve_utils.create_server("127.0.0.1", 0, bagel)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_job_returns_exit_code_and_logs(pheno_job_args, tmp_path):
+    """Test that a job runs the CLI command in the same process and returns its logs, including for a failing job."""
+    cli = typer.main.get_command(bagel)
+
+    result = serve_utils.run_job(cli, pheno_job_args)
+    assert result["exit_code"] == 0
+    assert (tmp_path / "pheno.jsonld").exists()
+    assert any(
+        log["message"].startswith("Saved output to:") for log in result["logs"]
+    )
+
+    # Running the same job again fails because the output already exists
+    result = serve_utils.run_job(cli, pheno_job_args)
+    assert result["exit_code"] == 1
+    assert "already exists" in result["error"]
+
+
+@pytest.mark.parametrize(
+    "args, expected_error",
+    [
+        (["pheno", "--not-an-option"], "No such option"),
+        (["serve"], "cannot be run as a job"),
+        (["watch", "--pheno", "pheno.tsv"], "cannot be run as a job"),
+        (["not-a-command"], "cannot be run as a job"),
+        ([], "No command was specified"),
+    ],
+)
+def test_invalid_jobs_return_error(args, expected_error):
+    """Test that jobs with invalid arguments or commands other than one-shot commands return an error instead of stopping or blocking the server."""
+    result = serve_utils.run_job(typer.main.get_command(bagel), args)
+
+    assert result["exit_code"] == 2
+    assert expected_error in result["error"]
+
+
+def test_server_runs_posted_jobs(server_url, pheno_job_args, tmp_path):
+    """Test that the server reports its status and runs jobs posted as JSON."""
+    with urllib.request.urlopen(f"{server_url}/health") as response:
+        assert json.load(response)["status"] == "ok"
+
+    with post_job(
+        server_url, json.dumps({"args": pheno_job_args}).encode("utf-8")
+    ) as response:
+        assert json.load(response)["exit_code"] == 0
+    assert (tmp_path / "pheno.jsonld").exists()
+
+
+def test_server_rejects_malformed_jobs(server_url):
+    """Test that the server returns a 400 error for a request body that does not list CLI arguments."""
+    with pytest.raises(urllib.error.HTTPError) as e:
+        post_job(
+            server_url,
+            json.dumps({"args": "pheno --pheno pheno.tsv"}).encode("utf-8"),
+        )
+
+    assert e.value.code == 400
+
+
+@pytest.mark.parametrize(
+    "headers, expected_status",
+    [
+        # A form or plain text request, which browsers can send to any site
+        ({"Content-Type": "text/plain"}, 415),
+        ({}, 415),
+        (
+            {
+                "Content-Type": "application/json",
+                "Origin": "https://example.com",
+            },
+            403,
+        ),
+        # A host name of another site that resolves to the server
+        (
+            {"Content-Type": "application/json", "Host": "example.com:8000"},
+            403,
+        ),
+    ],
+)
+def test_server_rejects_requests_from_web_pages(
+    server_url, pheno_job_args, tmp_path, headers, expected_status
+):
+    """Test that the server does not run jobs that are not sent as JSON or that could come from a web page."""
+    with pytest.raises(urllib.error.HTTPError) as e:
+        post_job(
+            server_url,
+            json.dumps({"args": pheno_job_args}).encode("utf-8"),
+            headers={"Content-Type": "", **headers},
+        )
+
+    assert e.value.code == expected_status
+    assert not (tmp_path / "pheno.jsonld").exists()
+
+
+def test_jobs_do_not_change_server_log_settings(pheno_job_args):
+    """Test that the log format and level set by the options of a job are reset once the job completes."""
+    bagel_logger.configure_logger(bagel_logger.VerbosityLevel.INFO)
+    console_handler = bagel_logger._console_handler
+
+    serve_utils.run_job(
+        typer.main.get_command(bagel),
+        [*pheno_job_args, "--log-format", "json", "--verbosity", "debug"],
+    )
+
+    assert bagel_logger._console_handler is console_handler
+    assert console_handler in bagel_logger.logger.handlers
+    assert bagel_logger.logger.level == logging.INFO
+    assert console_handler.level == logging.INFO
+
+
+def test_warm_caches_parses_pipeline_catalog_once():
+    """Test that the pipeline catalog parsed when the server starts is reused by jobs."""
+    serve_utils.warm_caches()
+
+    assert derivative_utils.get_pipeline_catalog() is (
+        derivative_utils.get_pipeline_catalog()
+    )
+    assert derivative_utils.get_pipeline_catalog.cache_info().currsize == 1
+
+
+def test_job_commands_are_cli_commands():
+    """Test that every command allowed as a job exists, and that long-running commands are not allowed."""
+    commands = typer.main.get_command(bagel).commands
+
+    assert serve_utils.JOB_COMMANDS <= set(commands)
+    assert not serve_utils.JOB_COMMANDS & {"serve", "watch"}
+
+
+@pytest.mark.parametrize("host", ["0.0.0.0", "::", "", "192.168.1.10"])
+def test_server_only_listens_on_loopback_hosts(runner, host):
+    """Test that the server refuses to listen on an address reachable from other machines, since jobs are not authenticated."""
+    with pytest.raises(typer.BadParameter, match="loopback"):
+        serve_utils.create_server(host, 0, bagel)
+
+    result = runner.invoke(bagel, ["serve", "--host", host, "--port", "0"])
+    assert result.exit_code == 2
+    assert "loopback" in result.output
+
+
+@pytest.mark.parametrize("host", ["localhost", "127.0.0.1", "127.0.0.2"])
+def test_check_loopback_host_accepts_loopback_hosts(host):
+    assert serve_utils.check_loopback_host(host) == host
@@ -0,0 +1,33 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from bagel.utilities import memory_utils, timing_utils
+
+
+@pytest.fixture
+def tracked_stages(monkeypatch):
+    """Enable memory tracking and the recording of stages, as done by the --trace-memory and --timings options."""
+    tracemalloc.start(memory_utils.TRACEBACK_DEPTH)
+    monkeypatch.setattr(memory_utils, "_tracking_enabled", True)
+    monkeypatch.setattr(timing_utils, "_stage_records", [])
+    yield timing_utils._stage_records
+    tracemalloc.stop()
+
+
+def test_failed_stage_is_recorded_and_stops_memory_tracking(tracked_stages):
+    """Test that a stage that raises an error is recorded as failed, and does not leave the RSS sampling thread running."""
+    with pytest.raises(ValueError):
+        with timing_utils.timed_stage("load inputs") as stage:
+            stage["rows"] = 10
+            raise ValueError("Invalid input")
+
+    assert [record["stage"] for record in tracked_stages] == ["load inputs"]
+    assert tracked_stages[0]["failed"] is True
+    assert tracked_stages[0]["rows"] == 10
+    assert "traced_peak_mb" in tracked_stages[0]
+    assert not any(
+        thread.name == memory_utils.RSS_SAMPLER_THREAD
+        for thread in threading.enumerate()
+    )
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from bagel.utilities import watch_utils
+
+
+def edit_file(path, content, mtime_ns):
+    """Write a file with an explicit modification time, since successive writes can get the same timestamp."""
+    path.write_text(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture()
+def watched_files(tmp_path):
+    paths = [tmp_path / "pheno.tsv", tmp_path / "dictionary.json"]
+    for path in paths:
+        edit_file(path, "original", mtime_ns=0)
+    return paths
+
+
+def test_watch_files_yields_changed_files(watched_files, monkeypatch):
+    """Test that all files are yielded first, and then only the files that changed, once they have stopped changing."""
+    edits = iter(
+        [
+            # No change
+            lambda: None,
+            lambda: edit_file(watched_files[1], "edited", mtime_ns=1),
+            # The file is still being saved
+            lambda: edit_file(watched_files[1], "edited again", mtime_ns=2),
+            lambda: None,
+        ]
+    )
+    monkeypatch.setattr(
+        watch_utils.time, "sleep", lambda interval: next(edits, lambda: None)()
+    )
+
+    changes = watch_utils.watch_files(watched_files, interval=0)
+
+    assert next(changes) == watched_files
+    assert next(changes) == [watched_files[1]]
+    assert watched_files[1].read_text() == "edited again"
+
+
+def test_watch_files_waits_for_replaced_files(watched_files, monkeypatch):
+    """Test that a change is not reported while a file is missing, e.g. while an editor replaces it."""
+    edits = iter(
+        [
+            lambda: watched_files[0].unlink(),
+            lambda: None,
+            lambda: edit_file(watched_files[0], "replaced", mtime_ns=1),
+            lambda: None,
+        ]
+    )
+    monkeypatch.setattr(
+        watch_utils.time, "sleep", lambda interval: next(edits, lambda: None)()
+    )
+
+    changes = watch_utils.watch_files(watched_files, interval=0)
+    next(changes)
+
+    assert next(changes) == [watched_files[0]]
+    assert watched_files[0].read_text() == "replaced"
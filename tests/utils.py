@@ -1,5 +1,11 @@
 """Utility functions for testing."""
 
+import re
+
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+
 
 def get_values_by_key(data, target):
     """
@@ -14,3 +20,20 @@ def get_values_by_key(data, target):
     elif isinstance(data, list):
         for item in data:
             yield from get_values_by_key(item, target)
+
+
+def remove_random_identifiers(data):
+    """Recursively remove the randomly generated UUID identifiers of graph objects from JSONLD data, to allow outputs to be compared."""
+    if isinstance(data, dict):
+        return {
+            key: remove_random_identifiers(value)
+            for key, value in data.items()
+            if not (
+                key == "identifier"
+                and isinstance(value, str)
+                and UUID_PATTERN.search(value)
+            )
+        }
+    if isinstance(data, list):
+        return [remove_random_identifiers(item) for item in data]
+    return data